@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+######
+# -----
+# Copyright (c) 2023 FIT-Project
+# SPDX-License-Identifier: GPL-3.0-only
+# -----
+######
+
+import hashlib
+import os
+import shutil
+import tempfile
+import zipfile
+import zlib
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Already compressed contents, deflating them again costs CPU and saves nothing
+STORED_EXTENSIONS = {
+    ".avi",
+    ".mp4",
+    ".m4a",
+    ".m4v",
+    ".mkv",
+    ".mov",
+    ".mp3",
+    ".ogg",
+    ".webm",
+    ".webp",
+    ".jpg",
+    ".jpeg",
+    ".png",
+    ".gif",
+    ".woff",
+    ".woff2",
+    ".zip",
+    ".gz",
+    ".tgz",
+    ".bz2",
+    ".xz",
+    ".7z",
+    ".rar",
+}
+
+BUFFER_SIZE = 1024 * 1024
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
+# MS-DOS directory attribute (APPNOTE.TXT 4.4.15)
+DIRECTORY_ATTRIBUTE = 0x10
+
+
+def get_compress_type(filename):
+    if os.path.splitext(filename)[1].lower() in STORED_EXTENSIONS:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+class _HashingWriter:
+    # Sequential file object that hashes everything written through it,
+    # so the archive digests are known as soon as the archive is closed
+    def __init__(self, filename, algorithms):
+        self.name = filename
+        self.fp = open(filename, "wb")
+        self.hashes = {algorithm: hashlib.new(algorithm) for algorithm in algorithms}
+        self.position = 0
+
+    def write(self, data):
+        for file_hash in self.hashes.values():
+            file_hash.update(data)
+        self.position += len(data)
+        return self.fp.write(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        self.fp.flush()
+
+    def close(self):
+        self.fp.close()
+
+    def hexdigests(self):
+        return {
+            algorithm: file_hash.hexdigest()
+            for algorithm, file_hash in self.hashes.items()
+        }
+
+
+class ZipPackager:
+    """Build a zip archive of a folder.
+
+    Every entry is STORED or DEFLATED according to its extension. Deflated
+    entries are compressed concurrently on a thread pool into temporary
+    spool files and then copied into the archive sequentially, in the same
+    order used by shutil.make_archive. Stored entries are checksummed on
+    the pool first, so every local header has its CRC and sizes and no
+    data descriptor is needed. The SHA-256 of each member and the digests
+    of the archive itself are computed while writing.
+    """
+
+    def __init__(self, max_workers=None, progress=None, algorithms=None):
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.progress = progress
+        self.algorithms = algorithms or ["md5", "sha1", "sha256"]
+
+    def make_archive(self, base_name, root_dir):
+        filename = base_name + ".zip"
+        entries = self.__get_entries(root_dir)
+
+        self.total_bytes = sum(entry[2] for entry in entries)
+        self.written_bytes = 0
+        self.__update_progress(0)
+
+        members = []
+        writer = _HashingWriter(filename, self.algorithms)
+        try:
+            with zipfile.ZipFile(writer, "w") as archive:
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    pending = deque()
+                    for entry in entries:
+                        pending.append(self.__submit(executor, entry))
+                        # bound the number of spooled entries waiting to be written
+                        if len(pending) > self.max_workers * 2:
+                            members.append(self.__write(archive, *pending.popleft()))
+
+                    while pending:
+                        members.append(self.__write(archive, *pending.popleft()))
+        finally:
+            writer.close()
+
+        return {
+            "filename": filename,
+            "size": os.path.getsize(filename),
+            "hashes": writer.hexdigests(),
+            "members": [member for member in members if not member["is_dir"]],
+        }
+
+    def __get_entries(self, root_dir):
+        # same walk and arcnames of shutil.make_archive(base_dir=os.curdir)
+        entries = []
+        for dirpath, dirnames, filenames in os.walk(root_dir):
+            for name in sorted(dirnames):
+                path = os.path.join(dirpath, name)
+                entries.append((path, os.path.relpath(path, root_dir), 0))
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                if os.path.isfile(path):
+                    entries.append(
+                        (path, os.path.relpath(path, root_dir), os.path.getsize(path))
+                    )
+        return entries
+
+    def __submit(self, executor, entry):
+        path, arcname, size = entry
+        zinfo = zipfile.ZipInfo.from_file(path, arcname)
+        if zinfo.is_dir():
+            zinfo.compress_type = zipfile.ZIP_STORED
+            zinfo.external_attr |= DIRECTORY_ATTRIBUTE
+            return zinfo, path, None
+
+        zinfo.compress_type = get_compress_type(path)
+        if zinfo.compress_type == zipfile.ZIP_STORED:
+            # stored entries are streamed into the archive once the CRC is known
+            return zinfo, path, executor.submit(self.__checksum, path)
+
+        return zinfo, path, executor.submit(self.__deflate, path)
+
+    def __checksum(self, path):
+        sha256 = hashlib.sha256()
+        crc = 0
+        file_size = 0
+        with open(path, "rb") as f:
+            while chunk := f.read(BUFFER_SIZE):
+                sha256.update(chunk)
+                crc = zlib.crc32(chunk, crc)
+                file_size += len(chunk)
+        return crc, file_size, sha256.hexdigest()
+
+    def __deflate(self, path):
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        compressor = zlib.compressobj(
+            zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -zlib.MAX_WBITS
+        )
+        sha256 = hashlib.sha256()
+        crc = 0
+        file_size = 0
+        with open(path, "rb") as f:
+            while chunk := f.read(BUFFER_SIZE):
+                sha256.update(chunk)
+                crc = zlib.crc32(chunk, crc)
+                file_size += len(chunk)
+                spool.write(compressor.compress(chunk))
+        spool.write(compressor.flush())
+
+        compress_size = spool.tell()
+        spool.seek(0)
+        return spool, crc, file_size, compress_size, sha256.hexdigest()
+
+    def __write(self, archive, zinfo, path, future):
+        zinfo.header_offset = archive.fp.tell()
+        if zinfo.is_dir():
+            zinfo.CRC = 0
+            archive.fp.write(zinfo.FileHeader(False))
+            sha256 = None
+        elif zinfo.compress_type == zipfile.ZIP_STORED:
+            sha256 = self.__write_stored(archive, zinfo, path, future.result())
+        else:
+            sha256 = self.__write_deflated(archive, zinfo, future.result())
+
+        archive.filelist.append(zinfo)
+        archive.NameToInfo[zinfo.filename] = zinfo
+        archive.start_dir = archive.fp.tell()
+
+        return {
+            "name": zinfo.filename,
+            "size": zinfo.file_size,
+            "compress_size": zinfo.compress_size,
+            "sha256": sha256,
+            "is_dir": zinfo.is_dir(),
+        }
+
+    def __write_stored(self, archive, zinfo, path, result):
+        crc, file_size, sha256 = result
+        zinfo.CRC = crc
+        zinfo.file_size = file_size
+        zinfo.compress_size = file_size
+        archive.fp.write(zinfo.FileHeader())
+
+        # the header is already written, the content must be the checksummed one
+        written_crc = 0
+        written_size = 0
+        with open(path, "rb") as f:
+            while chunk := f.read(BUFFER_SIZE):
+                written_crc = zlib.crc32(chunk, written_crc)
+                written_size += len(chunk)
+                archive.fp.write(chunk)
+                self.__update_progress(len(chunk))
+        if written_crc != crc or written_size != file_size:
+            raise OSError("{} changed while it was archived".format(zinfo.filename))
+
+        return sha256
+
+    def __write_deflated(self, archive, zinfo, result):
+        spool, crc, file_size, compress_size, sha256 = result
+        zinfo.CRC = crc
+        zinfo.file_size = file_size
+        zinfo.compress_size = compress_size
+        archive.fp.write(zinfo.FileHeader())
+        with spool:
+            shutil.copyfileobj(spool, archive.fp, BUFFER_SIZE)
+        self.__update_progress(file_size)
+
+        return sha256
+
+    def __update_progress(self, size):
+        self.written_bytes += size
+        if self.progress is not None:
+            self.progress(self.written_bytes, self.total_bytes)
@@ -20,4 +20,8 @@ ACQUISITION_FINISHED = (
     "The acquisition has finished successfully. Do you want to open the case directory?"
 )
 RETRY = "Check search criteria"
+MAIL_DOWNLOAD_INTERRUPTED = (
+    "The download of the emails has been interrupted. Do you want to resume it? "
+    "Emails already downloaded will be skipped."
+)
 CHECK_URL = "Check load website URL"
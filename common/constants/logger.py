@@ -16,9 +16,17 @@ NTP_ACQUISITION_TIME = "NTP {} acquisition time: {}"
 NETWORK_PACKET_CAPTURE_STARTED = "Network packet capture started"
 NETWORK_PACKET_CAPTURE_STOPPED = "Network packet capture stopped"
 NETWORK_PACKET_CAPTURE_COMPLETED = "Network packet capture completed"
+NETWORK_PACKET_CAPTURE_PACKETS = (
+    "Network packets captured: {packets} ({bytes} bytes), written: {written}, "
+    "dropped: {dropped}, files: {files}"
+)
 SCREEN_RECODER_STARTED = "Screen recoder capture started"
 SCREEN_RECODER_STOPPED = "Screen recoder capture stopped"
 SCREEN_RECODER_COMPLETED = "Screen recoder capture completed"
+SCREEN_RECODER_FRAMES = (
+    "Screen recoder frames written: {written}, captured: {captured}, "
+    "unchanged: {unchanged}, duplicated: {duplicated}, dropped: {dropped}"
+)
 
 # NETTOOLS
 NSLOOKUP_GET_INFO_URL = "Get NSLOOKUP info for URL: {}"
@@ -56,6 +64,9 @@ GENERATE_PDF_REPORT_COMPLETED = "Generate PDF Report completed"
 TAKE_FULL_PAGE_SCREENSHOT = "Take full page screenshot"
 TAKE_FULL_PAGE_SCREENSHOT_STARTED = "Take full page screenshot started"
 TAKE_FULL_PAGE_SCREENSHOT_COMPLETED = "Take full page screenshot completed"
+TAKE_FULL_PAGE_SCREENSHOT_TIMINGS = (
+    "Full page screenshot render wait for each step (ms): {}"
+)
 
 
 SAVE_PAGE_STARTED = "Save page started"
@@ -74,6 +85,7 @@ TIMESTAMP_APPLY = "Apply timestamp to {} from server {}"
 
 PEC_AND_DOWNLOAD_EML_STARTED = "Send report by PEC and Download EML started"
 PEC_AND_DOWNLOAD_EML_COMPLETED = "Send report by PEC and Download EML completed"
+PEC_SENDING = "Sending report by PEC {}%"
 PEC_SENT = "Sent report by PEC to {} status {}"
 PEC_HAS_NOT_BEEN_SENT_CANNOT_DOWNLOAD_EML = (
     "PEC has not been sent cannot download the EML"
@@ -87,10 +99,25 @@ MAIL_SCRAPER_COMPLETED = "Mail Scraper completed"
 MAIL_SCRAPER_LOGGED_IN = "Logged with mail: {}  {}"
 MAIL_SCRAPER_SEARCH_EMAILS = "The email search is finished with status: {}"
 MAIL_SCRAPER_FETCH_EMAILS = (
-    "Fetching e-mails, estimated time: {} minutes, {} e-mail(s) found"
+    "Fetching e-mails, {total_emails} e-mail(s) found, about {total_megabytes} MB, "
+    "estimated download time: {estimated_time} minutes"
 )
 MAIL_SCRAPER_SEARCH_CRITERIA = "Start search emails whit criteria: {}"
 MAIL_SCRAPER_DOWNLOAD_EMAILS = "Downloaded all selected emails"
+MAIL_SCRAPER_DOWNLOAD_ESTIMATE = (
+    "Downloading e-mails {downloaded}/{total}, "
+    "estimated remaining time: {remaining_time} minutes"
+)
+MAIL_SCRAPER_DOWNLOAD_EMAILS_FAILED = (
+    "Download of the selected emails interrupted, it can be resumed"
+)
+MAIL_SCRAPER_DOWNLOAD_STATISTICS = (
+    "Downloaded e-mails written: {written}, skipped: {skipped}, failed: {failed}"
+)
+MAIL_SCRAPER_DOWNLOAD_CONNECTION = (
+    "IMAP connection {connection}: {emails} e-mail(s), {bytes} bytes "
+    "in {seconds:.2f} seconds"
+)
 
 # INSTAGRAM SCRAPER
 INSTAGRAM_SCRAPER_STARTED = "Instagram Scraper started"
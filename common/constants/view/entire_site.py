@@ -24,3 +24,4 @@ NO_URLS_FOUND = "Not other URLs found"
 NO_URLS_FOUND_MSG = "Not other URLs found associated with the {}"
 LOAD_FROM_SITEMAP = "Load from Sitemap"
 LOAD_FROM_DOMAIN = "Load from Domain"
+LASTMOD_SINCE = "Modified since"
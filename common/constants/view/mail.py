@@ -8,6 +8,7 @@
 ######
 
 SAVE_MAIL = "Save Messages"
+DOWNLOAD_INTERRUPTED = "Download interrupted"
 SERVER_ERROR = "Server error"
 LOGIN_ERROR = "Login error"
 SEARCH_ERROR = "Search error"
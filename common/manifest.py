@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+######
+# -----
+# Copyright (c) 2023 FIT-Project
+# SPDX-License-Identifier: GPL-3.0-only
+# -----
+######
+
+import hashlib
+import json
+import os
+import tempfile
+
+MANIFEST_SUFFIX = ".manifest.json"
+
+
+def get_manifest_filename(folder):
+    # the manifest is kept out of the acquisition directory, it's not
+    # evidence and must not be hashed, zipped or listed in the report
+    digest = hashlib.sha256(os.path.abspath(folder).encode("utf-8")).hexdigest()
+    return os.path.join(tempfile.gettempdir(), "fit-" + digest[:32] + MANIFEST_SUFFIX)
+
+
+def hash_report_messages(name, record):
+    return [
+        name,
+        "=========================================================",
+        f"Size: {record['size']}",
+        f"MD5: {record['hashes']['md5']}\n",
+        f"SHA-1: {record['hashes']['sha1']}\n",
+        f"SHA-256: {record['hashes']['sha256']}\n",
+    ]
+
+
+class AcquisitionManifest:
+    """Record of the artifacts produced by an acquisition.
+
+    Each artifact is stored with its path relative to the acquisition
+    directory, size, mtime and the digests already computed for it, so the
+    post acquisition tasks don't need to read the same file again.
+    A record is discarded as soon as size or mtime of the file change.
+    The manifest is saved in the temporary directory and removed at the end
+    of the post acquisition.
+    """
+
+    def __init__(self, folder, filename=None):
+        self.folder = folder
+        self.filename = filename or get_manifest_filename(folder)
+        self.artifacts = dict()
+        self.hash_report = list()
+        self.load()
+
+    def load(self):
+        if os.path.isfile(self.filename):
+            try:
+                with open(self.filename, "r") as f:
+                    manifest = json.load(f)
+                self.artifacts = manifest.get("artifacts", dict())
+                self.hash_report = manifest.get("hash_report", list())
+            except (OSError, ValueError):
+                self.artifacts = dict()
+                self.hash_report = list()
+
+    def save(self):
+        with open(self.filename, "w") as f:
+            json.dump(
+                {"artifacts": self.artifacts, "hash_report": self.hash_report},
+                f,
+                indent=4,
+            )
+
+    def remove(self):
+        try:
+            os.remove(self.filename)
+        except FileNotFoundError:
+            pass
+
+    def add(self, path, hashes=None, members=None):
+        name = self.__get_name(path)
+        file_stats = os.stat(self.__get_path(name))
+
+        record = self.artifacts.get(name)
+        if not self.__is_valid(record, file_stats):
+            record = {"hashes": dict()}
+
+        record["path"] = name
+        record["size"] = file_stats.st_size
+        record["mtime"] = file_stats.st_mtime
+        if hashes:
+            record["hashes"].update(hashes)
+        if members is not None:
+            record["members"] = members
+
+        self.artifacts[name] = record
+
+        return record
+
+    def get(self, path):
+        name = self.__get_name(path)
+        record = self.artifacts.get(name)
+        if record is None:
+            return None
+
+        try:
+            file_stats = os.stat(self.__get_path(name))
+        except OSError:
+            file_stats = None
+
+        if not self.__is_valid(record, file_stats):
+            self.artifacts.pop(name)
+            return None
+
+        return record
+
+    def get_hashes(self, path, algorithms):
+        record = self.get(path)
+        if record is None:
+            return None
+
+        if not all(algorithm in record["hashes"] for algorithm in algorithms):
+            return None
+
+        return {algorithm: record["hashes"][algorithm] for algorithm in algorithms}
+
+    def get_hash_report_messages(self):
+        messages = list()
+        for name in self.hash_report:
+            record = self.get(name)
+            if record is None:
+                return None
+            messages += hash_report_messages(name, record)
+        return messages
+
+    def __get_name(self, path):
+        return os.path.relpath(os.path.join(self.folder, path), self.folder)
+
+    def __get_path(self, name):
+        return os.path.join(self.folder, name)
+
+    def __is_valid(self, record, file_stats):
+        return (
+            record is not None
+            and file_stats is not None
+            and record.get("size") == file_stats.st_size
+            and record.get("mtime") == file_stats.st_mtime
+        )
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+######
+# -----
+# Copyright (c) 2023 FIT-Project
+# SPDX-License-Identifier: GPL-3.0-only
+# -----
+######
+
+import struct
+import zlib
+
+import numpy as np
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# color type 2 (RGB) with 8 bits per channel
+PNG_COLOR_TYPE_RGB = 2
+# "Up" filter, rows of a screenshot are very similar to the previous one
+PNG_FILTER_UP = 2
+IDAT_MAX_SIZE = 1024 * 1024
+
+
+class PngStitcher:
+    """Stitch image parts vertically directly into a PNG file.
+
+    Every part is filtered and compressed as soon as it's appended, so only
+    one part at a time is kept in memory whatever the final height is.
+    The PNG header is rewritten with the real height when the stitcher is
+    closed.
+    """
+
+    def __init__(self, filename, width):
+        self.filename = filename
+        self.width = width
+        self.height = 0
+        self.previous_row = np.zeros((1, width * 3), dtype=np.uint8)
+        self.compressor = zlib.compressobj(6)
+        self.buffer = bytearray()
+
+        self.fp = open(filename, "wb")
+        self.fp.write(PNG_SIGNATURE)
+        self.__write_header()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def append(self, rows):
+        # rows is a (height, width, 3) RGB array, wider parts are cropped
+        # and narrower parts are padded with white
+        if rows.shape[0] == 0:
+            return
+
+        rows = rows[:, : self.width, :3]
+        if rows.shape[1] < self.width:
+            padding = np.full(
+                (rows.shape[0], self.width - rows.shape[1], 3), 255, dtype=np.uint8
+            )
+            rows = np.concatenate((rows, padding), axis=1)
+
+        rows = np.ascontiguousarray(rows, dtype=np.uint8).reshape(rows.shape[0], -1)
+
+        # Up filter: each byte minus the byte above it (modulo 256)
+        previous_rows = np.concatenate((self.previous_row, rows[:-1]))
+        filtered = np.empty((rows.shape[0], rows.shape[1] + 1), dtype=np.uint8)
+        filtered[:, 0] = PNG_FILTER_UP
+        np.subtract(rows, previous_rows, out=filtered[:, 1:])
+
+        self.previous_row = rows[-1:].copy()
+        self.height += rows.shape[0]
+
+        self.buffer += self.compressor.compress(filtered.tobytes())
+        if len(self.buffer) >= IDAT_MAX_SIZE:
+            self.__write_chunk(b"IDAT", bytes(self.buffer))
+            self.buffer = bytearray()
+
+    def close(self):
+        if self.fp.closed:
+            return
+
+        self.buffer += self.compressor.flush()
+        self.__write_chunk(b"IDAT", bytes(self.buffer))
+        self.buffer = bytearray()
+        self.__write_chunk(b"IEND", b"")
+
+        # IHDR is always right after the signature
+        self.fp.seek(len(PNG_SIGNATURE))
+        self.__write_header()
+        self.fp.close()
+
+    def __write_header(self):
+        self.__write_chunk(
+            b"IHDR",
+            struct.pack(
+                ">IIBBBBB", self.width, self.height, 8, PNG_COLOR_TYPE_RGB, 0, 0, 0
+            ),
+        )
+
+    def __write_chunk(self, chunk_type, data):
+        self.fp.write(struct.pack(">I", len(data)))
+        self.fp.write(chunk_type)
+        self.fp.write(data)
+        self.fp.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(chunk_type))))
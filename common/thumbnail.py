@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+######
+# -----
+# Copyright (c) 2023 FIT-Project
+# SPDX-License-Identifier: GPL-3.0-only
+# -----
+######
+
+import os
+import struct
+import zlib
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from common.utility import calculate_hash
+
+# A4 content frame of the report templates is about 445x692pt,
+# these sizes keep the text readable without embedding the original resolution
+MAX_WIDTH = 1000
+MAX_TILE_HEIGHT = 1400
+JPEG_QUALITY = 85
+# images up to this size are decoded at once, larger png (e.g. the full page
+# screenshot) are decoded a strip at a time
+MAX_IMAGE_PIXELS = 25000000
+# bytes inflated at a time from the png data
+INFLATE_SIZE = 1024 * 1024
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# color type -> channels of the 8 bit png read by strips
+PNG_COLOR_TYPES = {0: 1, 2: 3, 4: 2, 6: 4}
+
+# the image can't be downscaled, the report only links it
+THUMBNAIL_ERRORS = (
+    Image.DecompressionBombError,
+    OSError,
+    ValueError,
+    struct.error,
+    zlib.error,
+)
+
+THUMBNAILS_FOLDER = "thumbnails"
+
+
+def create_thumbnails(
+    filename,
+    thumbnails_directory=None,
+    max_width=MAX_WIDTH,
+    max_tile_height=MAX_TILE_HEIGHT,
+):
+    """Downscale an image to max_width and split it in tiles of at most
+    max_tile_height pixels, so each tile fits a report page.
+
+    Tiles are cached in thumbnails_directory (by default a "thumbnails"
+    folder next to the original) and named with the SHA-256 of the original,
+    so an image is processed only once. The image is read a tile at a time
+    when it's too large to be decoded at once. If it can't be read no tile
+    is returned.
+    """
+    if thumbnails_directory is None:
+        thumbnails_directory = os.path.join(
+            os.path.dirname(filename), THUMBNAILS_FOLDER
+        )
+
+    digest = calculate_hash(filename, "sha256")
+    prefix = "{}_{}x{}".format(digest, max_width, max_tile_height)
+
+    tiles = _get_cached_tiles(thumbnails_directory, prefix)
+    if tiles:
+        return tiles
+
+    os.makedirs(thumbnails_directory, exist_ok=True)
+
+    tiles = []
+    try:
+        for part, tile in enumerate(_get_strips(filename, max_width, max_tile_height)):
+            width, height = tile.size
+            if width > max_width:
+                height = max(1, round(height * max_width / width))
+                tile = tile.resize((max_width, height), Image.Resampling.LANCZOS)
+            tile_filename = os.path.join(
+                thumbnails_directory, "{}_{}.jpg".format(prefix, part)
+            )
+            tile.save(tile_filename, "JPEG", quality=JPEG_QUALITY, optimize=True)
+            tiles.append(tile_filename)
+    except THUMBNAIL_ERRORS:
+        return []
+
+    _save_tiles_index(thumbnails_directory, prefix, tiles)
+
+    return tiles
+
+
+def create_thumbnails_of_images(filenames, thumbnails_directory=None, max_workers=None):
+    # Pillow releases the GIL while decoding, resizing and encoding
+    if max_workers is None:
+        max_workers = min(4, os.cpu_count() or 1)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(
+            lambda filename: create_thumbnails(filename, thumbnails_directory),
+            filenames,
+        )
+        return dict(zip(filenames, results))
+
+
+def _get_strips(filename, max_width, max_tile_height):
+    # yields the parts of the original image that become a tile each
+    with open(filename, "rb") as f:
+        header = _read_png_header(f)
+        if header is not None and header[0] * header[1] > MAX_IMAGE_PIXELS:
+            yield from _get_png_strips(f, header, max_width, max_tile_height)
+            return
+
+    with Image.open(filename) as image:
+        width, height = image.size
+        if width * height > MAX_IMAGE_PIXELS:
+            raise Image.DecompressionBombError(
+                "{}x{} image is too large".format(width, height)
+            )
+        image = image.convert("RGB")
+        strip_height = _get_strip_height(width, max_width, max_tile_height)
+        for top in range(0, height, strip_height):
+            yield image.crop((0, top, width, min(top + strip_height, height)))
+
+
+def _get_strip_height(width, max_width, max_tile_height):
+    if width <= max_width:
+        return max_tile_height
+    return max(1, int(max_tile_height * width / max_width))
+
+
+def _read_png_header(f):
+    # returns width, height, bit depth, color type and interlace of a png
+    if f.read(len(PNG_SIGNATURE)) != PNG_SIGNATURE:
+        return None
+    length, chunk_type = struct.unpack(">I4s", f.read(8))
+    if chunk_type != b"IHDR" or length != 13:
+        raise ValueError("png without IHDR")
+    width, height, bit_depth, color_type, _, _, interlace = struct.unpack(
+        ">IIBBBBB", f.read(length)
+    )
+    f.read(4)
+    return width, height, bit_depth, color_type, interlace
+
+
+def _get_png_idat(f):
+    while True:
+        length, chunk_type = struct.unpack(">I4s", f.read(8))
+        if chunk_type == b"IEND":
+            return
+        if chunk_type == b"IDAT":
+            while length > 0:
+                data = f.read(min(length, INFLATE_SIZE))
+                if not data:
+                    raise ValueError("truncated png")
+                length -= len(data)
+                yield data
+            f.read(4)
+        else:
+            f.seek(length + 4, os.SEEK_CUR)
+
+
+def _get_png_strips(f, header, max_width, max_tile_height):
+    # only the 8 bit non interlaced png with the filters used by PngStitcher
+    # (None, Sub and Up) are read, rows are unfiltered one at a time
+    width, height, bit_depth, color_type, interlace = header
+    if bit_depth != 8 or interlace or color_type not in PNG_COLOR_TYPES:
+        raise ValueError("png format not supported")
+    channels = PNG_COLOR_TYPES[color_type]
+    stride = width * channels
+    strip_height = _get_strip_height(width, max_width, max_tile_height)
+
+    strip = np.empty((strip_height, stride), dtype=np.uint8)
+    previous = np.zeros(stride, dtype=np.uint8)
+    rows = 0
+    read_rows = 0
+    buffer = bytearray()
+    decompressor = zlib.decompressobj()
+
+    for data in _get_png_idat(f):
+        while data and read_rows < height:
+            # the output is bounded, a small chunk can inflate a lot
+            buffer += decompressor.decompress(data, INFLATE_SIZE)
+            data = decompressor.unconsumed_tail
+
+            count = min(len(buffer) // (stride + 1), height - read_rows)
+            filtered = np.frombuffer(bytes(buffer[: count * (stride + 1)]), np.uint8)
+            del buffer[: count * (stride + 1)]
+            for row in filtered.reshape(count, stride + 1):
+                previous = strip[rows] = _unfilter(row[0], row[1:], previous, channels)
+                rows += 1
+                read_rows += 1
+                if rows == strip_height:
+                    yield _get_strip_image(strip[:rows], width, channels)
+                    rows = 0
+
+    if read_rows < height:
+        raise ValueError("truncated png")
+    if rows > 0:
+        yield _get_strip_image(strip[:rows], width, channels)
+
+
+def _unfilter(filter_type, row, previous, channels):
+    if filter_type == 0:
+        return row
+    if filter_type == 1:
+        # uint8 sums wrap around like the png filter
+        pixels = row.reshape(-1, channels)
+        return np.cumsum(pixels, axis=0, dtype=np.uint8).reshape(-1)
+    if filter_type == 2:
+        return row + previous
+    raise ValueError("png filter {} not supported".format(filter_type))
+
+
+def _get_strip_image(rows, width, channels):
+    shape = (len(rows), width) if channels == 1 else (len(rows), width, channels)
+    return Image.fromarray(rows.reshape(shape)).convert("RGB")
+
+
+def _get_cached_tiles(thumbnails_directory, prefix):
+    # the index is written only when all the tiles are saved, so an
+    # interrupted run is not reused
+    index = os.path.join(thumbnails_directory, prefix + ".tiles")
+    if not os.path.isfile(index):
+        return []
+
+    with open(index, "r") as f:
+        tiles = [
+            os.path.join(thumbnails_directory, line.strip())
+            for line in f
+            if line.strip()
+        ]
+
+    if not all(os.path.isfile(tile) for tile in tiles):
+        return []
+
+    return tiles
+
+
+def _save_tiles_index(thumbnails_directory, prefix, tiles):
+    with open(os.path.join(thumbnails_directory, prefix + ".tiles"), "w") as f:
+        for tile in tiles:
+            f.write(os.path.basename(tile) + "\n")
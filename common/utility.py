@@ -149,12 +149,22 @@ def is_there_a_new_portable_version():
 
 
 def calculate_hash(filename, algorithm):
-    with open(filename, "rb") as f:
-        file_hash = hashlib.new(algorithm)
-        while chunk := f.read(8192):
-            file_hash.update(chunk)
+    return calculate_hashes(filename, [algorithm])[algorithm]
 
-        return file_hash.hexdigest()
+
+def calculate_hashes(filename, algorithms, buffer_size=1024 * 1024):
+    # read the file only once and feed every requested digest with the same chunk
+    hashes = {algorithm: hashlib.new(algorithm) for algorithm in algorithms}
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+
+    with open(filename, "rb", buffering=0) as f:
+        while size := f.readinto(buffer):
+            chunk = view[:size]
+            for file_hash in hashes.values():
+                file_hash.update(chunk)
+
+    return {algorithm: file_hash.hexdigest() for algorithm, file_hash in hashes.items()}
 
 
 def get_ntp_date_and_time(server):
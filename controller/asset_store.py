@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+######
+# -----
+# Copyright (c) 2023 FIT-Project
+# SPDX-License-Identifier: GPL-3.0-only
+# -----
+######
+
+import hashlib
+import json
+import os
+import posixpath
+import re
+
+from urllib.parse import urlsplit
+
+ASSETS_FOLDER = "assets"
+INDEX_SUFFIX = "_index.json"
+
+# the extension of the url is kept so the saved pages open in a browser
+EXTENSION = re.compile(r"\.[a-z0-9]{1,8}")
+
+
+class AssetStore:
+    """Content addressed store of the resources of the acquired pages.
+
+    Every blob is saved once as assets/<aa>/<sha256><extension>, where aa
+    are the first two digits of its SHA-256, no matter how many pages or
+    urls it's found with. The urls of a page are mapped to their digests
+    by the page index. The store is not thread safe, it must be used by a
+    single thread.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        # digest -> path of the blob, relative to directory
+        self.blobs = {}
+
+    def add(self, content, url=None):
+        digest = hashlib.sha256(content).hexdigest()
+        if digest not in self.blobs:
+            path = posixpath.join(
+                ASSETS_FOLDER, digest[:2], digest + self.__get_extension(url)
+            )
+            full_path = os.path.join(self.directory, path)
+            if not os.path.exists(full_path):
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                with open(full_path, "wb") as f:
+                    f.write(content)
+            self.blobs[digest] = path
+        return digest
+
+    def get_path(self, digest):
+        return self.blobs.get(digest)
+
+    def write_index(self, name, url, digest, resources):
+        # resources maps each url to its digest, None if it wasn't saved
+        index = {
+            "url": url,
+            "sha256": digest,
+            "path": self.get_path(digest),
+            "resources": {
+                resource_url: (
+                    None
+                    if resource_digest is None
+                    else {
+                        "sha256": resource_digest,
+                        "path": self.get_path(resource_digest),
+                    }
+                )
+                for resource_url, resource_digest in sorted(resources.items())
+            },
+        }
+        with open(
+            os.path.join(self.directory, name + INDEX_SUFFIX), "w", encoding="utf-8"
+        ) as f:
+            json.dump(index, f, indent=2)
+
+    def __get_extension(self, url):
+        if url is None:
+            return ""
+        extension = posixpath.splitext(urlsplit(url).path)[1].lower()
+        if EXTENSION.fullmatch(extension):
+            return extension
+        return ""
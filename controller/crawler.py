@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+######
+# -----
+# Copyright (c) 2023 FIT-Project
+# SPDX-License-Identifier: GPL-3.0-only
+# -----
+######
+
+import hashlib
+import math
+import posixpath
+import re
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import (
+    parse_qsl,
+    urldefrag,
+    urlencode,
+    urljoin,
+    urlsplit,
+    urlunsplit,
+)
+from urllib.robotparser import RobotFileParser
+
+import lxml.etree
+import lxml.html
+import requests
+
+CRAWL_MAX_DEPTH = 5
+CRAWL_MAX_PAGES = 5000
+CRAWL_WORKERS = 4
+CRAWL_TIMEOUT = 30
+# above this number of pages the visited urls are kept in a Bloom filter
+BLOOM_FILTER_THRESHOLD = 100000
+BLOOM_FILTER_ERROR_RATE = 0.0001
+
+# resources that are listed but never fetched looking for links
+NOT_HTML_EXTENSIONS = {
+    ".7z",
+    ".avi",
+    ".bmp",
+    ".css",
+    ".csv",
+    ".doc",
+    ".docx",
+    ".gif",
+    ".gz",
+    ".ico",
+    ".jpeg",
+    ".jpg",
+    ".js",
+    ".json",
+    ".m4a",
+    ".mkv",
+    ".mov",
+    ".mp3",
+    ".mp4",
+    ".ogg",
+    ".pdf",
+    ".png",
+    ".ppt",
+    ".pptx",
+    ".rar",
+    ".svg",
+    ".tar",
+    ".tgz",
+    ".txt",
+    ".webm",
+    ".webp",
+    ".woff",
+    ".woff2",
+    ".xls",
+    ".xlsx",
+    ".xml",
+    ".zip",
+}
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonicalize_url(url):
+    # lowercase scheme and host, no default port, no fragment, no dot
+    # segments and sorted query parameters; only used to compare urls, the
+    # request could be different for the server
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or "").lower()
+    if parts.port is not None and parts.port != DEFAULT_PORTS.get(scheme):
+        netloc += ":{}".format(parts.port)
+    if parts.username:
+        netloc = "{}@{}".format(parts.username, netloc)
+
+    path = parts.path or "/"
+    if "/." in path:
+        is_directory = path.endswith(("/", "/.", "/.."))
+        path = posixpath.normpath(path)
+        if is_directory and not path.endswith("/"):
+            path += "/"
+    path = re.sub(r"/{2,}", "/", path)
+
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def get_url_key(url):
+    # /page and /page/ are the same page for the crawler
+    url = canonicalize_url(url)
+    parts = urlsplit(url)
+    if len(parts.path) > 1 and parts.path.endswith("/"):
+        url = urlunsplit(parts._replace(path=parts.path.rstrip("/")))
+    return url
+
+
+class BloomFilter:
+    """Fixed size set of strings with false positives and no false negatives."""
+
+    def __init__(self, capacity, error_rate=BLOOM_FILTER_ERROR_RATE):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def __positions(self, key):
+        # double hashing on the two halves of a single digest
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def __contains__(self, key):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self.__positions(key)
+        )
+
+    def add(self, key):
+        for position in self.__positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+
+class Crawler:
+    """Breadth first crawler of a website.
+
+    Starting from start_url, the pages of the same origin whose path is
+    under the directory of start_url are fetched level by level, up to
+    max_depth links away and max_pages pages. URLs are compared in their
+    canonical form but returned as linked by the pages, without fragment,
+    and the disallowed ones for the user agent in robots.txt are skipped.
+    on_urls(urls) receives every group of new urls as soon as they're
+    found, the crawl returns all of them.
+    """
+
+    def __init__(
+        self,
+        start_url,
+        headers=None,
+        max_depth=CRAWL_MAX_DEPTH,
+        max_pages=CRAWL_MAX_PAGES,
+        workers=CRAWL_WORKERS,
+        respect_robots=True,
+        on_urls=None,
+    ):
+        self.start_url = urldefrag(start_url.strip())[0]
+        self.headers = headers or {}
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.workers = workers
+        self.respect_robots = respect_robots
+        self.on_urls = on_urls
+
+        self.__set_scope(canonicalize_url(self.start_url))
+
+        if max_pages is None or max_pages > BLOOM_FILTER_THRESHOLD:
+            self.seen = BloomFilter(max(max_pages or 0, BLOOM_FILTER_THRESHOLD) * 10)
+        else:
+            self.seen = set()
+        self.lock = threading.Lock()
+        self.robots = None
+        self.pages = 0
+
+    def is_in_scope(self, url):
+        parts = urlsplit(canonicalize_url(url))
+        return (parts.scheme, parts.netloc) == self.origin and parts.path.startswith(
+            self.scope
+        )
+
+    def crawl(self):
+        with requests.Session() as session:
+            session.headers.update(self.headers)
+            self.session = session
+            self.__resolve_start_url()
+            self.__load_robots()
+
+            urls = []
+            level = self.__add_urls([self.start_url], urls)
+            depth = 0
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                while level and depth < self.max_depth:
+                    level = [url for url in level if self.__is_page(url)]
+                    if self.max_pages is not None:
+                        level = level[: max(0, self.max_pages - self.pages)]
+                    self.pages += len(level)
+
+                    next_level = []
+                    for links in executor.map(self.__get_links, level):
+                        next_level.extend(self.__add_urls(links, urls))
+                    level = next_level
+                    depth += 1
+
+        return urls
+
+    def __set_scope(self, url):
+        start = urlsplit(url)
+        self.origin = (start.scheme, start.netloc)
+        self.scope = start.path[: start.path.rfind("/") + 1]
+
+    def __resolve_start_url(self):
+        # the scope follows the redirects of the start url, e.g. to https
+        # or to the www host
+        try:
+            response = self.session.head(
+                self.start_url, allow_redirects=True, timeout=CRAWL_TIMEOUT
+            )
+        except requests.RequestException:
+            return
+        if response.ok:
+            self.start_url = urldefrag(response.url)[0]
+            self.__set_scope(canonicalize_url(self.start_url))
+
+    def __add_urls(self, links, urls):
+        new_urls = []
+        with self.lock:
+            for link in links:
+                url = urldefrag(link)[0]
+                key = get_url_key(url)
+                if key in self.seen or not self.is_in_scope(url):
+                    continue
+                if not self.__is_allowed(url):
+                    continue
+                self.seen.add(key)
+                new_urls.append(url)
+
+        if new_urls:
+            urls.extend(new_urls)
+            if self.on_urls is not None:
+                self.on_urls(new_urls)
+        return new_urls
+
+    def __is_page(self, url):
+        extension = posixpath.splitext(urlsplit(url).path)[1].lower()
+        return extension not in NOT_HTML_EXTENSIONS
+
+    def __get_links(self, url):
+        try:
+            with self.session.get(url, stream=True, timeout=CRAWL_TIMEOUT) as response:
+                content_type = response.headers.get("content-type", "")
+                if response.status_code != 200 or "html" not in content_type:
+                    return []
+                content = response.content
+                base_url = response.url
+        except requests.RequestException:
+            return []
+
+        try:
+            document = lxml.html.fromstring(content)
+        except (lxml.etree.ParserError, ValueError):
+            return []
+
+        base = document.find(".//base[@href]")
+        if base is not None:
+            base_url = urljoin(base_url, base.get("href"))
+
+        links = []
+        for element in document.iter("a", "area"):
+            href = (element.get("href") or "").strip()
+            if not href or href.startswith("#"):
+                continue
+            link = urljoin(base_url, href)
+            if urlsplit(link).scheme in DEFAULT_PORTS:
+                links.append(link)
+        return links
+
+    def __load_robots(self):
+        if not self.respect_robots:
+            return
+        robots_url = urlunsplit(self.origin + ("/robots.txt", "", ""))
+        try:
+            response = self.session.get(robots_url, timeout=CRAWL_TIMEOUT)
+        except requests.RequestException:
+            return
+        if response.status_code == 200:
+            self.robots = RobotFileParser(robots_url)
+            self.robots.parse(response.text.splitlines())
+
+    def __is_allowed(self, url):
+        if self.robots is None:
+            return True
+        return self.robots.can_fetch(self.headers.get("User-Agent", "*"), url)
@@ -9,25 +9,60 @@
 import hashlib
 import os
 import shutil
-from urllib.parse import urljoin
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 
+from controller.crawler import Crawler
+from controller.sitemap import SitemapParser
 from controller.configurations.tabs.general.general import (
     General as GeneralConfigurationController,
 )
 from common.utility import get_version
 
+DOWNLOAD_WORKERS = 8
+# concurrent requests and seconds between two requests to the same host
+MAX_CONNECTIONS_PER_HOST = 4
+POLITENESS_DELAY = 0.25
+DOWNLOAD_RETRIES = 3
+DOWNLOAD_TIMEOUT = 30
+# responses worth another try, the others are saved by the proxy as they are
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class _Host:
+    # connections and politeness delay of a single host
+    def __init__(self, max_connections):
+        self.connections = threading.BoundedSemaphore(max_connections)
+        self.lock = threading.Lock()
+        self.next_request = 0
+
+    def wait_turn(self, delay):
+        with self.lock:
+            now = time.monotonic()
+            wait = max(0, self.next_request - now)
+            self.next_request = now + wait + delay
+        if wait > 0:
+            time.sleep(wait)
+
 
 class EntireWebsite:
     def __init__(self):
         self.url = None
         self.load_type = "load_from_domain"
+        self.lastmod_since = None
         self.acquisition_dir = None
         user_agent = GeneralConfigurationController().configuration.get("user_agent")
         user_agent + " FreezingInternetTool/" + get_version()
         self.headers = {"User-Agent": user_agent}
+        self.proxy_dict = {}
+        self.session = None
+        self.pool_size = None
 
     def set_url(self, url):
         self.url = url
@@ -35,6 +70,10 @@ class EntireWebsite:
     def set_load_type(self, load_type):
         self.load_type = load_type
 
+    def set_lastmod_since(self, lastmod_since):
+        # YYYY-MM-DD, sitemap urls modified before are skipped
+        self.lastmod_since = lastmod_since
+
     def is_valid_url(self, url):
         requests.get(url, headers=self.headers)
 
@@ -46,69 +85,118 @@ class EntireWebsite:
             "http": f"http://127.0.0.1:{port}",
             "https": f"http://127.0.0.1:{port}",
         }
+        # the session is bound to the proxy
+        self.close()
 
     def download(self, url):
-        requests.get(url, proxies=self.proxy_dict, verify=False, headers=self.headers)
-
-    def get_sitemap(self):
-        urls = set()
+        # the proxy saves the response, the body is only read through
+        with self.__get_session().get(
+            url, stream=True, timeout=DOWNLOAD_TIMEOUT
+        ) as response:
+            for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                pass
+        return response
+
+    def download_urls(
+        self,
+        urls,
+        progress=None,
+        workers=DOWNLOAD_WORKERS,
+        max_connections_per_host=MAX_CONNECTIONS_PER_HOST,
+        politeness_delay=POLITENESS_DELAY,
+        retries=DOWNLOAD_RETRIES,
+    ):
+        """Download urls through the proxy on a pool of workers.
+
+        All the workers share a keep-alive session. Requests to the same
+        host are limited to max_connections_per_host at a time and spaced
+        by politeness_delay seconds; connection errors and the status codes
+        in RETRY_STATUS_CODES are retried with an exponential backoff.
+        progress(url, error) is called as soon as each url is done, error
+        is None on success. Returns the downloaded urls in input order.
+        """
+        self.__get_session(workers)
+        self.hosts = {}
+        self.hosts_lock = threading.Lock()
+        self.max_connections_per_host = max_connections_per_host
+        self.politeness_delay = politeness_delay
+        self.retries = retries
+        self.progress = progress
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(self.__fetch, urls))
+
+        return [url for url, is_downloaded in zip(urls, results) if is_downloaded]
+
+    def close(self):
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
+    def __get_host(self, url):
+        netloc = urlsplit(url).netloc
+        with self.hosts_lock:
+            if netloc not in self.hosts:
+                self.hosts[netloc] = _Host(self.max_connections_per_host)
+            return self.hosts[netloc]
+
+    def __fetch(self, url):
+        host = self.__get_host(url)
+        error = None
+        # the first attempt isn't a retry, it's always made
+        for attempt in range(max(1, self.retries + 1)):
+            if attempt > 0:
+                time.sleep(2 ** (attempt - 1))
+            with host.connections:
+                host.wait_turn(self.politeness_delay)
+                try:
+                    response = self.download(url)
+                except requests.RequestException as e:
+                    error = e
+                    continue
+            if response.status_code not in RETRY_STATUS_CODES:
+                error = None
+                break
+            error = requests.HTTPError(
+                "{} {}".format(response.status_code, response.reason)
+            )
+
+        if self.progress is not None:
+            self.progress(url, error)
+        return error is None
+
+    def __get_session(self, pool_size=None):
+        if self.session is None:
+            self.session = requests.Session()
+            self.session.headers.update(self.headers)
+            self.session.proxies.update(self.proxy_dict)
+            self.session.verify = False
+            self.pool_size = None
+        # a pool smaller than the workers would drop the keep-alive connections
+        pool_size = pool_size or self.pool_size or DOWNLOAD_WORKERS
+        if self.pool_size != pool_size:
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+            self.pool_size = pool_size
+        return self.session
+
+    def get_sitemap(self, on_urls=None):
+        # the urls are sent to on_urls while they're found, the number of
+        # urls is returned
+        urls_count = 0
 
         if self.load_type == "load_from_domain":
-            # check if /sitemap exists
-            sitemap_candidate = self.url + "/sitemap/"
-            response = requests.get(sitemap_candidate, headers=self.headers)
-            if response.status_code == 200 and "text/html" in response.headers.get(
-                "content-type"
-            ):
-                urls = self.__crawl_links(response)
-
-            else:  # else, search for sitemap link inside the html
-                response = requests.get(self.url, headers=self.headers)
-                if response.status_code == 200 and "text/html" in response.headers.get(
-                    "content-type"
-                ):
-                    soup = BeautifulSoup(response.content, "html.parser")
-                    sitemaps = soup.find_all("link", rel="sitemap")
-                    if sitemaps:
-                        for sitemap in sitemaps:
-                            response = requests.get(
-                                sitemap["href"], headers=self.headers
-                            )
-                            if response.status_code == 200:
-                                urls = self.__crawl_links(response)
-                    else:
-                        # crawl manually from the url
-                        urls = self.__crawl_links(response)
+            # crawl the website following the links from the url
+            urls_count = len(
+                Crawler(self.url, headers=self.headers, on_urls=on_urls).crawl()
+            )
 
         elif self.load_type == "load_from_sitemap":
-            urls = self.__parse_sitemap(self.url)
-
-        return urls
-
-    def __crawl_links(self, response):
-        urls = set()
-        soup = BeautifulSoup(response.content, "html.parser")
-        anchor_tags = soup.find_all("a")
-        urls.add(self.url)
-        for tag in anchor_tags:
-            href = tag.get("href")
-            if href and not href.startswith("#"):
-                absolute_url = urljoin(self.url, href)
-                urls.add(absolute_url)
-        return urls
-
-    def __parse_sitemap(self, url):
-        urls = set()
-
-        response = requests.get(url, headers=self.headers)
-        if response.status_code == 200 and "text/xml" in response.headers.get(
-            "content-type"
-        ):
-            soup = BeautifulSoup(response.content, features="xml")
-            __urls = soup.findAll("url")
-
-            if __urls:
-                for u in __urls:
-                    urls.add(u.find("loc").string)
-
-        return urls
+            urls_count = SitemapParser(
+                headers=self.headers,
+                lastmod_since=self.lastmod_since,
+                on_urls=on_urls,
+            ).parse(self.url)
+
+        return urls_count
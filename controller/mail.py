@@ -12,14 +12,155 @@ import email
 import io
 import os
 import email.message
+import queue
 import re
+import sqlite3
+import ssl
 import sys
+import threading
 import time
 import locale
-import pyzmail
 
+from common.utility import calculate_hash
 from common.constants import error, details as Details, logger as Logger
 
+# messages requested with a single FETCH command
+FETCH_BATCH_SIZE = 250
+# header fields shown in the emails tree
+HEADER_FIELDS = "FROM TO DATE SUBJECT MESSAGE-ID"
+# Message-ID header with its folded lines
+MESSAGE_ID_HEADER = re.compile(rb"^message-id:(.*(?:\r?\n[ \t].*)*)", re.I | re.M)
+
+# messages used to estimate size and download time of the search results
+STATISTICS_SAMPLE_SIZE = 50
+# sampled messages downloaded to measure the throughput
+STATISTICS_THROUGHPUT_SAMPLE_SIZE = 5
+STATISTICS_THROUGHPUT_MAX_SIZE = 1024 * 1024
+
+# parallel download of the messages
+DOWNLOAD_CONNECTIONS = 4
+DOWNLOAD_BATCH_SIZE = 25
+DOWNLOAD_RETRIES = 3
+# downloaded messages waiting to be written on disk
+WRITE_QUEUE_SIZE = 100
+
+# downloaded messages, it allows to resume an interrupted download
+MAIL_INDEX_FILENAME = "mail_index.sqlite"
+MAIL_INDEX_COMMIT_SIZE = 100
+
+# errors of a connection dropped by the server
+CONNECTION_ERRORS = (imaplib.IMAP4.abort, OSError, ssl.SSLError, EOFError)
+
+
+def get_message_set(email_ids):
+    # compress consecutive ids in ranges, e.g. 1,2,3,7 -> 1:3,7
+    ranges = []
+    for email_id in sorted(int(email_id) for email_id in email_ids):
+        if ranges and email_id == ranges[-1][1] + 1:
+            ranges[-1][1] = email_id
+        else:
+            ranges.append([email_id, email_id])
+
+    return ",".join(
+        str(first) if first == last else "{}:{}".format(first, last)
+        for first, last in ranges
+    )
+
+
+def parse_sequence_set(sequence_set):
+    # expand a sequence set, e.g. 1:3,7 -> [1, 2, 3, 7]
+    uids = []
+    for part in sequence_set.split(","):
+        first, separator, last = part.partition(":")
+        if separator:
+            first, last = sorted((int(first), int(last)))
+            uids.extend(range(first, last + 1))
+        elif first:
+            uids.append(int(first))
+    return uids
+
+
+def parse_fetch_response(email_data):
+    # returns [(uid, data)] from a UID FETCH response: every message is a
+    # (b'<id> (UID <uid> ... {<size>}', data) tuple, some servers send the
+    # UID after the literal, e.g. b' UID <uid>)'; data is None if the
+    # message has no literal, e.g. b'<id> (UID <uid> FLAGS (...))'
+    messages = []
+    for i, response in enumerate(email_data):
+        if isinstance(response, tuple):
+            header, data = response
+        elif response and re.match(rb"\s*\d+ \(", response):
+            header, data = response, None
+        else:
+            continue
+
+        uid = re.search(rb"UID (\d+)", header)
+        if uid is None and i + 1 < len(email_data):
+            if isinstance(email_data[i + 1], bytes):
+                uid = re.search(rb"UID (\d+)", email_data[i + 1])
+        if uid is not None:
+            messages.append((int(uid.group(1)), data))
+    return messages
+
+
+def get_folder_stripped(folder):
+    return re.sub(r"[^a-zA-Z0-9]+", "-", folder)
+
+
+def get_imap_logs(mailbox):
+    logs_buffer = io.StringIO()
+    original_stderr = sys.stderr
+    sys.stderr = logs_buffer
+    mailbox.print_log()
+    sys.stderr = original_stderr
+    return logs_buffer.getvalue()
+
+
+def get_message_id(message_mail):
+    # scan only the header block, the body is never decoded
+    end = message_mail.find(b"\r\n\r\n")
+    if end == -1:
+        end = message_mail.find(b"\n\n")
+    headers = message_mail if end == -1 else message_mail[:end]
+
+    message_id = MESSAGE_ID_HEADER.search(headers)
+    if message_id is None:
+        return None
+
+    # unfold the header and drop the surrounding angle brackets
+    message_id = b" ".join(message_id.group(1).split()).strip(b"<>")
+    if not message_id:
+        return None
+    return message_id.decode("utf-8", errors="replace")
+
+
+def save_email(message_mail, folder_dir):
+    # the fetched bytes are written as they are, without parsing the message
+    sha256 = hashlib.sha256(message_mail).hexdigest()
+
+    message_id = get_message_id(message_mail)
+    if message_id is None:
+        # without a Message-ID the name is given by the content
+        filename = f"{sha256}.eml"
+    else:
+        sanitized_id = re.sub(r'[<>:"/\\|?*]', "", message_id)
+        md5_digest = hashlib.md5(sanitized_id.encode("utf-8")).hexdigest()
+        filename = f"{md5_digest}.eml"
+
+        email_path = os.path.join(folder_dir, filename)
+        if (
+            os.path.isfile(email_path)
+            and calculate_hash(email_path, "sha256") != sha256
+        ):
+            # another message with the same Message-ID, it is kept as well
+            filename = f"{md5_digest}_{sha256}.eml"
+
+    email_path = os.path.join(folder_dir, filename)
+    with open(email_path, "wb") as f:
+        f.write(message_mail)
+
+    return email_path, sha256
+
 
 class Mail:
     def __init__(self):
@@ -27,6 +168,9 @@ class Mail:
         self.password = None
         self.mailbox = None
         self.is_logged_in = False
+        self.capabilities = []
+        # UIDs found by the last search for each folder, reused by fetch_messages
+        self.searches = {}
         self.logs = ""
 
     def check_server(self, server, port):
@@ -44,6 +188,7 @@ class Mail:
             self.mailbox.login(self.email_address, self.password)
             self.mailbox.select()
             self.is_logged_in = True
+            self.__update_capabilities()
         except Exception as e:
             raise Exception(e)
 
@@ -58,31 +203,71 @@ class Mail:
         except Exception as e:
             raise Exception(e)
 
-    def get_search_statistics(self, search_criteria):
-        num_emails_test = (
-            1  # number of emails used to calculate the estimated fetching time
-        )
-        start_time = time.time()
-        self.mailbox.select(readonly=True)
-
-        stat, email_ids = self.mailbox.search(None, search_criteria)
-
-        emails = email_ids[0].split()
-        total_emails = len(emails)
-
-        selected_emails = email_ids[0].split()[:num_emails_test]
-
-        for email_id in selected_emails:
-            self.mailbox.fetch(email_id, "(BODY.PEEK[HEADER])")
-        end_time = time.time()
-        estimated_time = round(
-            ((end_time - start_time) * (total_emails / num_emails_test)) / 60, 2
-        )  # minutes
+    def get_search_statistics(
+        self, search_criteria, sample_size=STATISTICS_SAMPLE_SIZE
+    ):
+        # search every folder, then estimate the size of the found messages from
+        # a sample spread across folders and the download time from latency
+        # and throughput measured downloading a few of them
+        self.searches = {}
+        found_emails = []
+        for folder in self.get_folders():
+            try:
+                self.mailbox.select(folder, readonly=True)
+                uids = self.__search(search_criteria)
+            except:  # folder that can't be selected
+                continue
+            self.searches[(folder, search_criteria)] = uids
+            found_emails += [(folder, uid) for uid in uids]
+
+        total_emails = len(found_emails)
+        sample = {}
+        if total_emails > 0:
+            step = total_emails / min(sample_size, total_emails)
+            for i in range(min(sample_size, total_emails)):
+                folder, uid = found_emails[int(i * step)]
+                sample.setdefault(folder, []).append(uid)
+
+        sizes = []
+        latency = None
+        throughput = 0
+        for folder, uids in sample.items():
+            self.mailbox.select(folder, readonly=True)
+
+            start_time = time.perf_counter()
+            folder_sizes = self.__fetch_sizes(uids)
+            if latency is None:
+                # the reply to RFC822.SIZE is tiny, it's almost a round trip
+                latency = time.perf_counter() - start_time
+            sizes += folder_sizes.values()
+
+            if throughput == 0 and folder_sizes:
+                throughput = self.__measure_throughput(folder_sizes, latency)
+
+        average_size = sum(sizes) / len(sizes) if sizes else 0
+        total_bytes = int(average_size * total_emails)
+
+        # connections share the bandwidth, round trips run in parallel
+        estimated_time = 0
+        if throughput > 0:
+            batches = -(-total_emails // DOWNLOAD_BATCH_SIZE)
+            estimated_time = round(
+                (total_bytes / throughput + batches * latency / DOWNLOAD_CONNECTIONS)
+                / 60,
+                2,
+            )  # minutes
 
         self.__save_logs()
-        return {"estimated_time": estimated_time, "total_emails": total_emails}
-
-    def get_mails_from_every_folder(self, search_criteria):
+        return {
+            "estimated_time": estimated_time,
+            "total_emails": total_emails,
+            "total_bytes": total_bytes,
+            "average_size": int(average_size),
+            "throughput": int(throughput),
+            "latency": latency or 0,
+        }
+
+    def get_folders(self):
         # Retrieve every folder from the mailbox
         folders = []
         for folder in self.mailbox.list()[1]:
@@ -97,55 +282,145 @@ class Mail:
             if name is not None:
                 folders.append(name)
 
+        return folders
+
+    def get_mails_from_every_folder(self, search_criteria, callback=None):
         # Scrape every message from the folders
-        scraped_emails = self.fetch_messages(folders, search_criteria)
+        scraped_emails = self.fetch_messages(
+            self.get_folders(), search_criteria, callback
+        )
         self.__save_logs()
         return scraped_emails
 
-    def fetch_messages(self, folders, search_criteria=None):
+    def fetch_messages(self, folders, search_criteria=None, callback=None):
+        # returns {folder: [email]}, an email is a dict with the UID and the
+        # header fields; callback(folder, emails) is called after every batch,
+        # so found emails can be shown before the search is finished
         scraped_emails = {}
 
         for folder in folders:
             try:
                 self.mailbox.select(folder, readonly=True)
-                type, data = self.mailbox.search(None, search_criteria)
-
-                # Fetch every message in specified folder
-                messages = data[0].split()
-                for email_id in messages:
-                    status, email_data = self.mailbox.fetch(
-                        email_id, "BODY.PEEK[HEADER]"
-                    )  # fetch just the header to speed up the process
-                    email_part = email.message_from_bytes(email_data[0][1])
-
-                    # prepare data for the dict
-                    uid = str(email_id.decode("utf-8"))
-                    subject = email_part["subject"]
-                    date_str = str(email_part["date"])
-                    sender = email_part["from"]
-                    recipient = email_part["to"]
-                    dict_value = (
-                        "Mittente: "
-                        + sender
-                        + "\nDestinatario: "
-                        + recipient
-                        + "\nData: "
-                        + date_str
-                        + "\nOggetto: "
-                        + subject
-                        + "\nUID: "
-                        + uid
-                    )
-                    # add message to dict
-                    if folder in scraped_emails:
-                        scraped_emails[folder].append(dict_value)
-                    else:
-                        scraped_emails[folder] = [dict_value]
+                messages = self.searches.get((folder, search_criteria))
+                if messages is None:
+                    messages = self.__search(search_criteria)
+
+                # Fetch the headers of the messages in specified folder in batches
+                for i in range(0, len(messages), FETCH_BATCH_SIZE):
+                    emails = self.__fetch_headers(messages[i : i + FETCH_BATCH_SIZE])
+                    if not emails:
+                        continue
+
+                    # add messages to dict
+                    scraped_emails.setdefault(folder, []).extend(emails)
+                    if callback is not None:
+                        callback(folder, emails)
             except:  # no e-mails in the current folder
                 pass
         self.__save_logs()
         return scraped_emails
 
+    def __search(self, search_criteria):
+        # UIDs of the messages of the selected folder matching the criteria,
+        # sorted by date by the server when it supports SORT (RFC 5256)
+        search_criteria = search_criteria or "ALL"
+
+        if "SORT" in self.capabilities:
+            status, data = self.mailbox.uid("SORT", "(DATE)", "UTF-8", search_criteria)
+            return [int(uid) for uid in data[0].split()]
+
+        if "ESEARCH" in self.capabilities:
+            # the UIDs are returned as a compact sequence set (RFC 4731)
+            self.mailbox.uid("SEARCH", "RETURN (ALL)", search_criteria)
+            status, data = self.mailbox.response("ESEARCH")
+            if data and data[0] is not None:
+                match = re.search(rb" ALL (\S+)", data[-1])
+                return parse_sequence_set(match.group(1).decode()) if match else []
+
+        status, data = self.mailbox.uid("SEARCH", None, search_criteria)
+        return [int(uid) for uid in data[0].split()]
+
+    def __fetch_sizes(self, uids):
+        # {uid: size} of the messages, with a single FETCH command
+        status, email_data = self.mailbox.uid(
+            "FETCH", get_message_set(uids), "(RFC822.SIZE)"
+        )
+
+        sizes = {}
+        for response in email_data:
+            if isinstance(response, tuple):
+                response = response[0]
+            if not isinstance(response, bytes):
+                continue
+            uid = re.search(rb"UID (\d+)", response)
+            size = re.search(rb"RFC822\.SIZE (\d+)", response)
+            if uid is not None and size is not None:
+                sizes[int(uid.group(1))] = int(size.group(1))
+        return sizes
+
+    def __measure_throughput(self, sizes, latency):
+        # bytes per second downloading the sampled messages closest to the
+        # median size, without the round trip
+        median = sorted(sizes.values())[len(sizes) // 2]
+        uids = sorted(
+            (uid for uid in sizes if sizes[uid] <= STATISTICS_THROUGHPUT_MAX_SIZE),
+            key=lambda uid: abs(sizes[uid] - median),
+        )[:STATISTICS_THROUGHPUT_SAMPLE_SIZE]
+        if not uids:
+            return 0
+
+        start_time = time.perf_counter()
+        status, email_data = self.mailbox.uid(
+            "FETCH", get_message_set(uids), "(BODY.PEEK[])"
+        )
+        elapsed_time = time.perf_counter() - start_time - latency
+
+        downloaded_bytes = sum(
+            len(data) for uid, data in parse_fetch_response(email_data) if data
+        )
+        if downloaded_bytes == 0:
+            return 0
+        # a reply as fast as a round trip means a bandwidth too high to measure
+        return downloaded_bytes / max(elapsed_time, 0.001)
+
+    def __fetch_headers(self, uids):
+        status, email_data = self.mailbox.uid(
+            "FETCH",
+            get_message_set(uids),
+            "(BODY.PEEK[HEADER.FIELDS ({})])".format(HEADER_FIELDS),
+        )  # fetch just the needed header fields to speed up the process
+
+        emails = []
+        for uid, header in parse_fetch_response(email_data):
+            if header is None:
+                continue
+
+            email_part = email.message_from_bytes(header)
+            emails.append(
+                {
+                    "uid": uid,
+                    "from": str(email_part["from"]),
+                    "to": str(email_part["to"]),
+                    "date": str(email_part["date"]),
+                    "subject": str(email_part["subject"]),
+                    "message_id": str(email_part["message-id"]),
+                }
+            )
+
+        # keep the order of the search, the server replies in UID order
+        order = {uid: i for i, uid in enumerate(uids)}
+        emails.sort(key=lambda email: order.get(email["uid"], 0))
+
+        return emails
+
+    def __update_capabilities(self):
+        # the capabilities can change after the login
+        status, data = self.mailbox.capability()
+        if status == "OK" and data and data[-1]:
+            self.capabilities = data[-1].decode().upper().split()
+        else:
+            self.capabilities = list(self.mailbox.capabilities)
+
     def set_criteria(self, sender, recipient, subject, from_date, to_date):
         criteria = []
         if sender != "":
@@ -165,38 +440,8 @@ class Mail:
         params = " ".join(criteria)
         return params
 
-    def write_emails(self, email_id, mail_dir, folder_stripped, folder):
-        # Create mail folder
-        folder_dir = os.path.join(mail_dir, folder_stripped)
-        if not os.path.exists(folder_dir):
-            os.makedirs(folder_dir)
-        self.mailbox.select(folder, readonly=True)
-        try:
-            status, raw_email = self.mailbox.fetch(email_id, "(RFC822)")
-        except Exception as e:
-            print(e)
-        message_mail = raw_email[0][1]
-
-        message = pyzmail.PyzMessage.factory(message_mail)
-        sanitized_id = re.sub(r'[<>:"/\\|?*]', "", message.get("message-id")[1:-8])
-        md5_hash = hashlib.md5()
-        md5_hash.update(sanitized_id.encode("utf-8"))
-        md5_digest = md5_hash.hexdigest()
-        filename = f"{md5_digest}.eml"
-
-        email_path = os.path.join(folder_dir, filename)
-
-        with open(email_path, "wb") as f:
-            f.write(message.as_bytes())
-        self.__save_logs()
-
     def __save_logs(self):
-        logs_buffer = io.StringIO()
-        original_stderr = sys.stderr
-        sys.stderr = logs_buffer
-        self.mailbox.print_log()
-        self.logs = self.logs + "\n" + logs_buffer.getvalue()
-        sys.stderr = original_stderr
+        self.logs = self.logs + "\n" + get_imap_logs(self.mailbox)
 
     def write_logs(self, acquisition_directory):
         with open(os.path.join(acquisition_directory, "imap_logs.log"), "w") as f:
@@ -244,3 +489,366 @@ class Mail:
                 raise Exception(e)
         self.__save_logs()
 """
+
+
+class MailIndex:
+    """SQLite index of the downloaded messages.
+
+    Every message is recorded by folder, UIDVALIDITY and UID with the path
+    of its file, relative to the mail directory, and its SHA-256.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.uncommitted = 0
+        # written by the writer thread of the downloader
+        self.connection = sqlite3.connect(filename, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS emails ("
+            "folder TEXT NOT NULL, "
+            "uidvalidity INTEGER NOT NULL, "
+            "uid INTEGER NOT NULL, "
+            "path TEXT NOT NULL, "
+            "sha256 TEXT NOT NULL, "
+            "PRIMARY KEY (folder, uidvalidity, uid))"
+        )
+        self.connection.commit()
+
+    def get_emails(self):
+        return {
+            (folder, uidvalidity, uid): (path, sha256)
+            for folder, uidvalidity, uid, path, sha256 in self.connection.execute(
+                "SELECT folder, uidvalidity, uid, path, sha256 FROM emails"
+            )
+        }
+
+    def add(self, folder, uidvalidity, uid, path, sha256):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO emails VALUES (?, ?, ?, ?, ?)",
+            (folder, uidvalidity, uid, path, sha256),
+        )
+        self.uncommitted += 1
+        if self.uncommitted >= MAIL_INDEX_COMMIT_SIZE:
+            self.commit()
+
+    def commit(self):
+        self.connection.commit()
+        self.uncommitted = 0
+
+    def close(self):
+        self.commit()
+        self.connection.close()
+
+
+class MailDownloader:
+    """Download emails over a pool of authenticated IMAP connections.
+
+    The emails to download are split in batches of UIDs of the same folder.
+    Every connection takes the next batch, selects its folder only when it
+    differs from the one already selected and fetches the whole batch with
+    a single UID FETCH command. A writer thread saves the messages on disk while the
+    connections keep downloading. A dropped connection is opened again and
+    the batch is retried up to retries times. A connection that can't be
+    opened, e.g. beyond the limit of the server, leaves the pool and its
+    batch to the other connections, which keep working until no batch is
+    queued or in progress.
+    With a MailIndex, messages already downloaded whose file is unchanged
+    are skipped and every written message is added to the index.
+    """
+
+    def __init__(
+        self,
+        server,
+        port,
+        email_address,
+        password,
+        connections=DOWNLOAD_CONNECTIONS,
+        batch_size=DOWNLOAD_BATCH_SIZE,
+        retries=DOWNLOAD_RETRIES,
+        progress=None,
+    ):
+        self.server = server
+        self.port = int(port)
+        self.email_address = email_address
+        self.password = password
+        self.connections = connections
+        self.batch_size = batch_size
+        self.retries = retries
+        self.progress = progress
+
+        self.logs = ""
+        self.connection_stats = []
+        self.failed_emails = []
+        self.written_emails = 0
+        self.skipped_emails = 0
+
+    @property
+    def stats(self):
+        return {
+            "written": self.written_emails,
+            "skipped": self.skipped_emails,
+            "failed": len(self.failed_emails),
+            "connections": self.connection_stats,
+        }
+
+    def download(self, emails_to_download, mail_dir, index=None):
+        # emails_to_download is a {folder: [uid, ...]} dict
+        self.index = index
+        self.indexed_emails = index.get_emails() if index is not None else {}
+        self.jobs = queue.Queue()
+        for folder, uids in emails_to_download.items():
+            for i in range(0, len(uids), self.batch_size):
+                self.jobs.put((folder, uids[i : i + self.batch_size]))
+
+        self.mail_dir = mail_dir
+        self.messages = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        self.mailboxes = []
+        self.lock = threading.Lock()
+        self.write_error = None
+        self.connect_error = None
+        # batches taken by a connection and not done yet, a batch can be
+        # queued again until they're all done
+        self.batches_in_progress = 0
+        self.jobs_changed = threading.Condition()
+
+        writer = threading.Thread(target=self.__write)
+        writer.start()
+
+        workers = [
+            threading.Thread(target=self.__download, args=(index,))
+            for index in range(min(self.connections, self.jobs.qsize()))
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.messages.put(None)
+        writer.join()
+
+        for mailbox in self.mailboxes:
+            self.logs = self.logs + "\n" + get_imap_logs(mailbox)
+
+        if self.write_error is not None:
+            raise self.write_error
+
+        # connections that couldn't download anything
+        if not self.jobs.empty():
+            raise Exception(self.__get_error_message())
+
+        if self.failed_emails:
+            raise Exception(self.__get_error_message())
+
+    def __download(self, index):
+        stats = {"connection": index, "emails": 0, "bytes": 0, "seconds": 0.0}
+        with self.lock:
+            self.connection_stats.append(stats)
+
+        mailbox = None
+        selected_folder = None
+        try:
+            while (job := self.__get_job()) is not None:
+                folder, uids = job
+                messages = None
+
+                for attempt in range(self.retries + 1):
+                    is_connecting = mailbox is None
+                    try:
+                        if mailbox is None:
+                            mailbox = self.__connect()
+                            selected_folder = None
+                        is_connecting = False
+
+                        if folder != selected_folder:
+                            mailbox.select(folder, readonly=True)
+                            uidvalidity = self.__get_uidvalidity(mailbox)
+                            selected_folder = folder
+
+                        start_time = time.perf_counter()
+                        messages = self.__fetch(mailbox, folder, uidvalidity, uids)
+                        stats["seconds"] += time.perf_counter() - start_time
+                        break
+                    except CONNECTION_ERRORS as e:
+                        self.__close(mailbox)
+                        mailbox = None
+                        if attempt < self.retries:
+                            time.sleep(2**attempt)
+                        elif is_connecting:
+                            self.__leave_pool(job, e)
+                            return
+                        else:
+                            self.__add_failed(folder, uids, e)
+                    except imaplib.IMAP4.error as e:
+                        if is_connecting:
+                            # login refused, e.g. too many connections
+                            self.__leave_pool(job, e)
+                            return
+                        selected_folder = None
+                        self.__add_failed(folder, uids, e)
+                        break
+
+                if messages is not None:
+                    for uid in uids:
+                        if uid not in messages:
+                            self.__add_failed(folder, [uid], "not found")
+                            continue
+
+                        message_mail = messages[uid]
+                        if message_mail is None:
+                            # already downloaded
+                            continue
+
+                        stats["emails"] += 1
+                        stats["bytes"] += len(message_mail)
+                        self.messages.put((folder, uidvalidity, uid, message_mail))
+
+                self.__end_job()
+        finally:
+            self.__close(mailbox)
+
+    def __get_job(self):
+        # an empty queue isn't the end while other connections can still
+        # leave their batch
+        with self.jobs_changed:
+            while self.write_error is None:
+                try:
+                    job = self.jobs.get_nowait()
+                except queue.Empty:
+                    if self.batches_in_progress == 0:
+                        break
+                    self.jobs_changed.wait()
+                    continue
+                self.batches_in_progress += 1
+                return job
+            return None
+
+    def __end_job(self):
+        with self.jobs_changed:
+            self.batches_in_progress -= 1
+            self.jobs_changed.notify_all()
+
+    def __leave_pool(self, job, error):
+        # the batch goes back to the queue, when no connection is left it's
+        # reported as failed with this error
+        with self.jobs_changed:
+            self.connect_error = error
+            self.jobs.put(job)
+            self.batches_in_progress -= 1
+            self.jobs_changed.notify_all()
+
+    def __connect(self):
+        mailbox = imaplib.IMAP4_SSL(self.server, self.port)
+        with self.lock:
+            self.mailboxes.append(mailbox)
+        try:
+            mailbox.login(self.email_address, self.password)
+        except Exception:
+            self.__close(mailbox)
+            raise
+        return mailbox
+
+    def __close(self, mailbox):
+        if mailbox is None:
+            return
+        try:
+            mailbox.logout()
+        except Exception:
+            # logout doesn't close the socket when LOGOUT fails
+            try:
+                mailbox.shutdown()
+            except Exception:
+                pass
+
+    def __get_uidvalidity(self, mailbox):
+        status, data = mailbox.response("UIDVALIDITY")
+        if not data or data[0] is None:
+            return 0
+        return int(data[0])
+
+    def __fetch(self, mailbox, folder, uidvalidity, uids):
+        # returns {uid: message}, message is None for the messages already
+        # in the index
+        messages = {
+            uid: None for uid in uids if self.__is_downloaded(folder, uidvalidity, uid)
+        }
+        if messages:
+            with self.lock:
+                self.skipped_emails += len(messages)
+                if self.progress is not None:
+                    self.progress(self.written_emails + self.skipped_emails)
+
+        uids = [uid for uid in uids if uid not in messages]
+        if not uids:
+            return messages
+
+        status, email_data = mailbox.uid("FETCH", get_message_set(uids), "(RFC822)")
+        if status != "OK":
+            raise imaplib.IMAP4.abort(status)
+
+        for uid, message_mail in parse_fetch_response(email_data):
+            if uid in uids and message_mail is not None:
+                messages[uid] = message_mail
+        return messages
+
+    def __is_downloaded(self, folder, uidvalidity, uid):
+        record = self.indexed_emails.get((folder, uidvalidity, uid))
+        if record is None:
+            return False
+
+        path, sha256 = record
+        path = os.path.join(self.mail_dir, path)
+        return os.path.isfile(path) and calculate_hash(path, "sha256") == sha256
+
+    def __write(self):
+        folders_dir = {}
+        while (item := self.messages.get()) is not None:
+            if self.write_error is not None:
+                # keep draining the queue to unblock the connections
+                continue
+
+            folder, uidvalidity, uid, message_mail = item
+            try:
+                folder_dir = folders_dir.get(folder)
+                if folder_dir is None:
+                    folder_dir = os.path.join(
+                        self.mail_dir, get_folder_stripped(folder)
+                    )
+                    os.makedirs(folder_dir, exist_ok=True)
+                    folders_dir[folder] = folder_dir
+
+                email_path, sha256 = save_email(message_mail, folder_dir)
+                if self.index is not None:
+                    self.index.add(
+                        folder,
+                        uidvalidity,
+                        uid,
+                        os.path.relpath(email_path, self.mail_dir),
+                        sha256,
+                    )
+
+                with self.lock:
+                    self.written_emails += 1
+                    if self.progress is not None:
+                        self.progress(self.written_emails + self.skipped_emails)
+            except Exception as e:
+                self.write_error = e
+
+        if self.index is not None:
+            self.index.commit()
+
+    def __add_failed(self, folder, uids, reason):
+        with self.lock:
+            for uid in uids:
+                self.failed_emails.append((folder, uid, str(reason)))
+
+    def __get_error_message(self):
+        failed_emails = list(self.failed_emails)
+        reason = "" if self.connect_error is None else str(self.connect_error)
+        while not self.jobs.empty():
+            folder, uids = self.jobs.get_nowait()
+            failed_emails += [(folder, uid, reason) for uid in uids]
+
+        return "\n".join(
+            "{} UID {}: {}".format(folder, uid, reason)
+            for folder, uid, reason in failed_emails
+        )
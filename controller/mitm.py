@@ -6,64 +6,276 @@
 # SPDX-License-Identifier: GPL-3.0-only
 # -----
 ######
+import os.path
 import string
 import threading
-from urllib.parse import urljoin
 
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urldefrag, urljoin, urlsplit
+
+import lxml.etree
+import lxml.html
 import requests
-from bs4 import BeautifulSoup
-from mitmproxy import http
 
-import os.path
 import mitmproxy.http
 
+from controller.asset_store import AssetStore
+
+# attribute with the url of the resources saved with the page
+RESOURCE_TAGS = {"img": "src", "script": "src", "link": "href"}
+# only the links to these resources are followed, the others (canonical,
+# alternate, next...) are pages
+LINK_RESOURCE_RELS = {
+    "apple-touch-icon",
+    "apple-touch-icon-precomposed",
+    "icon",
+    "manifest",
+    "mask-icon",
+    "modulepreload",
+    "preload",
+    "stylesheet",
+}
+
+# resources referenced by a page and never seen by the proxy are
+# downloaded in background through the proxy
+DOWNLOAD_WORKERS = 4
+DOWNLOAD_TIMEOUT = 30
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class _Page:
+    def __init__(self, url, name, digest, document):
+        self.url = url
+        self.name = name
+        self.digest = digest
+        self.document = document
+        # url of a resource -> digest, None if it couldn't be saved
+        self.resources = {}
+        self.waiting = 0
+
 
 class Mitm:
-    def __init__(self, acq_dir):
+    """Save the pages passing through the proxy with their resources.
+
+    The responses are stored in an AssetStore exactly as the proxy received
+    them, each distinct content once. Every html page is parsed once, the
+    resources it references (img, script and link) are taken from the
+    flows already seen or requested once through the proxy on
+    proxy_port, so they're recorded and saved like any other flow. When
+    all of them are stored, the page is saved as <title>.html pointing at
+    the stored blobs, next to its index. Parsing and writing run on a
+    single writer thread, so the proxy never waits for them and the state
+    needs no locks. wait_idle() returns when nothing is left to save.
+    """
+
+    def __init__(self, acq_dir, proxy_port, headers=None):
         self.acq_dir = acq_dir
+        self.store = AssetStore(acq_dir)
+        self.writer = ThreadPoolExecutor(max_workers=1)
+        self.downloader = ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS)
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        proxy = f"http://127.0.0.1:{proxy_port}"
+        self.session.proxies.update({"http": proxy, "https": proxy})
+        self.session.verify = False
+        self.is_closing = False
+        # jobs submitted and not finished yet, on both executors
+        self.jobs = 0
+        self.idle = threading.Condition()
+        # url of a resource -> digest, None if it couldn't be saved
+        self.resources = {}
+        # url of a resource -> pages still waiting for it
+        self.waiting = {}
+        self.requested = set()
+        # url of a page -> name of its files
+        self.pages = {}
+        self.names = set()
+
+    def save_flow(self, flow: mitmproxy.http.HTTPFlow):
+        response = flow.response
+        if response is None or response.status_code != 200 or not response.content:
+            return
+
+        url = urldefrag(flow.request.url)[0]
+        if response.headers.get("content-type", "").startswith("text/html"):
+            self.__submit(self.writer, self.__save_page, url, response.content)
+        else:
+            self.__submit(self.writer, self.__save_resource, url, response.content)
+
+    def wait_idle(self):
+        # the resources are downloaded through the proxy, it must still be
+        # running while waiting
+        with self.idle:
+            self.idle.wait_for(lambda: self.jobs == 0)
+
+    def close(self):
+        # called by the proxy event loop, the downloads still running pass
+        # through the same loop so they're abandoned instead of waited for
+        self.writer.submit(self.__stop_downloads).result()
+        self.downloader.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+        # the pages still waiting are saved with the resources found so far
+        self.writer.submit(self.__save_waiting_pages)
+        self.writer.shutdown(wait=True)
+
+    def __submit(self, executor, function, *args):
+        with self.idle:
+            self.jobs += 1
+        try:
+            executor.submit(self.__run, function, *args)
+        except RuntimeError:
+            # the executor has been shut down by close
+            self.__end_job()
+
+    def __run(self, function, *args):
+        try:
+            function(*args)
+        finally:
+            self.__end_job()
+
+    def __end_job(self):
+        with self.idle:
+            self.jobs -= 1
+            if self.jobs == 0:
+                self.idle.notify_all()
+
+    def __save_page(self, url, content):
+        if url in self.requested:
+            # a resource answered with an html page, e.g. an error page
+            self.__save_resource(url, content)
+            return
 
-    def create_folders(self, flow: mitmproxy.http.HTTPFlow):
-        if flow.response.headers.get("content-type", "").startswith("text/html"):
-            self.html_text = flow.response.content
-            if len(self.html_text) > 0:
-                soup = BeautifulSoup(self.html_text, "html.parser")
-                self.title = soup.title.string.strip()
-                self.clean_title = self.__clean_title(self.title)
-                self.clean_title_path = os.path.join(
-                    self.acq_dir, f"{self.clean_title}_files"
-                )
-
-                if not os.path.exists(self.clean_title_path):
-                    os.makedirs(self.clean_title_path)
-
-    def save_resources(self, flow: mitmproxy.http.HTTPFlow):
-        # save resources in separate threads
-        self.save_html()
-        resources_thread = threading.Thread(target=self.save_content, args=(flow,))
-        resources_thread.start()
-        resources_thread.join()
-
-    def save_html(self):
-        with open(f"{self.acq_dir}/{self.clean_title}.html", "wb") as f:
-            f.write(self.html_text)
-
-    def save_content(self, flow: mitmproxy.http.HTTPFlow):
-        soup = BeautifulSoup(self.html_text, "html.parser")
-        for tag in soup.find_all(["img", "link", "script"]):
-            url = tag.get("src") or tag.get("href")
-            if url:
-                full_url = urljoin(flow.request.url, url)
-                self.save_resource(full_url)
-
-    def save_resource(self, url):
-        response = requests.get(url)
-        if response.status_code == 200:
-            filename = f"{self.__clean_title(url)}"
-            try:
-                with open(os.path.join(self.clean_title_path, filename), "wb") as f:
-                    f.write(response.content)
-            except:
-                pass  # check
+        try:
+            document = lxml.html.document_fromstring(content)
+        except (lxml.etree.ParserError, ValueError):
+            return
+
+        try:
+            digest = self.store.add(content, url)
+        except OSError:
+            return
+        page = _Page(url, self.__get_name(url, document), digest, document)
+
+        for resource_url in self.__get_resource_urls(page):
+            if resource_url in page.resources:
+                continue
+            if resource_url in self.resources:
+                page.resources[resource_url] = self.resources[resource_url]
+                continue
+
+            page.resources[resource_url] = None
+            page.waiting += 1
+            self.waiting.setdefault(resource_url, []).append(page)
+            if self.is_closing:
+                self.__resolve(resource_url, None)
+            elif resource_url not in self.requested:
+                self.requested.add(resource_url)
+                self.__submit(self.downloader, self.__download, resource_url)
+
+        if page.waiting == 0:
+            self.__write_page(page)
+
+    def __save_resource(self, url, content):
+        try:
+            digest = self.store.add(content, url)
+        except OSError:
+            digest = None
+        self.__resolve(url, digest)
+
+    def __resolve(self, url, digest):
+        if digest is not None or url not in self.resources:
+            self.resources[url] = digest
+        for page in self.waiting.pop(url, []):
+            page.resources[url] = self.resources[url]
+            page.waiting -= 1
+            if page.waiting == 0:
+                self.__write_page(page)
+
+    def __download(self, url):
+        # the response is saved by save_flow while it passes through the
+        # proxy, the body is only read through
+        try:
+            with self.session.get(
+                url, stream=True, timeout=DOWNLOAD_TIMEOUT
+            ) as response:
+                for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    pass
+        except requests.RequestException:
+            pass
+        # the pages are still waiting for the url when the proxy didn't save it
+        self.__submit(self.writer, self.__resolve, url, None)
+
+    def __stop_downloads(self):
+        self.is_closing = True
+
+    def __save_waiting_pages(self):
+        for url in list(self.waiting):
+            self.__resolve(url, None)
+
+    def __get_name(self, url, document):
+        # pages with the same title get a numbered name
+        name = self.pages.get(url)
+        if name is None:
+            title = (document.findtext(".//title") or "").strip()
+            clean_title = self.__clean_title(title or urlsplit(url).path) or "index"
+            name = clean_title
+            number = 1
+            while name in self.names:
+                number += 1
+                name = f"{clean_title}-{number}"
+            self.names.add(name)
+            self.pages[url] = name
+        return name
+
+    def __get_resource_urls(self, page):
+        base_url = page.url
+        base = page.document.find(".//base[@href]")
+        if base is not None:
+            base_url = urljoin(base_url, base.get("href"))
+
+        for element in page.document.iter(*RESOURCE_TAGS):
+            if element.tag == "link" and not self.__is_link_resource(element):
+                continue
+            value = (element.get(RESOURCE_TAGS[element.tag]) or "").strip()
+            if value:
+                resource_url = urldefrag(urljoin(base_url, value))[0]
+                if urlsplit(resource_url).scheme in ("http", "https"):
+                    yield resource_url
+
+    def __is_link_resource(self, element):
+        rels = (element.get("rel") or "").lower().split()
+        return any(rel in LINK_RESOURCE_RELS for rel in rels)
+
+    def __write_page(self, page):
+        # the links to the stored resources are relative to the page, the
+        # base would break them so the other links are made absolute
+        document = page.document
+        base_url = page.url
+        for base in document.findall(".//base[@href]"):
+            base_url = urljoin(base_url, base.get("href"))
+            base.drop_tree()
+        document.make_links_absolute(base_url, resolve_base_href=False)
+
+        for element in document.iter(*RESOURCE_TAGS):
+            attribute = RESOURCE_TAGS[element.tag]
+            resource_url = urldefrag(element.get(attribute) or "")[0]
+            digest = page.resources.get(resource_url)
+            if digest is not None:
+                element.set(attribute, self.store.get_path(digest))
+
+        docinfo = document.getroottree().docinfo
+        html = lxml.html.tostring(
+            document,
+            doctype=docinfo.doctype or None,
+            encoding=docinfo.encoding or "utf-8",
+        )
+        try:
+            with open(os.path.join(self.acq_dir, f"{page.name}.html"), "wb") as f:
+                f.write(html)
+            self.store.write_index(page.name, page.url, page.digest, page.resources)
+        except OSError:
+            pass
+        page.document = None
 
     def __clean_title(self, name):
         valid_chars = "-_.() %s%s" % (string.ascii_letters, string.digits)
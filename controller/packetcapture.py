@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+######
+# -----
+# Copyright (c) 2023 FIT-Project
+# SPDX-License-Identifier: GPL-3.0-only
+# -----
+######
+
+import logging
+import os
+import queue
+import threading
+import time
+
+logging.getLogger("scapy").setLevel(logging.CRITICAL)
+import scapy.all as scapy
+
+# packets waiting to be written, when the queue is full packets are dropped
+WRITE_QUEUE_SIZE = 10000
+SNAPLEN = 65535
+# pcap global header and packet record header sizes
+PCAP_HEADER_SIZE = 24
+PCAP_RECORD_HEADER_SIZE = 16
+
+
+def get_rotated_filename(filename, index):
+    # acquisition.pcap, acquisition.1.pcap, acquisition.2.pcap, ...
+    if index == 0:
+        return filename
+    base, extension = os.path.splitext(filename)
+    return "{}.{}{}".format(base, index, extension)
+
+
+class PacketCapture:
+    """Capture network packets straight into pcap files.
+
+    The sniffer doesn't keep packets in memory: each packet is truncated to
+    snaplen and put in a bounded queue, a writer thread appends it to the
+    current pcap file. The file is rotated when it reaches rotation_size
+    bytes or when it has been open for rotation_time seconds.
+    """
+
+    def __init__(
+        self,
+        filename,
+        snaplen=SNAPLEN,
+        rotation_size=None,
+        rotation_time=None,
+        queue_size=WRITE_QUEUE_SIZE,
+    ):
+        self.filename = filename
+        self.snaplen = snaplen
+        self.rotation_size = rotation_size
+        self.rotation_time = rotation_time
+
+        self.packets = queue.Queue(maxsize=queue_size)
+        self.sniffer = scapy.AsyncSniffer(store=False, prn=self.__enqueue)
+        self.writer_thread = None
+
+        self.captured_packets = 0
+        self.captured_bytes = 0
+        self.written_packets = 0
+        self.dropped_packets = 0
+        self.files = list()
+
+    @property
+    def stats(self):
+        return {
+            "packets": self.captured_packets,
+            "bytes": self.captured_bytes,
+            "written": self.written_packets,
+            "dropped": self.dropped_packets,
+            "files": len(self.files),
+        }
+
+    def start(self):
+        self.writer_thread = threading.Thread(target=self.__write)
+        self.writer_thread.start()
+        try:
+            self.sniffer.start()
+        except Exception:
+            self.packets.put(None)
+            self.writer_thread.join()
+            raise
+
+    def stop(self):
+        if self.sniffer.running:
+            self.sniffer.stop()
+
+        if self.writer_thread is not None:
+            # the writer drains the queue before closing the file
+            self.packets.put(None)
+            self.writer_thread.join()
+            self.writer_thread = None
+
+    def __enqueue(self, packet):
+        raw = bytes(packet)
+        self.captured_packets += 1
+        self.captured_bytes += len(raw)
+        try:
+            self.packets.put_nowait(
+                (
+                    float(packet.time),
+                    raw[: self.snaplen],
+                    len(raw),
+                    scapy.conf.l2types.layer2num.get(type(packet)),
+                )
+            )
+        except queue.Full:
+            self.dropped_packets += 1
+
+    def __write(self):
+        writer = None
+        try:
+            while (item := self.packets.get()) is not None:
+                timestamp, data, wirelen, linktype = item
+
+                if writer is not None and self.__must_rotate():
+                    writer.close()
+                    writer = None
+
+                if writer is None:
+                    writer = self.__open(linktype)
+
+                # rounding the fraction alone could give 1000000 usec
+                sec, usec = divmod(int(round(timestamp * 1000000)), 1000000)
+                writer.write_packet(
+                    data,
+                    sec=sec,
+                    usec=usec,
+                    caplen=len(data),
+                    wirelen=wirelen,
+                )
+                self.written_packets += 1
+                self.file_size += PCAP_RECORD_HEADER_SIZE + len(data)
+        finally:
+            if writer is None and not self.files:
+                # an empty capture still produces a valid pcap file
+                writer = self.__open(None)
+            if writer is not None:
+                writer.close()
+
+    def __open(self, linktype):
+        filename = get_rotated_filename(self.filename, len(self.files))
+        self.files.append(filename)
+        self.file_size = PCAP_HEADER_SIZE
+        self.file_opened_at = time.monotonic()
+
+        writer = scapy.PcapWriter(filename, linktype=linktype, snaplen=self.snaplen)
+        # the global header is written with the first packet, write it now
+        writer.write_header(None)
+        return writer
+
+    def __must_rotate(self):
+        if self.rotation_size and self.file_size >= self.rotation_size:
+            return True
+        if (
+            self.rotation_time
+            and time.monotonic() - self.file_opened_at >= self.rotation_time
+        ):
+            return True
+        return False
@@ -6,18 +6,71 @@
 # SPDX-License-Identifier: GPL-3.0-only
 # -----
 ######
+import atexit
+import base64
 import datetime
 import os
 import email
+import email.policy
 import imaplib
+import re
+import select
 import smtplib
+import ssl
+import threading
+import time
+import uuid
 import pyzmail
 
-from email.mime.application import MIMEApplication
 from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from common.constants.controller.pec import *
 
+# seconds of wait for each retry in the PEC configuration
+RETRY_INTERVAL = 8
+# an IDLE command is renewed at least every IDLE_TIMEOUT seconds
+IDLE_TIMEOUT = 60
+# untagged responses sent during IDLE when a message arrives
+IDLE_NEW_MESSAGE = re.compile(rb"\* \d+ (EXISTS|RECENT)", re.I)
+# NOOP polling, used when the server doesn't support IDLE
+POLLING_MIN_INTERVAL = 1
+POLLING_MAX_INTERVAL = 16
+
+# attachments are read and base64 encoded in chunks of whole 76 chars lines
+BASE64_CHUNK_SIZE = 57 * 1024
+
+# idle SMTP connections for each (server, port, email), reused by the next PEC
+SMTP_CONNECTIONS = {}
+SMTP_CONNECTIONS_LOCK = threading.Lock()
+
+MONTHS = [
+    "Jan",
+    "Feb",
+    "Mar",
+    "Apr",
+    "May",
+    "Jun",
+    "Jul",
+    "Aug",
+    "Sep",
+    "Oct",
+    "Nov",
+    "Dec",
+]
+
+
+def close_smtp_connections():
+    with SMTP_CONNECTIONS_LOCK:
+        connections = [c for value in SMTP_CONNECTIONS.values() for c in value]
+        SMTP_CONNECTIONS.clear()
+    for connection in connections:
+        try:
+            connection.quit()
+        except Exception:
+            pass
+
+
+atexit.register(close_smtp_connections)
+
 
 class Pec:
     def __init__(
@@ -44,8 +97,11 @@ class Pec:
         self.imap_port = imap_port
         self.timestamp = None
         self.subject = None
+        self.imap = None
+        self.capabilities = []
+        self.uid_next = None
 
-    def send_pec(self):
+    def send_pec(self, progress=None):
         # subject and body of message
         now = datetime.datetime.now()
         self.timestamp = now.timestamp()
@@ -54,45 +110,32 @@ class Pec:
         )
         body = BODY.format(self.acquisition_type, self.case_info.get("name"))
 
-        # Make message
-        msg = MIMEMultipart()
-        msg["From"] = self.pec_email
-        msg["To"] = self.pec_email
-        msg["Subject"] = self.subject
-        msg.attach(MIMEText(body, "plain"))
-
-        pdf = os.path.join(self.acquisition_directory, "acquisition_report.pdf")
-        tsr = os.path.join(self.acquisition_directory, "timestamp.tsr")
-        crt = os.path.join(self.acquisition_directory, "tsa.crt")
-
-        # Attach PDF Report
-        with open(pdf, "rb") as f:
-            attach_pdf = MIMEApplication(f.read(), _subtype="pdf")
-            attach_pdf.add_header(
-                "content-disposition", "attachment", filename="report.pdf"
-            )
-            msg.attach(attach_pdf)
-
-        # Attach TSR file
-        with open(tsr, "rb") as f:
-            attach_tsr = MIMEApplication(f.read(), _subtype="tsr")
-            attach_tsr.add_header(
-                "content-disposition", "attachment", filename="timestamp.tsr"
-            )
-            msg.attach(attach_tsr)
-
-        # Attach CRT file
-        with open(crt, "rb") as f:
-            attach_crt = MIMEApplication(f.read(), _subtype="crt")
-            attach_crt.add_header(
-                "content-disposition", "attachment", filename="tsa.crt"
-            )
-            msg.attach(attach_crt)
+        # (path, subtype, filename) of the attachments
+        attachments = [
+            (
+                os.path.join(self.acquisition_directory, "acquisition_report.pdf"),
+                "pdf",
+                "report.pdf",
+            ),
+            (
+                os.path.join(self.acquisition_directory, "timestamp.tsr"),
+                "tsr",
+                "timestamp.tsr",
+            ),
+            (os.path.join(self.acquisition_directory, "tsa.crt"), "crt", "tsa.crt"),
+        ]
+        self.total_bytes = sum(os.path.getsize(path) for path, _, _ in attachments)
+        self.sent_bytes = 0
+        self.progress = progress
 
         try:
-            server = smtplib.SMTP_SSL(self.smtp_server, self.smtp_port)
-            server.login(self.pec_email, self.password)
-            server.sendmail(self.pec_email, self.pec_email, msg.as_string())
+            server = self.__get_smtp()
+            try:
+                self.__send_message(server, body, attachments)
+            except Exception:
+                server.close()
+                raise
+            self.__release_smtp(server)
         except Exception as e:
             raise Exception(e)
 
@@ -102,47 +145,156 @@ class Pec:
         find_it = False
 
         try:
-            server = imaplib.IMAP4_SSL(self.imap_server, self.imap_port)
-            server.login(self.pec_email, self.password)
-            server.select("inbox")
-
-            messages = self.__search_message(server)
-            if str(messages) != "[b'']":
+            uids = self.__search_message()
+            if uids:
                 find_it = True
-                self.__save_message(server, messages[0])
+                self.__save_message(uids[0])
         except Exception as e:
             raise Exception(e)
 
         return find_it
 
+    def wait_eml(self, timeout):
+        # the same session is kept until the PEC receipt arrives or timeout
+        # expires, the inbox is searched again when IDLE reports a change
+        if self.timestamp is None:
+            return False
+
+        deadline = time.monotonic() + timeout
+        interval = POLLING_MIN_INTERVAL
+        try:
+            while True:
+                if self.retrieve_eml():
+                    return True
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+
+                self.__get_imap()
+                if "IDLE" in self.capabilities:
+                    self.__idle(min(remaining, IDLE_TIMEOUT))
+                else:
+                    time.sleep(min(remaining, interval))
+                    interval = min(interval * 2, POLLING_MAX_INTERVAL)
+                    self.__get_imap().noop()
+        finally:
+            self.close()
+
     def retrieve_eml_from_timestamp(self, timestamp):
         find_it = False
         try:
-            server = imaplib.IMAP4_SSL(self.imap_server, self.imap_port)
-            server.login(self.pec_email, self.password)
-            server.select("inbox")
+            server = self.__get_imap()
             subject = "ID: " + timestamp
             search_criteria = f'SUBJECT "{subject}"'
 
-            status, messages = server.search(None, search_criteria)
-            messages = messages[0].split(b" ")
-            if str(messages) != "[b'']":
+            status, messages = server.uid("SEARCH", None, search_criteria)
+            messages = messages[0].split()
+            if messages:
                 find_it = True
-                self.__save_message(server, messages[0])
+                self.__save_message(messages[0])
         except Exception as e:
             raise Exception(e)
 
         return find_it
 
-    def __search_message(self, server):
+    def close(self):
+        if self.imap is not None:
+            try:
+                self.imap.logout()
+            except Exception:
+                pass
+            self.imap = None
+            self.uid_next = None
+
+    def __get_imap(self):
+        # one authenticated session is used for all the searches
+        if self.imap is None:
+            self.imap = imaplib.IMAP4_SSL(self.imap_server, self.imap_port)
+            self.imap.login(self.pec_email, self.password)
+            self.imap.select("inbox")
+
+            # the capabilities can change after the login
+            status, data = self.imap.capability()
+            if status == "OK" and data and data[-1]:
+                self.capabilities = data[-1].decode().upper().split()
+            else:
+                self.capabilities = list(self.imap.capabilities)
+        return self.imap
+
+    def __get_uid_next(self):
+        status, data = self.__get_imap().status("inbox", "(UIDNEXT)")
+        uid_next = re.search(rb"UIDNEXT (\d+)", data[0])
+        if uid_next is None:
+            return None
+        return int(uid_next.group(1))
+
+    def __search_message(self):
+        server = self.__get_imap()
         subject = "POSTA CERTIFICATA: " + self.subject
         search_criteria = f'SUBJECT "{subject}"'
-        status, messages = server.search(None, search_criteria)
-        return messages[0].split(b" ")
 
-    def __save_message(self, server, message):
+        # only the messages arrived after the previous search, the first
+        # search starts from the day before the PEC has been sent: SINCE is
+        # compared with the date of the server, which can be a day behind
+        # around midnight. The timestamp in the subject identifies the receipt
+        uid_next = self.__get_uid_next()
+        if self.uid_next is not None:
+            search_criteria = f"UID {self.uid_next}:* {search_criteria}"
+        else:
+            date = datetime.date.fromtimestamp(self.timestamp)
+            date -= datetime.timedelta(days=1)
+            since = f"{date.day:02d}-{MONTHS[date.month - 1]}-{date.year}"
+            search_criteria = f"SINCE {since} {search_criteria}"
+
+        status, messages = server.uid("SEARCH", None, search_criteria)
+        self.uid_next = uid_next
+        return messages[0].split()
+
+    def __idle(self, timeout):
+        # RFC 2177, imaplib doesn't implement the IDLE command
+        server = self.__get_imap()
+        tag = server._new_tag()
+        server.send(tag + b" IDLE\r\n")
+
+        # the server can send untagged responses before the continuation,
+        # e.g. the EXISTS of the receipt arrived meanwhile
+        has_new_message = False
+        while not (response := server.readline()).startswith(b"+"):
+            if not response:
+                raise imaplib.IMAP4.abort("socket error: EOF")
+            if not response.startswith(b"*"):
+                raise imaplib.IMAP4.error(response)
+            if IDLE_NEW_MESSAGE.match(response):
+                has_new_message = True
+
+        # any untagged response (EXISTS, RECENT, ...) ends the wait
+        if not has_new_message and not self.__has_response(server):
+            select.select([server.sock], [], [], timeout)
+
+        server.send(b"DONE\r\n")
+        while not (response := server.readline()).startswith(tag):
+            if not response:
+                raise imaplib.IMAP4.abort("socket error: EOF")
+
+    def __has_response(self, server):
+        # a response already read from the socket, by the SSL layer or by
+        # the imaplib buffer, is not seen by select
+        if isinstance(server.sock, ssl.SSLSocket) and server.sock.pending() > 0:
+            return True
+
+        timeout = server.sock.gettimeout()
+        server.sock.setblocking(False)
+        try:
+            return len(server.file.peek(1)) > 0
+        except (ssl.SSLWantReadError, BlockingIOError):
+            return False
+        finally:
+            server.sock.settimeout(timeout)
+
+    def __save_message(self, uid):
         # download the email message in raw format
-        status, raw_email = server.fetch(message, "(RFC822)")
+        status, raw_email = self.__get_imap().uid("FETCH", uid, "(RFC822)")
         pec_data = raw_email[0][1]
 
         # check the PEC using the email library
@@ -162,3 +314,101 @@ class Pec:
         # save EML file
         with open(filename, "wb") as f:
             f.write(pec_data)
+
+    def __get_smtp(self):
+        key = (self.smtp_server, self.smtp_port, self.pec_email)
+        while True:
+            with SMTP_CONNECTIONS_LOCK:
+                connections = SMTP_CONNECTIONS.get(key)
+                if not connections:
+                    break
+                server = connections.pop()
+
+            # the server could have closed an idle connection
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except (smtplib.SMTPException, OSError):
+                pass
+            server.close()
+
+        server = smtplib.SMTP_SSL(self.smtp_server, self.smtp_port)
+        server.login(self.pec_email, self.password)
+        return server
+
+    def __release_smtp(self, server):
+        key = (self.smtp_server, self.smtp_port, self.pec_email)
+        with SMTP_CONNECTIONS_LOCK:
+            SMTP_CONNECTIONS.setdefault(key, []).append(server)
+
+    def __send_message(self, server, body, attachments):
+        # same steps of smtplib.SMTP.sendmail, but the DATA is written while
+        # the attachments are encoded instead of building the whole message
+        server.ehlo_or_helo_if_needed()
+        code, response = server.mail(self.pec_email)
+        if code != 250:
+            server.rset()
+            raise smtplib.SMTPSenderRefused(code, response, self.pec_email)
+        code, response = server.rcpt(self.pec_email)
+        if code not in (250, 251):
+            server.rset()
+            raise smtplib.SMTPRecipientsRefused({self.pec_email: (code, response)})
+
+        server.putcmd("data")
+        code, response = server.getreply()
+        if code != 354:
+            server.rset()
+            raise smtplib.SMTPDataError(code, response)
+
+        boundary = "===============" + uuid.uuid4().hex + "=="
+        server.send(
+            self.__get_headers(
+                [
+                    ("Content-Type", f'multipart/mixed; boundary="{boundary}"'),
+                    ("MIME-Version", "1.0"),
+                    ("From", self.pec_email),
+                    ("To", self.pec_email),
+                    ("Subject", self.subject),
+                ]
+            )
+        )
+
+        text = MIMEText(body, "plain").as_bytes(policy=email.policy.SMTP)
+        server.send(b"--" + boundary.encode() + b"\r\n")
+        # lines starting with a dot are doubled (RFC 5321 4.5.2)
+        server.send(re.sub(rb"(?m)^\.", b"..", text) + b"\r\n")
+
+        for path, subtype, filename in attachments:
+            server.send(b"--" + boundary.encode() + b"\r\n")
+            server.send(
+                self.__get_headers(
+                    [
+                        ("Content-Type", f"application/{subtype}"),
+                        ("MIME-Version", "1.0"),
+                        ("Content-Transfer-Encoding", "base64"),
+                        ("Content-Disposition", f'attachment; filename="{filename}"'),
+                    ]
+                )
+            )
+            with open(path, "rb") as f:
+                while chunk := f.read(BASE64_CHUNK_SIZE):
+                    # base64 lines never start with a dot
+                    server.send(base64.encodebytes(chunk).replace(b"\n", b"\r\n"))
+                    self.__update_progress(len(chunk))
+
+        server.send(b"--" + boundary.encode() + b"--\r\n.\r\n")
+        code, response = server.getreply()
+        if code != 250:
+            server.rset()
+            raise smtplib.SMTPDataError(code, response)
+
+    def __get_headers(self, headers):
+        return (
+            "".join(email.policy.SMTP.fold(name, value) for name, value in headers)
+            + "\r\n"
+        ).encode("ascii")
+
+    def __update_progress(self, size):
+        self.sent_bytes += size
+        if self.progress is not None:
+            self.progress(self.sent_bytes, self.total_bytes)
@@ -8,6 +8,7 @@
 ######
 import base64
 import fnmatch
+import io
 import os
 
 from string import Template
@@ -20,16 +21,17 @@ from controller.configurations.tabs.general.typesproceedings import (
 )
 
 from common.utility import get_logo, get_version, get_language, resolve_path
+from common.thumbnail import create_thumbnails_of_images, THUMBNAILS_FOLDER
 from model.case import Case
 
 
 class Report:
-    def __init__(self, cases_folder_path, case_info):
+    _templates = {}
+    _front_pages = {}
+
+    def __init__(self, cases_folder_path, case_info, manifest=None):
         self.cases_folder_path = cases_folder_path
-        self.output_front = os.path.join(self.cases_folder_path, "front_report.pdf")
-        self.output_content = os.path.join(self.cases_folder_path, "content_report.pdf")
-        self.output_front_result = open(self.output_front, "w+b")
-        self.output_content_result = open(self.output_content, "w+b")
+        self.manifest = manifest
         case = Case()
         self.case_info = vars(case.get_from_id(case_info["id"]))
 
@@ -39,6 +41,7 @@ class Report:
         else:
             import common.constants.controller.report_eng as REPORT
         self.REPORT = REPORT
+        self.language = language
 
     def generate_pdf(self, type, ntp):
         # PREPARING DATA TO FILL THE PDF
@@ -52,10 +55,79 @@ class Report:
             if whois_text == "" or whois_text == "\n":
                 whois_text = self.REPORT.NOT_PRODUCED
 
-        hash_file_content = self.__hash_reader()
-        screenshot = self.__insert_screenshot()
-        video = self.__insert_video_hyperlink()
+            if whois_text != self.REPORT.NOT_PRODUCED:
+                template_name = "template_web.html"
+            else:
+                template_name = "template_web_no_whois.html"
+
+            # options are applied only to web reports as before
+            pdf_options = {
+                "page-size": "Letter",
+                "margin-top": "1in",
+                "margin-right": "1in",
+                "margin-bottom": "1in",
+                "margin-left": "1in",
+            }
+
+        elif (
+            type == "email"
+            or type == "instagram"
+            or type == "video"
+            or type == "entire_website"
+        ):
+            whois_text = None
+            template_name = "template_email.html"
+            pdf_options = None
+
+        # FILLING TEMPLATE WITH DATA
+        context = self.__get_context(type, ntp)
+        if whois_text is not None:
+            context["whoisfile"] = whois_text
+
+        content_index = self._get_template(template_name).safe_substitute(context)
+
+        # front page is rendered once, then it's merged with the content in memory
+        merger = PdfMerger()
+        merger.append(io.BytesIO(self.__get_front_page(pdf_options)))
+        merger.append(io.BytesIO(self.__render(content_index, pdf_options)))
+
+        merger.write(os.path.join(self.cases_folder_path, "acquisition_report.pdf"))
+        merger.close()
+
+    @classmethod
+    def _get_template(cls, name):
+        # templates are read and parsed once for the whole application
+        if name not in cls._templates:
+            with open(os.path.join(resolve_path("assets/templates"), name)) as fh:
+                cls._templates[name] = Template(fh.read())
+
+        return cls._templates[name]
+
+    def __get_front_page(self, pdf_options):
+        # the front page depends only on language and version
+        key = (self.language, pdf_options is not None)
+        if key not in self._front_pages:
+            front_index = self._get_template("front.html").safe_substitute(
+                img=get_logo(),
+                t1=self.REPORT.T1,
+                title=self.REPORT.TITLE,
+                report=self.REPORT.REPORT,
+                version=get_version(),
+            )
+            self._front_pages[key] = self.__render(front_index, pdf_options)
+
+        return self._front_pages[key]
 
+    def __render(self, html, pdf_options):
+        output = io.BytesIO()
+        if pdf_options is None:
+            pisa.CreatePDF(html, dest=output)
+        else:
+            pisa.CreatePDF(html, dest=output, options=pdf_options)
+
+        return output.getvalue()
+
+    def __get_context(self, type, ntp):
         proceeding_type = TypesProceedingsController().get_proceeding_name_by_id(
             self.case_info.get("proceeding_type", 0)
         )
@@ -76,317 +148,84 @@ class Report:
 
         acquisition_files = self._acquisition_files_names()
 
-        zip_enum = self._zip_files_enum()
-
-        # FILLING FRONT PAGE WITH DATA
-        with open(os.path.join(resolve_path("assets/templates"), "front.html")) as fh:
-            template = Template(fh.read())
-
-        front_index = template.safe_substitute(
-            img=get_logo(),
-            t1=self.REPORT.T1,
+        # every template uses a subset of these keys
+        return dict(
             title=self.REPORT.TITLE,
-            report=self.REPORT.REPORT,
-            version=get_version(),
+            index=self.REPORT.INDEX,
+            description=self.REPORT.DESCRIPTION.format(self.REPORT.RELEASES_LINK),
+            t1=self.REPORT.T1,
+            t2=self.REPORT.T2,
+            case=self.REPORT.CASEINFO,
+            casedata=self.REPORT.CASEDATA,
+            case0=self.REPORT.CASE,
+            case1=self.REPORT.LAWYER,
+            case2=self.REPORT.OPERATOR,
+            case3=self.REPORT.PROCEEDING,
+            case4=self.REPORT.COURT,
+            case5=self.REPORT.NUMBER,
+            case6=self.REPORT.ACQUISITION_TYPE,
+            case7=self.REPORT.ACQUISITION_DATE,
+            case8=self.REPORT.NOTES,
+            data0=str(self.case_info["name"] or "N/A"),
+            data1=str(self.case_info["lawyer_name"] or "N/A"),
+            data2=str(self.case_info["operator"] or "N/A"),
+            data3=proceeding_type,
+            data4=str(self.case_info["courthouse"] or "N/A"),
+            data5=str(self.case_info["proceeding_number"] or "N/A"),
+            data6=type,
+            data7=ntp,
+            data8=str(self.case_info["notes"] or "N/A").replace("\n", "<br>"),
+            t3=self.REPORT.T3,
+            t3descr=self.REPORT.T3DESCR,
+            t4=self.REPORT.T4,
+            t4descr=self.REPORT.T4DESCR,
+            name=self.REPORT.NAME,
+            descr=self.REPORT.DESCR,
+            avi=acquisition_files[fnmatch.filter(acquisition_files.keys(), "*.avi")[0]],
+            avid=self.REPORT.AVID,
+            hash=acquisition_files["acquisition.hash"],
+            hashd=self.REPORT.HASHD,
+            log=acquisition_files["acquisition.log"],
+            logd=self.REPORT.LOGD,
+            pcap=acquisition_files["acquisition.pcap"],
+            pcapd=self.REPORT.PCAPD,
+            zip=acquisition_files[fnmatch.filter(acquisition_files.keys(), "*.zip")[0]],
+            zipd=self.REPORT.ZIPD,
+            whois=acquisition_files["whois.txt"],
+            whoisd=self.REPORT.WHOISD,
+            headers=acquisition_files["headers.txt"],
+            headersd=self.REPORT.HEADERSD,
+            nslookup=acquisition_files["nslookup.txt"],
+            nslookupd=self.REPORT.NSLOOKUPD,
+            cer=acquisition_files["server.cer"],
+            cerd=self.REPORT.CERD,
+            sslkey=acquisition_files["sslkey.log"],
+            sslkeyd=self.REPORT.SSLKEYD,
+            traceroute=acquisition_files["traceroute.txt"],
+            tracerouted=self.REPORT.TRACEROUTED,
+            t5=self.REPORT.T5,
+            t5descr=self.REPORT.T5DESCR,
+            file=self.__hash_reader(),
+            t6=self.REPORT.T6,
+            t6descr=self.REPORT.T6DESCR,
+            filedata=self._zip_files_enum(),
+            t7=self.REPORT.T7,
+            t7descr=self.REPORT.T7DESCR,
+            screenshot=self.__insert_screenshot(),
+            t8=self.REPORT.T8,
+            t8descr=self.REPORT.T8DESCR,
+            video_hyperlink=self.__insert_video_hyperlink(),
+            t9=self.REPORT.T9,
+            t9descr=self.REPORT.T9DESCR,
+            titlecc=self.REPORT.TITLECC,
+            ccdescr=self.REPORT.CCDESCR,
+            titleh=self.REPORT.TITLEH,
+            hdescr=self.REPORT.HDESCR,
+            page=self.REPORT.PAGE,
+            of=self.REPORT.OF,
+            logo=logo,
         )
 
-        # FILLING TEMPLATE WITH DATA
-        if type == "web" and whois_text != self.REPORT.NOT_PRODUCED:
-            content_index_path = os.path.join(
-                resolve_path("assets/templates"), "template_web.html"
-            )
-            with open(os.path.join(content_index_path)) as fh:
-                template = Template(fh.read())
-
-                content_index = template.safe_substitute(
-                    title=self.REPORT.TITLE,
-                    index=self.REPORT.INDEX,
-                    description=self.REPORT.DESCRIPTION.format(
-                        self.REPORT.RELEASES_LINK
-                    ),
-                    t1=self.REPORT.T1,
-                    t2=self.REPORT.T2,
-                    case=self.REPORT.CASEINFO,
-                    casedata=self.REPORT.CASEDATA,
-                    case0=self.REPORT.CASE,
-                    case1=self.REPORT.LAWYER,
-                    case2=self.REPORT.OPERATOR,
-                    case3=self.REPORT.PROCEEDING,
-                    case4=self.REPORT.COURT,
-                    case5=self.REPORT.NUMBER,
-                    case6=self.REPORT.ACQUISITION_TYPE,
-                    case7=self.REPORT.ACQUISITION_DATE,
-                    case8=self.REPORT.NOTES,
-                    data0=str(self.case_info["name"] or "N/A"),
-                    data1=str(self.case_info["lawyer_name"] or "N/A"),
-                    data2=str(self.case_info["operator"] or "N/A"),
-                    data3=proceeding_type,
-                    data4=str(self.case_info["courthouse"] or "N/A"),
-                    data5=str(self.case_info["proceeding_number"] or "N/A"),
-                    data6=type,
-                    data7=ntp,
-                    data8=str(self.case_info["notes"] or "N/A").replace("\n", "<br>"),
-                    t3=self.REPORT.T3,
-                    t3descr=self.REPORT.T3DESCR,
-                    whoisfile=whois_text,
-                    t4=self.REPORT.T4,
-                    t4descr=self.REPORT.T4DESCR,
-                    name=self.REPORT.NAME,
-                    descr=self.REPORT.DESCR,
-                    avi=acquisition_files[
-                        fnmatch.filter(acquisition_files.keys(), "*.avi")[0]
-                    ],
-                    avid=self.REPORT.AVID,
-                    hash=acquisition_files["acquisition.hash"],
-                    hashd=self.REPORT.HASHD,
-                    log=acquisition_files["acquisition.log"],
-                    logd=self.REPORT.LOGD,
-                    pcap=acquisition_files["acquisition.pcap"],
-                    pcapd=self.REPORT.PCAPD,
-                    zip=acquisition_files[
-                        fnmatch.filter(acquisition_files.keys(), "*.zip")[0]
-                    ],
-                    zipd=self.REPORT.ZIPD,
-                    whois=acquisition_files["whois.txt"],
-                    whoisd=self.REPORT.WHOISD,
-                    headers=acquisition_files["headers.txt"],
-                    headersd=self.REPORT.HEADERSD,
-                    nslookup=acquisition_files["nslookup.txt"],
-                    nslookupd=self.REPORT.NSLOOKUPD,
-                    cer=acquisition_files["server.cer"],
-                    cerd=self.REPORT.CERD,
-                    sslkey=acquisition_files["sslkey.log"],
-                    sslkeyd=self.REPORT.SSLKEYD,
-                    traceroute=acquisition_files["traceroute.txt"],
-                    tracerouted=self.REPORT.TRACEROUTED,
-                    t5=self.REPORT.T5,
-                    t5descr=self.REPORT.T5DESCR,
-                    file=hash_file_content,
-                    t6=self.REPORT.T6,
-                    t6descr=self.REPORT.T6DESCR,
-                    filedata=zip_enum,
-                    t7=self.REPORT.T7,
-                    t7descr=self.REPORT.T7DESCR,
-                    screenshot=screenshot,
-                    t8=self.REPORT.T8,
-                    t8descr=self.REPORT.T8DESCR,
-                    video_hyperlink=video,
-                    t9=self.REPORT.T9,
-                    t9descr=self.REPORT.T9DESCR,
-                    titlecc=self.REPORT.TITLECC,
-                    ccdescr=self.REPORT.CCDESCR,
-                    titleh=self.REPORT.TITLEH,
-                    hdescr=self.REPORT.HDESCR,
-                    page=self.REPORT.PAGE,
-                    of=self.REPORT.OF,
-                    logo=logo,
-                )
-            pdf_options = {
-                "page-size": "Letter",
-                "margin-top": "1in",
-                "margin-right": "1in",
-                "margin-bottom": "1in",
-                "margin-left": "1in",
-            }
-
-            # create pdf front and content, merge them and remove merged files
-            pisa.CreatePDF(
-                front_index, dest=self.output_front_result, options=pdf_options
-            )
-            pisa.CreatePDF(
-                content_index, dest=self.output_content_result, options=pdf_options
-            )
-
-        elif type == "web" and whois_text == self.REPORT.NOT_PRODUCED:
-            content_index_path = os.path.join(
-                resolve_path("assets/templates"), "template_web_no_whois.html"
-            )
-
-            with open(os.path.join(content_index_path)) as fh:
-                template = Template(fh.read())
-
-                content_index = template.safe_substitute(
-                    title=self.REPORT.TITLE,
-                    index=self.REPORT.INDEX,
-                    description=self.REPORT.DESCRIPTION.format(
-                        self.REPORT.RELEASES_LINK
-                    ),
-                    t1=self.REPORT.T1,
-                    t2=self.REPORT.T2,
-                    case=self.REPORT.CASEINFO,
-                    casedata=self.REPORT.CASEDATA,
-                    case0=self.REPORT.CASE,
-                    case1=self.REPORT.LAWYER,
-                    case2=self.REPORT.OPERATOR,
-                    case3=self.REPORT.PROCEEDING,
-                    case4=self.REPORT.COURT,
-                    case5=self.REPORT.NUMBER,
-                    case6=self.REPORT.ACQUISITION_TYPE,
-                    case7=self.REPORT.ACQUISITION_DATE,
-                    case8=self.REPORT.NOTES,
-                    data0=str(self.case_info["name"] or "N/A"),
-                    data1=str(self.case_info["lawyer_name"] or "N/A"),
-                    data2=str(self.case_info["operator"] or "N/A"),
-                    data3=proceeding_type,
-                    data4=str(self.case_info["courthouse"] or "N/A"),
-                    data5=str(self.case_info["proceeding_number"] or "N/A"),
-                    data6=type,
-                    data7=ntp,
-                    data8=str(self.case_info["notes"] or "N/A").replace("\n", "<br>"),
-                    t4=self.REPORT.T4,
-                    t4descr=self.REPORT.T4DESCR,
-                    name=self.REPORT.NAME,
-                    descr=self.REPORT.DESCR,
-                    avi=acquisition_files[
-                        fnmatch.filter(acquisition_files.keys(), "*.avi")[0]
-                    ],
-                    avid=self.REPORT.AVID,
-                    hash=acquisition_files["acquisition.hash"],
-                    hashd=self.REPORT.HASHD,
-                    log=acquisition_files["acquisition.log"],
-                    logd=self.REPORT.LOGD,
-                    pcap=acquisition_files["acquisition.pcap"],
-                    pcapd=self.REPORT.PCAPD,
-                    zip=acquisition_files[
-                        fnmatch.filter(acquisition_files.keys(), "*.zip")[0]
-                    ],
-                    zipd=self.REPORT.ZIPD,
-                    whois=acquisition_files["whois.txt"],
-                    whoisd=self.REPORT.WHOISD,
-                    headers=acquisition_files["headers.txt"],
-                    headersd=self.REPORT.HEADERSD,
-                    nslookup=acquisition_files["nslookup.txt"],
-                    nslookupd=self.REPORT.NSLOOKUPD,
-                    cer=acquisition_files["server.cer"],
-                    cerd=self.REPORT.CERD,
-                    sslkey=acquisition_files["sslkey.log"],
-                    sslkeyd=self.REPORT.SSLKEYD,
-                    traceroute=acquisition_files["traceroute.txt"],
-                    tracerouted=self.REPORT.TRACEROUTED,
-                    t5=self.REPORT.T5,
-                    t5descr=self.REPORT.T5DESCR,
-                    file=hash_file_content,
-                    t6=self.REPORT.T6,
-                    t6descr=self.REPORT.T6DESCR,
-                    filedata=zip_enum,
-                    t7=self.REPORT.T7,
-                    t7descr=self.REPORT.T7DESCR,
-                    screenshot=screenshot,
-                    t8=self.REPORT.T8,
-                    t8descr=self.REPORT.T8DESCR,
-                    video_hyperlink=video,
-                    t9=self.REPORT.T9,
-                    t9descr=self.REPORT.T9DESCR,
-                    titlecc=self.REPORT.TITLECC,
-                    ccdescr=self.REPORT.CCDESCR,
-                    titleh=self.REPORT.TITLEH,
-                    hdescr=self.REPORT.HDESCR,
-                    page=self.REPORT.PAGE,
-                    of=self.REPORT.OF,
-                    logo=logo,
-                )
-
-            pdf_options = {
-                "page-size": "Letter",
-                "margin-top": "1in",
-                "margin-right": "1in",
-                "margin-bottom": "1in",
-                "margin-left": "1in",
-            }
-            # create pdf front and content, merge them and remove merged files
-            pisa.CreatePDF(
-                front_index, dest=self.output_front_result, options=pdf_options
-            )
-            pisa.CreatePDF(
-                content_index, dest=self.output_content_result, options=pdf_options
-            )
-
-        if (
-            type == "email"
-            or type == "instagram"
-            or type == "video"
-            or type == "entire_website"
-        ):
-            content_index_path = os.path.join(
-                resolve_path("assets/templates"), "template_email.html"
-            )
-
-            with open(os.path.join(content_index_path)) as fh:
-                template = Template(fh.read())
-
-                content_index = template.safe_substitute(
-                    title=self.REPORT.TITLE,
-                    index=self.REPORT.INDEX,
-                    description=self.REPORT.DESCRIPTION.format(
-                        self.REPORT.RELEASES_LINK
-                    ),
-                    t1=self.REPORT.T1,
-                    t2=self.REPORT.T2,
-                    case=self.REPORT.CASEINFO,
-                    casedata=self.REPORT.CASEDATA,
-                    case0=self.REPORT.CASE,
-                    case1=self.REPORT.LAWYER,
-                    case2=self.REPORT.OPERATOR,
-                    case3=self.REPORT.PROCEEDING,
-                    case4=self.REPORT.COURT,
-                    case5=self.REPORT.NUMBER,
-                    case6=self.REPORT.ACQUISITION_TYPE,
-                    case7=self.REPORT.ACQUISITION_DATE,
-                    case8=self.REPORT.NOTES,
-                    data0=str(self.case_info["name"] or "N/A"),
-                    data1=str(self.case_info["lawyer_name"] or "N/A"),
-                    data2=str(self.case_info["operator"] or "N/A"),
-                    data3=proceeding_type,
-                    data4=str(self.case_info["courthouse"] or "N/A"),
-                    data5=str(self.case_info["proceeding_number"] or "N/A"),
-                    data6=type,
-                    data7=ntp,
-                    data8=str(self.case_info["notes"] or "N/A").replace("\n", "<br>"),
-                    t4=self.REPORT.T4,
-                    t4descr=self.REPORT.T4DESCR,
-                    name=self.REPORT.NAME,
-                    descr=self.REPORT.DESCR,
-                    hash=acquisition_files["acquisition.hash"],
-                    hashd=self.REPORT.HASHD,
-                    log=acquisition_files["acquisition.log"],
-                    logd=self.REPORT.LOGD,
-                    zip=acquisition_files[
-                        fnmatch.filter(acquisition_files.keys(), "*.zip")[0]
-                    ],
-                    zipd=self.REPORT.ZIPD,
-                    t5=self.REPORT.T5,
-                    t5descr=self.REPORT.T5DESCR,
-                    file=hash_file_content,
-                    t6=self.REPORT.T6,
-                    t6descr=self.REPORT.T6DESCR,
-                    filedata=zip_enum,
-                    t7=self.REPORT.T7,
-                    t7descr=self.REPORT.T7DESCR,
-                    titlecc=self.REPORT.TITLECC,
-                    ccdescr=self.REPORT.CCDESCR,
-                    titleh=self.REPORT.TITLEH,
-                    hdescr=self.REPORT.HDESCR,
-                    page=self.REPORT.PAGE,
-                    of=self.REPORT.OF,
-                    logo=logo,
-                )
-            # create pdf front and content, merge them and remove merged files
-            pisa.CreatePDF(front_index, dest=self.output_front_result)
-            pisa.CreatePDF(content_index, dest=self.output_content_result)
-
-        merger = PdfMerger()
-        merger.append(self.output_front_result)
-        merger.append(self.output_content_result)
-
-        merger.write(os.path.join(self.cases_folder_path, "acquisition_report.pdf"))
-        merger.close()
-        self.output_content_result.close()
-        self.output_front_result.close()
-        if os.path.exists(self.output_front):
-            os.remove(self.output_front)
-        if os.path.exists(self.output_content):
-            os.remove(self.output_content)
-
     def _acquisition_files_names(self):
         acquisition_files = {}
         files = [f.name for f in os.scandir(self.cases_folder_path) if f.is_file()]
@@ -427,10 +266,7 @@ class Report:
                 zip_dir = os.path.join(self.cases_folder_path, fname)
 
         if zip_dir:
-            zip_folder = zipfile.ZipFile(zip_dir)
-            for zip_file in zip_folder.filelist:
-                size = zip_file.file_size
-                filename = zip_file.filename
+            for filename, size in self.__zip_files_list(zip_dir):
                 if filename.count(".") > 1:
                     filename = filename.rsplit(".", 1)[0]
                 else:
@@ -441,8 +277,32 @@ class Report:
                     zip_enum += "<hr>"
         return zip_enum
 
+    def __zip_files_list(self, zip_dir):
+        # members recorded by the zip task avoid reopening the archive
+        if self.manifest is not None:
+            record = self.manifest.get(zip_dir)
+            if record is not None and "members" in record:
+                return [
+                    (member["name"], member["size"]) for member in record["members"]
+                ]
+
+        with zipfile.ZipFile(zip_dir) as zip_folder:
+            return [
+                (zip_file.filename, zip_file.file_size)
+                for zip_file in zip_folder.filelist
+            ]
+
     def __hash_reader(self):
         hash_text = ""
+        if self.manifest is not None:
+            messages = self.manifest.get_hash_report_messages()
+            if messages:
+                # same lines written by the hash task in acquisition.hash
+                lines = "".join(message + "\n" for message in messages)
+                for line in lines.splitlines(keepends=True):
+                    hash_text += "<p>" + line + "</p>"
+                return hash_text
+
         with open(
             os.path.join(
                 self.cases_folder_path,
@@ -479,23 +339,36 @@ class Report:
 
             images = os.listdir(full_screenshot_path)
             main_screenshot = os.path.join(full_screenshot_path, images[0])
+            # the whole page is used when available, not only its first part
+            if os.path.isfile(main_screenshot_file):
+                main_screenshot = main_screenshot_file
 
+            screenshots = []
             files = os.listdir(screenshots_path)
             for file in files:
                 path = os.path.join(self.cases_folder_path, "screenshot", file)
                 if os.path.isfile(path):
                     if "full_page_" not in os.path.basename(file):
-                        screenshot_text += (
-                            "<p>"
-                            '<a href="file://'
-                            + path
-                            + '">'
-                            + "Screenshot"
-                            + os.path.basename(file)
-                            + '</a><br><img src="'
-                            + path
-                            + '"></p><br><br>'
-                        )
+                        screenshots.append(path)
+
+            # report embeds size-bounded tiles and links the originals
+            thumbnails = create_thumbnails_of_images(
+                screenshots + [main_screenshot],
+                os.path.join(screenshots_path, THUMBNAILS_FOLDER),
+            )
+
+            for path in screenshots:
+                screenshot_text += (
+                    "<p>"
+                    '<a href="file://'
+                    + path
+                    + '">'
+                    + "Screenshot"
+                    + os.path.basename(path)
+                    + "</a><br>"
+                    + self.__get_images_tag(thumbnails[path])
+                    + "</p><br><br>"
+                )
 
             # main full page screenshot
             screenshot_text += (
@@ -504,13 +377,16 @@ class Report:
                 + main_screenshot_file
                 + '">'
                 + self.REPORT.COMPLETE_SCREENSHOT
-                + '</a><br><img src="'
-                + main_screenshot
-                + '"></p>'
+                + "</a><br>"
+                + self.__get_images_tag(thumbnails[main_screenshot])
+                + "</p>"
             )
 
         return screenshot_text
 
+    def __get_images_tag(self, images):
+        return "<br>".join('<img src="' + image + '">' for image in images)
+
     def __insert_video_hyperlink(self):
         acquisition_files = {}
         files = [f.name for f in os.scandir(self.cases_folder_path) if f.is_file()]
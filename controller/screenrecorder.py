@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+######
+# -----
+# Copyright (c) 2023 FIT-Project
+# SPDX-License-Identifier: GPL-3.0-only
+# -----
+######
+import csv
+import os
+import queue
+import threading
+import time
+
+from datetime import datetime, timezone
+
+import cv2
+import numpy as np
+
+from PIL import ImageGrab
+
+# preallocated frames shared by the capture and the encode stage
+RING_BUFFER_SIZE = 6
+
+
+def get_frames_filename(filename):
+    return os.path.splitext(filename)[0] + ".frames.csv"
+
+
+class FrameRingBuffer:
+    def __init__(self, size, width, height):
+        self.frames = np.empty((size, height, width, 3), dtype=np.uint8)
+        self.free = queue.Queue()
+        self.filled = queue.Queue()
+        for slot in range(size):
+            self.free.put(slot)
+
+    def acquire(self):
+        # the capture never waits the encoder, a full buffer means a dropped frame
+        try:
+            return self.free.get_nowait()
+        except queue.Empty:
+            return None
+
+    def publish(self, slot, timestamp):
+        self.filled.put((slot, timestamp))
+
+    def close(self):
+        self.filled.put(None)
+
+    def next(self):
+        return self.filled.get()
+
+    def release(self, slot):
+        self.free.put(slot)
+
+
+class ScreenRecorder:
+    """Record the screen at a constant frame rate.
+
+    Capture and encode run on different threads joined by a ring buffer of
+    preallocated frames. The capture is paced on wall-clock timestamps and
+    every frame is placed in the video at the index given by its timestamp:
+    missing indexes are filled duplicating the previous frame and frames
+    arriving when the buffer is full are dropped, so the video timeline
+    always matches the recording time.
+    With detect_damage, frames equal to the previous one (compared on a
+    downsampled grid) are not converted nor sent to the encoder, they're
+    written as duplicates of the previous frame.
+    The timestamp of each frame of the video is written in a CSV sidecar.
+    """
+
+    def __init__(self, filename, codec, fps, bbox, detect_damage=True):
+        self.filename = filename
+        self.frames_filename = get_frames_filename(filename)
+        self.codec = codec
+        self.fps = fps
+        self.bbox = bbox
+        self.width = bbox[2] - bbox[0]
+        self.height = bbox[3] - bbox[1]
+        self.detect_damage = detect_damage
+        self.is_running = True
+
+        self.captured_frames = 0
+        self.unchanged_frames = 0
+        self.written_frames = 0
+        self.duplicated_frames = 0
+        # incremented by both the capture and the encode stage
+        self.dropped_frames = 0
+        self.dropped_frames_lock = threading.Lock()
+
+    @property
+    def stats(self):
+        return {
+            "captured": self.captured_frames,
+            "unchanged": self.unchanged_frames,
+            "written": self.written_frames,
+            "duplicated": self.duplicated_frames,
+            "dropped": self.dropped_frames,
+        }
+
+    def record(self):
+        self.buffer = FrameRingBuffer(RING_BUFFER_SIZE, self.width, self.height)
+        self.start_time = time.perf_counter()
+        self.start_wall_time = time.time()
+        self.stop_time = None
+        self.encode_error = None
+
+        encoder = threading.Thread(target=self.__encode)
+        encoder.start()
+        try:
+            self.__capture()
+        finally:
+            self.stop_time = time.perf_counter()
+            self.buffer.close()
+            encoder.join()
+
+        if self.encode_error is not None:
+            raise self.encode_error
+
+    def stop(self):
+        self.is_running = False
+
+    def __capture(self):
+        interval = 1 / self.fps
+        tick = 0
+        # the whole frame is compared, a change of a single pixel (e.g. the
+        # text cursor) must be recorded
+        previous_frame = None
+        while self.is_running:
+            deadline = self.start_time + tick * interval
+            now = time.perf_counter()
+            if now < deadline:
+                time.sleep(deadline - now)
+
+            timestamp = time.perf_counter()
+            slot = self.buffer.acquire()
+            if slot is None:
+                self.__add_dropped_frame()
+            else:
+                frame = self.buffer.frames[slot]
+                self.__grab(frame)
+                self.captured_frames += 1
+
+                if self.detect_damage:
+                    if previous_frame is None:
+                        previous_frame = frame.copy()
+                    elif np.array_equal(frame, previous_frame):
+                        # the encoder fills this index with the previous frame
+                        self.buffer.release(slot)
+                        self.unchanged_frames += 1
+                        slot = None
+                    else:
+                        previous_frame[...] = frame
+
+                if slot is not None:
+                    self.buffer.publish(slot, timestamp)
+
+            # skip the ticks already passed, the encoder fills the gap
+            tick = int((time.perf_counter() - self.start_time) / interval) + 1
+
+    def __grab(self, frame):
+        image = ImageGrab.grab(bbox=self.bbox)
+        if image.size != (self.width, self.height):
+            image = image.resize((self.width, self.height))
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        frame[...] = np.asarray(image)
+
+    def __encode(self):
+        out = cv2.VideoWriter(
+            self.filename, self.codec, self.fps, (self.width, self.height)
+        )
+        current = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        previous = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        previous_timestamp = None
+        next_index = 0
+        is_closed = False
+
+        try:
+            with open(self.frames_filename, "w", newline="") as f:
+                frames = csv.writer(f)
+                frames.writerow(["frame", "elapsed", "captured_at", "type"])
+
+                while (item := self.buffer.next()) is not None:
+                    slot, timestamp = item
+                    index = self.__get_index(timestamp)
+                    if index < next_index:
+                        # another frame has already been written for this index
+                        self.buffer.release(slot)
+                        self.__add_dropped_frame()
+                        continue
+
+                    # Convert it from RGB(Red, Green, Blue) to BGR(Blue, Green, Red)
+                    cv2.cvtColor(self.buffer.frames[slot], cv2.COLOR_RGB2BGR, current)
+                    self.buffer.release(slot)
+
+                    if previous_timestamp is None:
+                        previous[...] = current
+                        previous_timestamp = timestamp
+
+                    while next_index < index:
+                        out.write(previous)
+                        self.__write_row(frames, next_index, previous_timestamp, True)
+                        next_index += 1
+
+                    out.write(current)
+                    self.__write_row(frames, next_index, timestamp, False)
+                    next_index += 1
+
+                    current, previous = previous, current
+                    previous_timestamp = timestamp
+                is_closed = True
+
+                # the video lasts until the recorder has been stopped
+                if previous_timestamp is not None:
+                    while next_index < self.__get_index(self.stop_time):
+                        out.write(previous)
+                        self.__write_row(frames, next_index, previous_timestamp, True)
+                        next_index += 1
+
+        except Exception as e:
+            self.encode_error = e
+            self.is_running = False
+            # unblock the capture stage, unless the buffer has already been
+            # closed and drained
+            while not is_closed:
+                item = self.buffer.next()
+                if item is None:
+                    break
+                self.buffer.release(item[0])
+        finally:
+            out.release()
+
+    def __add_dropped_frame(self):
+        with self.dropped_frames_lock:
+            self.dropped_frames += 1
+
+    def __get_index(self, timestamp):
+        return round((timestamp - self.start_time) * self.fps)
+
+    def __write_row(self, frames, index, timestamp, is_duplicated):
+        captured_at = datetime.fromtimestamp(
+            self.start_wall_time + timestamp - self.start_time, timezone.utc
+        )
+        frames.writerow(
+            [
+                index,
+                "{:.3f}".format(index / self.fps),
+                captured_at.isoformat(),
+                "duplicate" if is_duplicated else "capture",
+            ]
+        )
+        self.written_frames += 1
+        if is_duplicated:
+            self.duplicated_frames += 1
@@ -7,36 +7,116 @@
 # -----
 ######
 
+import email.parser
+import email.policy
 import imaplib
-import pyzmail
+
+from controller.mail import CONNECTION_ERRORS, get_message_set, parse_fetch_response
+
+# PECs returned by each page of fetch_pec, their headers are fetched with
+# a single FETCH command
+FETCH_BATCH_SIZE = 100
+HEADER_FIELDS = "FROM DATE SUBJECT MESSAGE-ID"
+MAILBOX = "inbox"
+
+# headers already fetched for each (server, port, email, mailbox), they're
+# valid until the UIDVALIDITY of the mailbox changes
+HEADERS_CACHE = {}
 
 
 class SearchPec:
+    """Search the PECs in the inbox.
+
+    The login is done once and the session is kept until close(), so the
+    searches repeated while the criteria are refined only run the SEARCH
+    command; a session closed by the server meanwhile is opened again.
+    fetch_pec yields the PECs found a page at a time; the headers are
+    cached by UID and fetched only for the UIDs never seen before.
+    """
+
     def __init__(self, pec_email, password, imap_server, imap_port, case_info):
         self.pec_email = pec_email
         self.password = password
         self.imap_server = imap_server
         self.imap_port = imap_port
         self.case_info = case_info
+        self.server = None
+        self.headers = None
+
+    def fetch_pec(self, search_criteria, page_size=FETCH_BATCH_SIZE):
+        try:
+            uids = self.__search(search_criteria)
+
+            for start in range(0, len(uids), page_size):
+                page = uids[start : start + page_size]
+                missing = [uid for uid in page if uid not in self.headers]
+                if missing:
+                    self.headers.update(self.__fetch_headers(missing))
+                yield [self.headers[uid] for uid in page if uid in self.headers]
 
-    def fetch_pec(self, search_criteria):
-        pecs = []
+        except imaplib.IMAP4.error as e:
+            raise Exception(e)
 
-        with imaplib.IMAP4_SSL(self.imap_server, self.imap_port) as server:
+    def close(self):
+        if self.server is not None:
             try:
-                server.login(self.pec_email, self.password)
-                server.select("inbox")
-                status, messages = server.search(None, search_criteria)
-                messages = messages[0].split(b" ")
-
-                if str(messages) != "[b'']":
-                    for msg_id in messages:
-                        status, raw_email = server.fetch(msg_id, "BODY.PEEK[HEADER]")
-                        raw_email = raw_email[0][1]
-                        message = pyzmail.PyzMessage.factory(raw_email)
-                        pecs.append(message)
-
-            except imaplib.IMAP4.error as e:
-                raise Exception(e)
-
-        return pecs
+                self.server.logout()
+            except Exception:
+                pass
+            self.server = None
+
+    def __search(self, search_criteria):
+        try:
+            status, messages = self.__get_server().uid("SEARCH", None, search_criteria)
+        except CONNECTION_ERRORS:
+            # the session kept since the last search has expired
+            self.close()
+            status, messages = self.__get_server().uid("SEARCH", None, search_criteria)
+        return [int(uid) for uid in messages[0].split()]
+
+    def __get_server(self):
+        if self.server is None:
+            self.server = imaplib.IMAP4_SSL(self.imap_server, self.imap_port)
+            self.server.login(self.pec_email, self.password)
+            self.server.select(MAILBOX, readonly=True)
+            self.headers = self.__get_cache(self.__get_uidvalidity())
+        return self.server
+
+    def __get_uidvalidity(self):
+        status, data = self.server.response("UIDVALIDITY")
+        if not data or data[0] is None:
+            return 0
+        return int(data[0])
+
+    def __get_cache(self, uidvalidity):
+        key = (self.imap_server, int(self.imap_port), self.pec_email, MAILBOX)
+        cache = HEADERS_CACHE.get(key)
+        if cache is None or cache[0] != uidvalidity:
+            # UIDs of a different UIDVALIDITY are other messages
+            cache = (uidvalidity, {})
+            HEADERS_CACHE[key] = cache
+        return cache[1]
+
+    def __fetch_headers(self, uids):
+        status, data = self.server.uid(
+            "FETCH",
+            get_message_set(uids),
+            "(BODY.PEEK[HEADER.FIELDS ({})])".format(HEADER_FIELDS),
+        )
+
+        parser = email.parser.BytesHeaderParser(policy=email.policy.default)
+        headers = {}
+        for uid, header in parse_fetch_response(data):
+            if header is None:
+                continue
+
+            # the default policy decodes the encoded words
+            message = parser.parsebytes(header)
+            headers[uid] = {
+                "uid": uid,
+                "from": str(message.get("from", "")),
+                "date": str(message.get("date", "")),
+                "subject": str(message.get("subject", "")),
+                "message_id": str(message.get("message-id", "")),
+            }
+        return headers
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+######
+# -----
+# Copyright (c) 2023 FIT-Project
+# SPDX-License-Identifier: GPL-3.0-only
+# -----
+######
+
+import gzip
+import io
+import threading
+import zlib
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from urllib.parse import urljoin
+
+import lxml.etree
+import requests
+import urllib3
+
+from controller.crawler import BLOOM_FILTER_THRESHOLD, BloomFilter
+
+SITEMAP_WORKERS = 4
+SITEMAP_TIMEOUT = 30
+# sitemaps read from a single sitemap url, indexes included
+SITEMAP_MAX_FILES = 1000
+# urls sent to on_urls at a time
+SITEMAP_BATCH_SIZE = 500
+# above BLOOM_FILTER_THRESHOLD urls the duplicates are found by a Bloom
+# filter of this capacity (about 24 MB), so the memory doesn't grow with
+# the sitemaps; a rare false positive skips a url
+SITEMAP_BLOOM_FILTER_CAPACITY = 10000000
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+# a sitemap failing with these errors is skipped, the urls read until the
+# error are kept
+READ_ERRORS = (
+    requests.RequestException,
+    urllib3.exceptions.HTTPError,
+    lxml.etree.XMLSyntaxError,
+    zlib.error,
+    OSError,
+    EOFError,
+    ValueError,
+)
+
+
+class SitemapParser:
+    """Read the urls listed by a sitemap.
+
+    Sitemaps are streamed from the network, decompressed on the fly when
+    gzipped and parsed with lxml iterparse, so only the element being read
+    is kept in memory. Sitemap indexes are followed and their children are
+    read concurrently, up to SITEMAP_MAX_FILES files. With lastmod_since
+    (YYYY-MM-DD), urls and sitemaps modified before that day are skipped.
+    Plain text sitemaps (one url per line) are supported too.
+    on_urls(urls) receives the new urls in batches while they're read, the
+    urls are not kept and parse returns only their number.
+    """
+
+    def __init__(
+        self,
+        headers=None,
+        workers=SITEMAP_WORKERS,
+        max_files=SITEMAP_MAX_FILES,
+        lastmod_since=None,
+        on_urls=None,
+    ):
+        self.headers = headers or {}
+        self.workers = workers
+        self.max_files = max_files
+        self.lastmod_since = lastmod_since
+        self.on_urls = on_urls
+        self.lock = threading.Lock()
+
+    def parse(self, url):
+        self.seen = set()
+        self.urls_count = 0
+        sitemaps = {url}
+
+        with requests.Session() as session, ThreadPoolExecutor(
+            max_workers=self.workers
+        ) as executor:
+            session.headers.update(self.headers)
+            self.session = session
+
+            pending = {executor.submit(self.__parse_file, url)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for child in future.result():
+                        if child in sitemaps or len(sitemaps) >= self.max_files:
+                            continue
+                        sitemaps.add(child)
+                        pending.add(executor.submit(self.__parse_file, child))
+
+        return self.urls_count
+
+    def __parse_file(self, url):
+        # returns the children of a sitemap index
+        try:
+            with self.session.get(
+                url, stream=True, timeout=SITEMAP_TIMEOUT
+            ) as response:
+                if response.status_code != 200:
+                    return []
+
+                # Content-Encoding is decoded by urllib3, .xml.gz files are not
+                response.raw.decode_content = True
+                # the stream is closed by the response, not at its end where
+                # the buffered readers would still read from it
+                response.raw.auto_close = False
+                source = io.BufferedReader(response.raw)
+                if source.peek(2)[:2] == GZIP_MAGIC:
+                    source = gzip.GzipFile(fileobj=source)
+                    source = io.BufferedReader(source)
+
+                head = source.peek(64).lstrip(b"\xef\xbb\xbf").lstrip()
+                if head and not head.startswith(b"<"):
+                    return self.__parse_text(source, response.url)
+                return self.__parse_xml(source, response.url)
+        except READ_ERRORS:
+            return []
+
+    def __parse_xml(self, source, base_url):
+        urls = []
+        children = []
+        try:
+            for event, element in lxml.etree.iterparse(
+                source,
+                events=("end",),
+                tag=("{*}url", "{*}sitemap"),
+                resolve_entities=False,
+                no_network=True,
+                huge_tree=True,
+            ):
+                loc = element.findtext("{*}loc")
+                lastmod = element.findtext("{*}lastmod")
+                is_sitemap = lxml.etree.QName(element).localname == "sitemap"
+
+                # the element and its already read siblings are not needed
+                # anymore
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+
+                if not loc or not self.__is_modified(lastmod):
+                    continue
+
+                loc = urljoin(base_url, loc.strip())
+                if is_sitemap:
+                    children.append(loc)
+                else:
+                    urls.append(loc)
+                    if len(urls) >= SITEMAP_BATCH_SIZE:
+                        self.__add_urls(urls)
+                        urls = []
+        finally:
+            # also the urls read before an error
+            self.__add_urls(urls)
+        return children
+
+    def __parse_text(self, source, base_url):
+        urls = []
+        try:
+            for line in io.TextIOWrapper(
+                source, encoding="utf-8-sig", errors="replace"
+            ):
+                line = line.strip()
+                if line:
+                    urls.append(urljoin(base_url, line))
+                    if len(urls) >= SITEMAP_BATCH_SIZE:
+                        self.__add_urls(urls)
+                        urls = []
+        finally:
+            self.__add_urls(urls)
+        return []
+
+    def __is_modified(self, lastmod):
+        if self.lastmod_since is None or not lastmod:
+            return True
+        # W3C datetime, the date is enough to compare
+        return lastmod.strip()[:10] >= self.lastmod_since
+
+    def __add_urls(self, urls):
+        new_urls = []
+        with self.lock:
+            for url in urls:
+                if url not in self.seen:
+                    self.seen.add(url)
+                    new_urls.append(url)
+            self.urls_count += len(new_urls)
+
+            if isinstance(self.seen, set) and len(self.seen) > BLOOM_FILTER_THRESHOLD:
+                seen = BloomFilter(SITEMAP_BLOOM_FILTER_CAPACITY)
+                for url in self.seen:
+                    seen.add(url)
+                self.seen = seen
+        if new_urls and self.on_urls is not None:
+            self.on_urls(new_urls)
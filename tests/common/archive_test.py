@@ -0,0 +1,92 @@
+import hashlib
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+import zipfile
+
+from common.archive import ZipPackager
+
+
+class ZipPackagerTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.root_dir = os.path.join(self.folder, "acquisition")
+        self.files = {
+            "acquisition.log": b"log line\n" * 1000,
+            os.path.join("screenshot", "full_page.png"): os.urandom(64 * 1024),
+            os.path.join("screenshot", "page.html"): b"<html></html>" * 500,
+            "empty.txt": b"",
+        }
+        for name, content in self.files.items():
+            path = os.path.join(self.root_dir, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(content)
+        os.makedirs(os.path.join(self.root_dir, "downloads"))
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_round_trip(self):
+        progress = []
+        record = ZipPackager(
+            max_workers=2, progress=lambda *args: progress.append(args)
+        ).make_archive(self.root_dir, self.root_dir)
+
+        with zipfile.ZipFile(record["filename"]) as archive:
+            self.assertIsNone(archive.testzip())
+            for name, content in self.files.items():
+                self.assertEqual(archive.read(name.replace(os.sep, "/")), content)
+            self.assertIn("downloads/", archive.namelist())
+            self.assertEqual(
+                archive.getinfo("screenshot/full_page.png").compress_type,
+                zipfile.ZIP_STORED,
+            )
+            self.assertEqual(
+                archive.getinfo("acquisition.log").compress_type,
+                zipfile.ZIP_DEFLATED,
+            )
+
+        total_bytes = sum(len(content) for content in self.files.values())
+        self.assertEqual(progress[-1], (total_bytes, total_bytes))
+
+    def test_local_headers(self):
+        record = ZipPackager().make_archive(self.root_dir, self.root_dir)
+
+        with open(record["filename"], "rb") as f:
+            content = f.read()
+        with zipfile.ZipFile(record["filename"]) as archive:
+            for zinfo in archive.infolist():
+                # strict readers only trust the local header, no data descriptor
+                self.assertFalse(zinfo.flag_bits & 0x08)
+                header = content[zinfo.header_offset : zinfo.header_offset + 26]
+                crc, compress_size, file_size = struct.unpack("<LLL", header[14:26])
+                self.assertEqual(crc, zinfo.CRC)
+                self.assertEqual(compress_size, zinfo.compress_size)
+                self.assertEqual(file_size, zinfo.file_size)
+
+            self.assertTrue(archive.getinfo("downloads/").external_attr & 0x10)
+
+    def test_digests(self):
+        record = ZipPackager().make_archive(self.root_dir, self.root_dir)
+
+        with open(record["filename"], "rb") as f:
+            content = f.read()
+        self.assertEqual(record["size"], len(content))
+        self.assertEqual(record["hashes"]["md5"], hashlib.md5(content).hexdigest())
+        self.assertEqual(
+            record["hashes"]["sha256"], hashlib.sha256(content).hexdigest()
+        )
+
+        members = {member["name"]: member for member in record["members"]}
+        self.assertEqual(len(members), len(self.files))
+        for name, content in self.files.items():
+            member = members[name.replace(os.sep, "/")]
+            self.assertEqual(member["size"], len(content))
+            self.assertEqual(member["sha256"], hashlib.sha256(content).hexdigest())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+from common.manifest import AcquisitionManifest
+from view.tasks.post.hash import HashWorker
+
+HASHES = {"md5": "md5", "sha1": "sha1", "sha256": "sha256"}
+
+
+class AcquisitionManifestTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.filename = os.path.join(self.folder, "screenshot.png")
+        with open(self.filename, "wb") as f:
+            f.write(b"screenshot")
+
+    def tearDown(self):
+        AcquisitionManifest(self.folder).remove()
+        shutil.rmtree(self.folder)
+
+    def test_record_is_reused(self):
+        manifest = AcquisitionManifest(self.folder)
+        manifest.add("screenshot.png", HASHES)
+        manifest.save()
+
+        manifest = AcquisitionManifest(self.folder)
+        self.assertEqual(
+            manifest.get_hashes(self.filename, ["md5", "sha256"]),
+            {"md5": "md5", "sha256": "sha256"},
+        )
+        self.assertIsNone(manifest.get_hashes("screenshot.png", ["sha512"]))
+
+    def test_record_is_dropped_when_the_file_changes(self):
+        manifest = AcquisitionManifest(self.folder)
+        manifest.add("screenshot.png", HASHES)
+
+        with open(self.filename, "ab") as f:
+            f.write(b" changed")
+
+        self.assertIsNone(manifest.get("screenshot.png"))
+        self.assertNotIn("screenshot.png", manifest.artifacts)
+
+    def test_manifest_is_not_in_the_acquisition(self):
+        manifest = AcquisitionManifest(self.folder)
+        manifest.save()
+
+        self.assertTrue(os.path.isfile(manifest.filename))
+        self.assertEqual(os.listdir(self.folder), ["screenshot.png"])
+
+        manifest.remove()
+        self.assertFalse(os.path.exists(manifest.filename))
+        manifest.remove()
+
+    def test_hash_worker_reuses_the_manifest(self):
+        manifest = AcquisitionManifest(self.folder)
+        manifest.add("screenshot.png", HASHES)
+        for name in ("acquisition.hash", "acquisition.log", "excluded.txt"):
+            with open(os.path.join(self.folder, name), "wb") as f:
+                f.write(name.encode())
+
+        worker = HashWorker()
+        worker.logger = logging.getLogger("manifest_test")
+        worker.folder = self.folder
+        worker.manifest = manifest
+        worker.exclude_list = ["excluded.txt"]
+        worker.start()
+
+        self.assertEqual(
+            sorted(manifest.hash_report), ["acquisition.log", "screenshot.png"]
+        )
+        self.assertEqual(manifest.get("screenshot.png")["hashes"], HASHES)
+        with open(os.path.join(self.folder, "acquisition.log"), "rb") as f:
+            sha256 = hashlib.sha256(f.read()).hexdigest()
+        self.assertEqual(manifest.get("acquisition.log")["hashes"]["sha256"], sha256)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from PIL import Image
+
+from common.stitcher import IDAT_MAX_SIZE, PngStitcher
+
+
+class PngStitcherTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.filename = os.path.join(self.folder, "full_page.png")
+        self.random = np.random.default_rng(0)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def __get_part(self, height, width):
+        return self.random.integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+    def test_round_trip(self):
+        parts = [self.__get_part(40, 64), self.__get_part(1, 64)]
+        with PngStitcher(self.filename, 64) as stitcher:
+            for part in parts:
+                stitcher.append(part)
+
+        with Image.open(self.filename) as image:
+            self.assertEqual(image.mode, "RGB")
+            self.assertEqual(image.size, (64, 41))
+            np.testing.assert_array_equal(np.asarray(image), np.concatenate(parts))
+
+    def test_parts_are_cropped_and_padded(self):
+        wide = self.__get_part(10, 80)
+        narrow = self.__get_part(10, 50)
+        with PngStitcher(self.filename, 64) as stitcher:
+            stitcher.append(wide)
+            stitcher.append(narrow[:0])
+            stitcher.append(narrow)
+
+        with Image.open(self.filename) as image:
+            pixels = np.asarray(image)
+        self.assertEqual(pixels.shape, (20, 64, 3))
+        np.testing.assert_array_equal(pixels[:10], wide[:, :64])
+        np.testing.assert_array_equal(pixels[10:, :50], narrow)
+        self.assertTrue((pixels[10:, 50:] == 255).all())
+
+    def test_several_idat_chunks(self):
+        # random rows don't compress, every chunk gets filled
+        part = self.__get_part(IDAT_MAX_SIZE // (256 * 3) + 10, 256)
+        with PngStitcher(self.filename, 256) as stitcher:
+            stitcher.append(part)
+            stitcher.append(part)
+
+        with Image.open(self.filename) as image:
+            np.testing.assert_array_equal(
+                np.asarray(image), np.concatenate((part, part))
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
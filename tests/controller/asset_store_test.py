@@ -0,0 +1,81 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from controller.asset_store import INDEX_SUFFIX, AssetStore
+
+
+class AssetStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def __get_blobs(self):
+        return [
+            os.path.relpath(os.path.join(dirpath, name), self.folder)
+            for dirpath, dirnames, filenames in os.walk(self.folder)
+            for name in filenames
+        ]
+
+    def test_same_content_is_saved_once(self):
+        store = AssetStore(self.folder)
+        content = b"body { color: red; }"
+        digest = store.add(content, "https://example.com/style.css?v=1")
+
+        self.assertEqual(digest, hashlib.sha256(content).hexdigest())
+        self.assertEqual(
+            store.add(content, "https://cdn.example.com/other.css"), digest
+        )
+        self.assertEqual(store.add(content), digest)
+
+        path = store.get_path(digest)
+        self.assertEqual(path, "assets/{}/{}.css".format(digest[:2], digest))
+        self.assertEqual(self.__get_blobs(), [os.path.normpath(path)])
+        with open(os.path.join(self.folder, path), "rb") as f:
+            self.assertEqual(f.read(), content)
+
+    def test_blob_of_another_store_is_reused(self):
+        content = b"\x89PNG"
+        digest = AssetStore(self.folder).add(content, "https://example.com/a.png")
+
+        store = AssetStore(self.folder)
+        self.assertEqual(store.add(content, "https://example.com/a.png"), digest)
+        self.assertEqual(len(self.__get_blobs()), 1)
+
+    def test_extension(self):
+        store = AssetStore(self.folder)
+        digest = store.add(b"a", "https://example.com/script.JS")
+        self.assertTrue(store.get_path(digest).endswith(".js"))
+        digest = store.add(b"b", "https://example.com/image.php/../x.not_an_extension")
+        self.assertNotIn(".", os.path.basename(store.get_path(digest)))
+        digest = store.add(b"c", "https://example.com/")
+        self.assertNotIn(".", os.path.basename(store.get_path(digest)))
+
+    def test_index(self):
+        store = AssetStore(self.folder)
+        page = store.add(b"<html></html>", "https://example.com/")
+        image = store.add(b"image", "https://example.com/a.png")
+        store.write_index(
+            "index",
+            "https://example.com/",
+            page,
+            {"https://example.com/a.png": image, "https://example.com/b.png": None},
+        )
+
+        with open(os.path.join(self.folder, "index" + INDEX_SUFFIX)) as f:
+            index = json.load(f)
+        self.assertEqual(index["sha256"], page)
+        self.assertEqual(
+            index["resources"]["https://example.com/a.png"],
+            {"sha256": image, "path": store.get_path(image)},
+        )
+        self.assertIsNone(index["resources"]["https://example.com/b.png"])
+
+
+if __name__ == "__main__":
+    unittest.main()
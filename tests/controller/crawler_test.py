@@ -0,0 +1,62 @@
+import unittest
+
+from controller.crawler import BloomFilter, Crawler, canonicalize_url, get_url_key
+
+
+class CanonicalizeUrlTest(unittest.TestCase):
+    def test_canonical_form(self):
+        self.assertEqual(
+            canonicalize_url("HTTPS://Example.COM:443/a/./b/../c?z=1&a=2#top"),
+            "https://example.com/a/c?a=2&z=1",
+        )
+        self.assertEqual(
+            canonicalize_url("http://example.com:8080//a//b/"),
+            "http://example.com:8080/a/b/",
+        )
+        self.assertEqual(canonicalize_url("http://example.com"), "http://example.com/")
+        self.assertEqual(
+            canonicalize_url("http://user@example.com/a/b/.."),
+            "http://user@example.com/a/",
+        )
+
+    def test_url_key(self):
+        self.assertEqual(
+            get_url_key("http://example.com/page/"),
+            get_url_key("http://EXAMPLE.com/page"),
+        )
+        self.assertEqual(get_url_key("http://example.com/"), "http://example.com/")
+        self.assertNotEqual(
+            get_url_key("http://example.com/page?a=1"),
+            get_url_key("http://example.com/page?a=2"),
+        )
+
+
+class BloomFilterTest(unittest.TestCase):
+    def test_no_false_negatives(self):
+        bloom_filter = BloomFilter(1000)
+        keys = ["http://example.com/{}".format(i) for i in range(1000)]
+        for key in keys:
+            bloom_filter.add(key)
+
+        self.assertTrue(all(key in bloom_filter for key in keys))
+
+        false_positives = sum(
+            "http://example.org/{}".format(i) in bloom_filter for i in range(10000)
+        )
+        self.assertLess(false_positives, 10)
+
+
+class CrawlerScopeTest(unittest.TestCase):
+    def test_scope(self):
+        crawler = Crawler("https://Example.com/docs/index.html#intro")
+
+        self.assertEqual(crawler.start_url, "https://Example.com/docs/index.html")
+        self.assertTrue(crawler.is_in_scope("https://example.com:443/docs/page"))
+        self.assertTrue(crawler.is_in_scope("https://example.com/docs/a/../b"))
+        self.assertFalse(crawler.is_in_scope("https://example.com/blog/page"))
+        self.assertFalse(crawler.is_in_scope("http://example.com/docs/page"))
+        self.assertFalse(crawler.is_in_scope("https://other.com/docs/page"))
+
+
+if __name__ == "__main__":
+    unittest.main()
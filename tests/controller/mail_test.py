@@ -0,0 +1,60 @@
+import unittest
+
+from controller.mail import (
+    get_message_id,
+    get_message_set,
+    parse_fetch_response,
+    parse_sequence_set,
+)
+
+
+class MessageSetTest(unittest.TestCase):
+    def test_consecutive_ids_are_ranges(self):
+        self.assertEqual(get_message_set(["7", "1", "3", "2", "9", "10"]), "1:3,7,9:10")
+        self.assertEqual(get_message_set(["5"]), "5")
+        self.assertEqual(get_message_set([]), "")
+
+    def test_round_trip(self):
+        uids = [1, 2, 3, 5, 8, 9, 10, 42]
+        self.assertEqual(parse_sequence_set(get_message_set(uids)), uids)
+        self.assertEqual(parse_sequence_set("9:7,2"), [7, 8, 9, 2])
+
+
+class FetchResponseTest(unittest.TestCase):
+    def test_uid_before_the_literal(self):
+        response = [
+            (b"1 (UID 10 RFC822 {5}", b"first"),
+            b")",
+            (b"2 (UID 11 RFC822 {6}", b"second"),
+            b")",
+        ]
+        self.assertEqual(
+            parse_fetch_response(response), [(10, b"first"), (11, b"second")]
+        )
+
+    def test_uid_after_the_literal(self):
+        response = [(b"1 (RFC822 {5}", b"first"), b" UID 10)"]
+        self.assertEqual(parse_fetch_response(response), [(10, b"first")])
+
+    def test_message_without_literal(self):
+        response = [b"3 (UID 12 FLAGS (\\Seen))", None]
+        self.assertEqual(parse_fetch_response(response), [(12, None)])
+
+
+class MessageIdTest(unittest.TestCase):
+    def test_message_id(self):
+        message = b"Subject: test\r\nMessage-ID: <abc@example.com>\r\n\r\nbody"
+        self.assertEqual(get_message_id(message), "abc@example.com")
+
+    def test_folded_header(self):
+        message = b"Message-Id:\r\n <abc@example.com>\r\nSubject: test\r\n\r\nbody"
+        self.assertEqual(get_message_id(message), "abc@example.com")
+
+    def test_only_the_headers_are_read(self):
+        message = b"Subject: test\n\nMessage-ID: <body@example.com>\n"
+        self.assertIsNone(get_message_id(message))
+        self.assertIsNone(get_message_id(b"Message-ID: <>\r\n\r\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import functools
+import gzip
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from unittest import mock
+
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from controller.sitemap import SITEMAP_BATCH_SIZE, SitemapParser
+
+SITEMAP_INDEX = """<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>/pages.xml</loc><lastmod>2023-05-01</lastmod></sitemap>
+  <sitemap><loc>/posts.xml.gz</loc><lastmod>2023-06-01T10:00:00+00:00</lastmod></sitemap>
+  <sitemap><loc>/old.xml</loc><lastmod>2020-01-01</lastmod></sitemap>
+  <sitemap><loc>/missing.xml</loc></sitemap>
+  <sitemap><loc>/broken.xml.gz</loc></sitemap>
+</sitemapindex>
+"""
+
+URLSET = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+{}
+</urlset>
+"""
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class SitemapParserTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.folder = tempfile.mkdtemp()
+        cls.__write("sitemap_index.xml", SITEMAP_INDEX.encode())
+        cls.__write(
+            "pages.xml",
+            cls.__get_urlset(
+                [("/page-1", "2023-05-01"), ("/page-2", "2022-12-31"), ("/page-3", "")]
+            ),
+        )
+        cls.__write(
+            "posts.xml.gz",
+            gzip.compress(
+                cls.__get_urlset(
+                    [
+                        ("/posts/{}".format(i), "2023-06-01")
+                        for i in range(SITEMAP_BATCH_SIZE + 10)
+                    ]
+                )
+            ),
+        )
+        cls.__write("old.xml", cls.__get_urlset([("/old", "2020-01-01")]))
+        cls.__write("broken.xml.gz", gzip.compress(b"<urlset>")[:-12] + b"garbage")
+        cls.__write("sitemap.txt", b"\xef\xbb\xbf/page-1\n\n/page-4\r\n")
+
+        cls.server = ThreadingHTTPServer(
+            ("127.0.0.1", 0), functools.partial(QuietHandler, directory=cls.folder)
+        )
+        cls.url = "http://127.0.0.1:{}".format(cls.server.server_port)
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.thread.join()
+        shutil.rmtree(cls.folder)
+
+    @classmethod
+    def __write(cls, name, content):
+        with open(os.path.join(cls.folder, name), "wb") as f:
+            f.write(content)
+
+    @classmethod
+    def __get_urlset(cls, urls):
+        return URLSET.format(
+            "\n".join(
+                "<url><loc>{}</loc><lastmod>{}</lastmod></url>".format(loc, lastmod)
+                for loc, lastmod in urls
+            )
+        ).encode()
+
+    def __parse(self, path, **kwargs):
+        # the parser only returns the number of urls, they're sent to on_urls
+        batches = []
+        urls_count = SitemapParser(on_urls=batches.append, **kwargs).parse(
+            self.url + path
+        )
+        urls = [url for batch in batches for url in batch]
+        self.assertEqual(urls_count, len(urls))
+        self.assertEqual(len(set(urls)), len(urls))
+        if batches:
+            self.assertLessEqual(max(map(len, batches)), SITEMAP_BATCH_SIZE)
+        return set(urls)
+
+    def test_index_and_gzip(self):
+        urls = self.__parse("/sitemap_index.xml")
+
+        expected = {self.url + path for path in ("/page-1", "/page-2", "/page-3")}
+        expected.update(
+            "{}/posts/{}".format(self.url, i) for i in range(SITEMAP_BATCH_SIZE + 10)
+        )
+        expected.add(self.url + "/old")
+        self.assertEqual(urls, expected)
+
+    def test_duplicates_above_the_bloom_filter_threshold(self):
+        with mock.patch("controller.sitemap.BLOOM_FILTER_THRESHOLD", 10):
+            urls = self.__parse("/sitemap_index.xml")
+            self.assertEqual(self.__parse("/sitemap_index.xml"), urls)
+
+        self.assertEqual(len(urls), SITEMAP_BATCH_SIZE + 14)
+
+    def test_lastmod_since(self):
+        urls = self.__parse("/sitemap_index.xml", lastmod_since="2023-01-01")
+
+        self.assertIn(self.url + "/page-1", urls)
+        self.assertIn(self.url + "/page-3", urls)
+        self.assertIn(self.url + "/posts/0", urls)
+        self.assertNotIn(self.url + "/page-2", urls)
+        self.assertNotIn(self.url + "/old", urls)
+
+    def test_max_files(self):
+        urls = self.__parse("/sitemap_index.xml", max_files=2)
+
+        self.assertEqual(
+            urls, {self.url + path for path in ("/page-1", "/page-2", "/page-3")}
+        )
+
+    def test_text_sitemap(self):
+        urls = self.__parse("/sitemap.txt")
+
+        self.assertEqual(urls, {self.url + "/page-1", self.url + "/page-4"})
+
+    def test_missing_sitemap(self):
+        self.assertEqual(self.__parse("/missing.xml"), set())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -13,6 +13,8 @@ from PyQt6.QtCore import QObject, pyqtSignal
 from view.tasks.tasks_handler import TasksHandler
 from view.tasks.class_names import *
 
+from common.manifest import AcquisitionManifest
+
 
 class PostAcquisition(QObject):
     finished = pyqtSignal()
@@ -24,6 +26,9 @@ class PostAcquisition(QObject):
     def start_post_acquisition_sequence(self, increment, options):
         self.options = options
         self.increment = increment
+        self.options["manifest"] = AcquisitionManifest(
+            self.options["acquisition_directory"]
+        )
         self.__zip_and_remove()
 
     def __zip_and_remove(self):
@@ -87,14 +92,19 @@ class PostAcquisition(QObject):
             task.increment = self.increment
             task.start()
         else:
-            task.finished.connect(self.finished.emit)
+            self.__finished()
 
     def __send_pec_and_download_eml(self):
         task = self.task_handler.get_task(PEC_AND_DOWNLOAD_EML)
         if task:
-            task.finished.connect(self.finished.emit)
+            task.finished.connect(self.__finished)
             task.options = self.options
             task.increment = self.increment
             task.start()
         else:
-            self.finished.emit()
+            self.__finished()
+
+    def __finished(self):
+        # the manifest is only needed by the post acquisition tasks
+        self.options["manifest"].remove()
+        self.finished.emit()
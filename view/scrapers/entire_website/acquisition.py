@@ -16,7 +16,8 @@ from view.tasks.class_names import *
 
 class EntireWebsiteAcquisition(Acquisition):
     valid_url = pyqtSignal(str)
-    sitemap_finished = pyqtSignal(str, set)
+    sitemap_finished = pyqtSignal(str, int)
+    urls_found = pyqtSignal(list)
     download_finished = pyqtSignal()
     progress = pyqtSignal()
 
@@ -50,6 +51,16 @@ class EntireWebsiteAcquisition(Acquisition):
             self.task_entire_websiste.sitemap_finished.connect(
                 self.sitemap_finished.emit
             )
+
+            if (
+                self.task_entire_websiste.receivers(
+                    self.task_entire_websiste.urls_found
+                )
+                > 0
+            ):
+                self.task_entire_websiste.urls_found.disconnect()
+
+            self.task_entire_websiste.urls_found.connect(self.urls_found.emit)
             self.task_entire_websiste.get_sitemap()
 
     def download(self):
@@ -107,6 +107,7 @@ class EntireWebsite(QtWidgets.QMainWindow):
         self.acquisition_manager.valid_url.connect(self.__is_valid_url)
         self.acquisition_manager.progress.connect(self.__handle_progress)
         self.acquisition_manager.sitemap_finished.connect(self.__get_sitemap_finished)
+        self.acquisition_manager.urls_found.connect(self.__add_found_urls)
         self.acquisition_manager.post_acquisition_is_finished.connect(
             self.__acquisition_is_finished
         )
@@ -144,6 +145,9 @@ class EntireWebsite(QtWidgets.QMainWindow):
                         self.acquisition_manager.options[
                             "load_type"
                         ] = radio_button.objectName()
+                self.acquisition_manager.options[
+                    "lastmod_since"
+                ] = self.form.get_lastmod_since()
 
                 self.acquisition_manager.get_sitemap()
             elif self.acquisition_manager.caller_function_name == "__add_url":
@@ -181,12 +185,22 @@ class EntireWebsite(QtWidgets.QMainWindow):
     def __handle_progress(self):
         self.progress_bar.setValue(self.progress_bar.value() + int(self.increment))
 
-    def __get_sitemap_finished(self, __status, urls):
+    def __add_found_urls(self, urls):
+        for url in urls:
+            item = QListWidgetItem()
+            check_box = QCheckBox(url)
+            item.setSizeHint(check_box.sizeHint())
+            check_box.setChecked(True)
+            self.form.list_widget.addItem(item)
+            self.form.list_widget.setItemWidget(item, check_box)
+
+        self.form.set_url_preview_group_box_title()
+
+    def __get_sitemap_finished(self, __status, urls_count):
         self.spinner.stop()
         self.__enable_all(True)
         if __status == status.SUCCESS:
-            if len(urls) == 0:
-                pass
+            if urls_count == 0:
                 error_dlg = ErrorView(
                     QtWidgets.QMessageBox.Icon.Information,
                     entire_site.NO_URLS_FOUND,
@@ -197,15 +211,7 @@ class EntireWebsite(QtWidgets.QMainWindow):
                 )
                 error_dlg.exec()
             else:
-                self.form.list_widget.clear()
-                for url in sorted(urls):
-                    item = QListWidgetItem()
-                    check_box = QCheckBox(url)
-                    item.setSizeHint(check_box.sizeHint())
-                    check_box.setChecked(True)
-                    self.form.list_widget.addItem(item)
-                    self.form.list_widget.setItemWidget(item, check_box)
-
+                # the urls are already in the list, added while found
                 self.form.set_url_preview_group_box_title()
                 self.form.enable_preview_buttons(True)
                 self.form.enable_custom_urls_group_box(True)
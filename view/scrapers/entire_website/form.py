@@ -64,6 +64,27 @@ class EntireWebsiteForm(QtWidgets.QWidget):
         self.load_from_sitemap_radio_button.clicked.connect(self.__switch_load_type)
         self.load_type_vlayout.addWidget(self.load_from_sitemap_radio_button)
 
+        # LASTMOD FILTER, only the sitemap urls modified since the date
+        self.lastmod_since_checkbox = QtWidgets.QCheckBox(
+            self.url_configuration_group_box
+        )
+        self.lastmod_since_checkbox.setGeometry(QtCore.QRect(160, 90, 150, 20))
+        self.lastmod_since_checkbox.setFont(font)
+        self.lastmod_since_checkbox.setObjectName("lastmod_since_checkbox")
+        self.lastmod_since_checkbox.setEnabled(False)
+
+        self.lastmod_since_date = QtWidgets.QDateEdit(self.url_configuration_group_box)
+        self.lastmod_since_date.setGeometry(QtCore.QRect(160, 112, 110, 20))
+        self.lastmod_since_date.setFont(font)
+        self.lastmod_since_date.setCalendarPopup(True)
+        self.lastmod_since_date.setDisplayFormat("yyyy-MM-dd")
+        self.lastmod_since_date.setDate(QtCore.QDate.currentDate())
+        self.lastmod_since_date.setObjectName("lastmod_since_date")
+        self.lastmod_since_date.setEnabled(False)
+        self.lastmod_since_checkbox.toggled.connect(
+            self.lastmod_since_date.setEnabled
+        )
+
         # LOAD BUTTON
         self.load_website_button = QtWidgets.QPushButton(
             self.url_configuration_group_box
@@ -154,6 +175,7 @@ class EntireWebsiteForm(QtWidgets.QWidget):
 
         self.load_from_sitemap_radio_button.setText(entire_site.LOAD_FROM_SITEMAP)
         self.load_from_domain_radio_button.setText(entire_site.LOAD_FROM_DOMAIN)
+        self.lastmod_since_checkbox.setText(entire_site.LASTMOD_SINCE)
 
     def enable_custom_urls_group_box(self, enable):
         self.custom_urls_group_box.setEnabled(enable)
@@ -162,6 +184,14 @@ class EntireWebsiteForm(QtWidgets.QWidget):
         self.selector_button.setEnabled(enable)
         self.scrape_button.setEnabled(enable)
 
+    def get_lastmod_since(self):
+        if (
+            self.load_from_sitemap_radio_button.isChecked()
+            and self.lastmod_since_checkbox.isChecked()
+        ):
+            return self.lastmod_since_date.date().toString("yyyy-MM-dd")
+        return None
+
     def set_default(self):
         self.list_widget.clear()
         self.input_custom_url.setText("")
@@ -189,6 +219,10 @@ class EntireWebsiteForm(QtWidgets.QWidget):
         self.set_default()
         self.enable_custom_urls_group_box(False)
         self.enable_preview_buttons(False)
+        is_sitemap = self.sender().objectName() == "load_from_sitemap"
+        self.lastmod_since_checkbox.setEnabled(is_sitemap)
+        if not is_sitemap:
+            self.lastmod_since_checkbox.setChecked(False)
         if self.sender().objectName() == "load_from_domain":
             self.input_url.setPlaceholderText(entire_site.PLACEHOLDER_URL)
         elif self.sender().objectName() == "load_from_sitemap":
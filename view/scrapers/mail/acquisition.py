@@ -16,7 +16,9 @@ class MailAcquisition(Acquisition):
     logged_in = pyqtSignal(str)
 
     search_emails_finished = pyqtSignal(str, dict)
+    emails_found = pyqtSignal(str, list)
     download_finished = pyqtSignal()
+    download_failed = pyqtSignal()
     progress = pyqtSignal()
 
     def __init__(self, logger, progress_bar, status_bar, parent=None):
@@ -24,21 +26,28 @@ class MailAcquisition(Acquisition):
         self.start_tasks = [MAIL, PACKETCAPTURE]
         self.stop_tasks = [PACKETCAPTURE]
         self.stop_tasks_is_finished.connect(self.start_post_acquisition)
+        self.task_mail = None
 
     def login(self):
-        self.task_mail = self.tasks_manager.get_task(MAIL)
-        self.task_mail.logged_in.connect(self.logged_in.emit)
+        task_mail = self.tasks_manager.get_task(MAIL)
+        # login, search and download can be repeated, connect the task only once
+        if task_mail is not self.task_mail:
+            self.task_mail = task_mail
+            self.task_mail.logged_in.connect(self.logged_in.emit)
+            self.task_mail.search_emails_finished.connect(
+                self.search_emails_finished.emit
+            )
+            self.task_mail.emails_found.connect(self.emails_found.emit)
+            self.task_mail.download_finished.connect(self.stop)
+            self.task_mail.download_failed.connect(self.download_failed.emit)
+            self.task_mail.progress.connect(self.progress.emit)
+
         self.task_mail.login()
 
     def search(self):
         if self.task_mail:
-            self.task_mail.search_emails_finished.connect(
-                self.search_emails_finished.emit
-            )
             self.task_mail.search()
 
     def download(self):
         if self.task_mail:
-            self.task_mail.download_finished.connect(self.stop)
-            self.task_mail.progress.connect(self.progress.emit)
             self.task_mail.download()
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+######
+# -----
+# Copyright (c) 2023 FIT-Project
+# SPDX-License-Identifier: GPL-3.0-only
+# -----
+######
+
+import itertools
+
+from array import array
+
+from PyQt6 import QtCore
+
+from common.constants.view import mail
+
+# emails shown by the view at a time for each folder, the next ones are
+# added when the view scrolls to the end of the folder
+FETCH_SIZE = 500
+
+# internal ids of the indexes: the root, the folders and the emails of the
+# folder at row (internal id - EMAILS_ID)
+ROOT_ID = 0
+FOLDERS_ID = 1
+EMAILS_ID = 2
+
+UNCHECKED = 0
+CHECKED = 1
+
+
+class _Folder:
+    # emails are stored by column, one list (or array) for each field
+    def __init__(self, name):
+        self.name = name
+        self.uids = array("q")
+        self.senders = []
+        self.recipients = []
+        self.dates = []
+        self.subjects = []
+        self.checked = bytearray()
+        self.checked_count = 0
+        # emails already shown by the view
+        self.loaded = 0
+        self.is_loading = False
+
+    def __len__(self):
+        return len(self.uids)
+
+    def extend(self, emails):
+        for email in emails:
+            self.uids.append(int(email["uid"]))
+            self.senders.append(email["from"])
+            self.recipients.append(email["to"])
+            self.dates.append(email["date"])
+            self.subjects.append(email["subject"])
+        self.checked.extend(bytes(len(emails)))
+
+    def get_text(self, row):
+        return (
+            "Mittente: "
+            + self.senders[row]
+            + "\nDestinatario: "
+            + self.recipients[row]
+            + "\nData: "
+            + self.dates[row]
+            + "\nOggetto: "
+            + self.subjects[row]
+            + "\nUID: "
+            + str(self.uids[row])
+        )
+
+    def get_check_state(self):
+        if self.checked_count == 0:
+            return QtCore.Qt.CheckState.Unchecked
+        if self.checked_count == len(self):
+            return QtCore.Qt.CheckState.Checked
+        return QtCore.Qt.CheckState.PartiallyChecked
+
+
+class EmailsModel(QtCore.QAbstractItemModel):
+    """Tree model of the emails found by the search.
+
+    The tree has a root with a child for each folder and the emails of the
+    folder as grandchildren. Emails are kept in compact columns and never
+    as items: the view asks only for the rows it shows and the children of a
+    folder are loaded FETCH_SIZE at a time while the view scrolls.
+    Checking a folder checks all its emails with a single dataChanged and
+    the number of checked emails is always known without walking the tree.
+    """
+
+    checked_changed = QtCore.pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.folders = []
+        self.folders_index = {}
+        self.checked_count = 0
+
+    def clear(self):
+        self.beginResetModel()
+        self.folders = []
+        self.folders_index = {}
+        self.checked_count = 0
+        self.endResetModel()
+        self.checked_changed.emit(self.checked_count)
+
+    def add_emails(self, name, emails):
+        folder = self.folders_index.get(name)
+        if folder is None:
+            # the root is shown with its first folder
+            if self.folders:
+                row = len(self.folders)
+                self.beginInsertRows(self.__get_root_index(), row, row)
+            else:
+                self.beginInsertRows(QtCore.QModelIndex(), 0, 0)
+            folder = _Folder(name)
+            self.folders.append(folder)
+            self.folders_index[name] = folder
+            self.endInsertRows()
+
+        was_loaded = folder.loaded == len(folder)
+        folder.extend(emails)
+
+        # a folder already shown to the end grows until the first FETCH_SIZE,
+        # the other emails are loaded by fetchMore
+        if was_loaded and folder.loaded < FETCH_SIZE:
+            self.__load(folder, FETCH_SIZE - folder.loaded)
+
+        folder_index = self.__get_folder_index(folder)
+        self.dataChanged.emit(
+            folder_index, folder_index, [QtCore.Qt.ItemDataRole.CheckStateRole]
+        )
+
+    def get_checked_emails(self):
+        checked_emails = {}
+        for folder in self.folders:
+            if folder.checked_count > 0:
+                checked_emails[folder.name] = list(
+                    itertools.compress(folder.uids, folder.checked)
+                )
+        return checked_emails
+
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QtCore.QModelIndex()
+
+        if not parent.isValid():
+            return self.createIndex(row, column, ROOT_ID)
+        if parent.internalId() == ROOT_ID:
+            return self.createIndex(row, column, FOLDERS_ID)
+        return self.createIndex(row, column, EMAILS_ID + parent.row())
+
+    def parent(self, index):
+        if not index.isValid():
+            return QtCore.QModelIndex()
+
+        internal_id = index.internalId()
+        if internal_id == ROOT_ID:
+            return QtCore.QModelIndex()
+        if internal_id == FOLDERS_ID:
+            return self.__get_root_index()
+        return self.createIndex(internal_id - EMAILS_ID, 0, FOLDERS_ID)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if not parent.isValid():
+            return 1 if self.folders else 0
+        if parent.column() > 0:
+            return 0
+
+        internal_id = parent.internalId()
+        if internal_id == ROOT_ID:
+            return len(self.folders)
+        if internal_id == FOLDERS_ID:
+            return self.folders[parent.row()].loaded
+        return 0
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QtCore.QModelIndex()):
+        if not parent.isValid():
+            return bool(self.folders)
+
+        internal_id = parent.internalId()
+        if internal_id == ROOT_ID:
+            return bool(self.folders)
+        if internal_id == FOLDERS_ID:
+            return len(self.folders[parent.row()]) > 0
+        return False
+
+    def canFetchMore(self, parent):
+        if parent.isValid() and parent.internalId() == FOLDERS_ID:
+            folder = self.folders[parent.row()]
+            # the view can ask for more rows while they're being inserted
+            return not folder.is_loading and folder.loaded < len(folder)
+        return False
+
+    def fetchMore(self, parent):
+        if parent.isValid() and parent.internalId() == FOLDERS_ID:
+            self.__load(self.folders[parent.row()], FETCH_SIZE)
+
+    def data(self, index, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        internal_id = index.internalId()
+        if internal_id == ROOT_ID:
+            if role == QtCore.Qt.ItemDataRole.DisplayRole:
+                return mail.IMAP_FOLDERS
+            return None
+
+        if internal_id == FOLDERS_ID:
+            folder = self.folders[index.row()]
+            if role in (
+                QtCore.Qt.ItemDataRole.DisplayRole,
+                QtCore.Qt.ItemDataRole.UserRole,
+            ):
+                return folder.name
+            if role == QtCore.Qt.ItemDataRole.CheckStateRole:
+                return folder.get_check_state()
+            return None
+
+        folder = self.folders[internal_id - EMAILS_ID]
+        row = index.row()
+        if role == QtCore.Qt.ItemDataRole.DisplayRole:
+            return folder.get_text(row)
+        if role == QtCore.Qt.ItemDataRole.UserRole:
+            return folder.uids[row]
+        if role == QtCore.Qt.ItemDataRole.CheckStateRole:
+            if folder.checked[row]:
+                return QtCore.Qt.CheckState.Checked
+            return QtCore.Qt.CheckState.Unchecked
+        return None
+
+    def setData(self, index, value, role=QtCore.Qt.ItemDataRole.EditRole):
+        if (
+            not index.isValid()
+            or role != QtCore.Qt.ItemDataRole.CheckStateRole
+            or index.internalId() == ROOT_ID
+        ):
+            return False
+
+        is_checked = QtCore.Qt.CheckState(value) != QtCore.Qt.CheckState.Unchecked
+
+        if index.internalId() == FOLDERS_ID:
+            self.__set_folder_checked(self.folders[index.row()], is_checked)
+        else:
+            self.__set_email_checked(
+                self.folders[index.internalId() - EMAILS_ID], index.row(), is_checked
+            )
+
+        self.checked_changed.emit(self.checked_count)
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return QtCore.Qt.ItemFlag.NoItemFlags
+
+        flags = QtCore.Qt.ItemFlag.ItemIsEnabled | QtCore.Qt.ItemFlag.ItemIsSelectable
+        if index.internalId() != ROOT_ID:
+            flags |= QtCore.Qt.ItemFlag.ItemIsUserCheckable
+        return flags
+
+    def headerData(self, section, orientation, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if (
+            orientation == QtCore.Qt.Orientation.Horizontal
+            and role == QtCore.Qt.ItemDataRole.DisplayRole
+        ):
+            return mail.IMAP_FOUND_EMAILS
+        return None
+
+    def __get_root_index(self):
+        return self.createIndex(0, 0, ROOT_ID)
+
+    def __get_folder_index(self, folder):
+        return self.createIndex(self.folders.index(folder), 0, FOLDERS_ID)
+
+    def __load(self, folder, count):
+        count = min(count, len(folder) - folder.loaded)
+        if count <= 0 or folder.is_loading:
+            return
+
+        folder.is_loading = True
+        self.beginInsertRows(
+            self.__get_folder_index(folder),
+            folder.loaded,
+            folder.loaded + count - 1,
+        )
+        folder.loaded += count
+        self.endInsertRows()
+        folder.is_loading = False
+
+    def __set_folder_checked(self, folder, is_checked):
+        # all the emails of the folder change with one slice assignment and
+        # the view is notified once for the whole range of loaded rows
+        folder.checked[:] = (b"\x01" if is_checked else b"\x00") * len(folder)
+        checked_count = len(folder) if is_checked else 0
+        self.checked_count += checked_count - folder.checked_count
+        folder.checked_count = checked_count
+
+        folder_index = self.__get_folder_index(folder)
+        self.dataChanged.emit(
+            folder_index, folder_index, [QtCore.Qt.ItemDataRole.CheckStateRole]
+        )
+        if folder.loaded > 0:
+            self.dataChanged.emit(
+                self.index(0, 0, folder_index),
+                self.index(folder.loaded - 1, 0, folder_index),
+                [QtCore.Qt.ItemDataRole.CheckStateRole],
+            )
+
+    def __set_email_checked(self, folder, row, is_checked):
+        if folder.checked[row] == is_checked:
+            return
+
+        folder.checked[row] = CHECKED if is_checked else UNCHECKED
+        delta = 1 if is_checked else -1
+        folder.checked_count += delta
+        self.checked_count += delta
+
+        folder_index = self.__get_folder_index(folder)
+        email_index = self.index(row, 0, folder_index)
+        self.dataChanged.emit(
+            email_index, email_index, [QtCore.Qt.ItemDataRole.CheckStateRole]
+        )
+        self.dataChanged.emit(
+            folder_index, folder_index, [QtCore.Qt.ItemDataRole.CheckStateRole]
+        )
@@ -18,6 +18,7 @@ from PyQt6 import QtCore, QtWidgets, QtGui, uic
 
 from view.scrapers.mail.acquisition import MailAcquisition
 from view.scrapers.mail.clickable_label import ClickableLabel
+from view.scrapers.mail.emails_model import EmailsModel
 from view.dialog import Dialog, DialogButtonTypes
 
 from view.error import Error as ErrorView
@@ -163,9 +164,10 @@ class Mail(QtWidgets.QMainWindow):
         # EMAIL FOUNDED
         self.select_email = self.findChild(QtWidgets.QFrame, "select_email")
         enable_all(self.select_email.children(), False)
-        self.emails_tree = self.select_email.findChild(QtWidgets.QTreeWidget)
-        self.emails_tree.setHeaderLabel("")
-        self.emails_tree.itemChanged.connect(self.__on_item_changed)
+        self.emails_tree = self.select_email.findChild(QtWidgets.QTreeView)
+        self.emails_model = EmailsModel(self)
+        self.emails_model.checked_changed.connect(self.__on_checked_changed)
+        self.emails_tree.setModel(self.emails_model)
 
         # DOWNLOAD BUTTON
         self.download_button = self.select_email.findChild(QtWidgets.QPushButton)
@@ -205,9 +207,11 @@ class Mail(QtWidgets.QMainWindow):
 
         self.acquisition_manager.logged_in.connect(self.__is_logged_in)
         self.acquisition_manager.progress.connect(self.__handle_progress)
+        self.acquisition_manager.download_failed.connect(self.__download_failed)
         self.acquisition_manager.search_emails_finished.connect(
             self.__search_emails_finished
         )
+        self.acquisition_manager.emails_found.connect(self.__add_emails_on_tree_widget)
         self.acquisition_manager.post_acquisition_is_finished.connect(
             self.__acquisition_is_finished
         )
@@ -287,6 +291,9 @@ class Mail(QtWidgets.QMainWindow):
         selected_to_date = to_date.toPyDate()
         selected_to_date = selected_to_date + timedelta(days=1)
 
+        # emails are added on the tree while they're found
+        self.emails_model.clear()
+
         self.acquisition_manager.options["search_criteria"] = {
             "sender": self.search_email_from.text(),
             "recipient": self.search_email_to.text(),
@@ -312,56 +319,20 @@ class Mail(QtWidgets.QMainWindow):
             else:
                 enable_all(self.select_email.children(), True)
                 self.download_button.setEnabled(False)
-                self.__add_emails_on_tree_widget(emails)
-                self.emails_tree.expandAll()
+                # the root and the folders, emails are loaded while scrolling
+                self.emails_tree.expandToDepth(1)
         else:
+            self.emails_model.clear()
             enable_all(self.search_criteria.children(), True)
 
-    def __add_emails_on_tree_widget(self, emails):
-        self.emails_tree.setHeaderLabel(mail.IMAP_FOUND_EMAILS)
-        self.root = QtWidgets.QTreeWidgetItem([mail.IMAP_FOLDERS])
-        self.emails_tree.addTopLevelItem(self.root)
-
-        for key in emails:
-            self.folder_tree = QtWidgets.QTreeWidgetItem([key])
-            self.folder_tree.setData(
-                0, QtCore.Qt.ItemDataRole.UserRole, key
-            )  # add identifier to the tree items
-            self.folder_tree.setCheckState(0, QtCore.Qt.CheckState.Unchecked)
-            self.root.addChild(self.folder_tree)
-
-            for value in emails[key]:
-                sub_item = QtWidgets.QTreeWidgetItem([value])
-                sub_item.setData(0, QtCore.Qt.ItemDataRole.UserRole, key)
-                sub_item.setCheckState(0, QtCore.Qt.CheckState.Unchecked)
-                self.folder_tree.addChild(sub_item)
-
-        self.emails_tree.expandItem(self.root)
-
-    def __is_checked(self):
-        for i in range(self.root.childCount()):
-            parent = self.root.child(i)
-            for k in range(parent.childCount()):
-                child = parent.child(k)
-                if (
-                    child.checkState(0) == QtCore.Qt.CheckState.Checked
-                    and self.download_button.isEnabled() is False
-                ):
-                    self.download_button.setEnabled(True)
-            if (
-                parent.checkState(0) == QtCore.Qt.CheckState.Checked
-                and self.download_button.isEnabled() is False
-            ):
-                parent.setCheckState(0, QtCore.Qt.CheckState.Unchecked)
-
-    def __on_item_changed(self, item, column):
-        child_count = item.childCount()
-        for i in range(child_count):
-            child = item.child(i)
-            child.setCheckState(column, item.checkState(column))
-
-        self.download_button.setEnabled(False)
-        self.__is_checked()
+    def __add_emails_on_tree_widget(self, key, emails):
+        is_empty = self.emails_model.rowCount() == 0
+        self.emails_model.add_emails(key, emails)
+        if is_empty:
+            self.emails_tree.expand(self.emails_model.index(0, 0))
+
+    def __on_checked_changed(self, checked_count):
+        self.download_button.setEnabled(checked_count > 0)
 
     def __download(self):
         enable_all(self.select_email.children(), False)
@@ -370,32 +341,39 @@ class Mail(QtWidgets.QMainWindow):
         self.progress_bar.setHidden(False)
         self.progress_bar.setValue(0)
 
-        emails_to_download = {}
-
-        emails_counter = 0
-        for i in range(self.root.childCount()):
-            folder = self.root.child(i)
-            folder_name = folder.text(0)
-            for k in range(folder.childCount()):
-                email = folder.child(k)
-                if email.checkState(0) == QtCore.Qt.CheckState.Checked:
-                    emails_counter += 1
-                    if folder_name in emails_to_download:
-                        emails_to_download[folder_name].append(email.text(0))
-                    else:
-                        emails_to_download[folder_name] = [email.text(0)]
-
-        self.increment = 100 / emails_counter
+        emails_to_download = self.emails_model.get_checked_emails()
+
+        self.increment = 100 / self.emails_model.checked_count
         self.acquisition_manager.options["emails_to_download"] = emails_to_download
         self.acquisition_manager.download()
 
+    def __download_failed(self):
+        self.spinner.stop()
+
+        dialog = Dialog(mail.DOWNLOAD_INTERRUPTED, details.MAIL_DOWNLOAD_INTERRUPTED)
+        dialog.message.setStyleSheet("font-size: 13px;")
+        dialog.set_buttons_type(DialogButtonTypes.QUESTION)
+        dialog.left_button.clicked.connect(lambda: self.__resume_download(dialog))
+        # otherwise the acquisition goes on with the emails already downloaded
+        dialog.right_button.clicked.connect(lambda: self.__stop_download(dialog))
+
+        dialog.exec()
+
+    def __resume_download(self, dialog):
+        dialog.close()
+        self.__download()
+
+    def __stop_download(self, dialog):
+        dialog.close()
+        self.acquisition_manager.stop()
+
     def __handle_progress(self):
         self.progress_bar.setValue(self.progress_bar.value() + int(self.increment))
 
     def __acquisition_is_finished(self):
         self.spinner.stop()
         enable_all(self.server_configuration.children(), True)
-        self.emails_tree.clear()
+        self.emails_model.clear()
         self.progress_bar.setHidden(True)
         self.status.setText("")
         self.acquisition_manager.log_end_message()
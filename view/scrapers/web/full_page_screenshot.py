@@ -8,14 +8,34 @@
 ######
 
 import os
+import time
 import numpy as np
-from PIL import Image
 
 
 from PyQt6.QtCore import QObject, QEventLoop, QTimer, pyqtSignal
+from PyQt6.QtGui import QImage
+from PyQt6.QtWebEngineCore import QWebEngineScript
 
 
 from view.util import screenshot_filename
+from common.stitcher import PngStitcher
+
+# upper bound (ms) waiting for the page to be rendered after each scroll
+MAX_RENDER_WAIT = 500
+RENDER_POLLING_INTERVAL = 16
+# the flag lives in an isolated world, the page's scripts can't see or fake it
+RENDER_WORLD_ID = QWebEngineScript.ScriptWorldId.ApplicationWorld.value
+
+# the flag is set after two animation frames, when the scrolled page is painted
+SCROLL_AND_WAIT_RENDER = """
+window.__fit_rendered = false;
+window.scrollTo({}, {});
+window.requestAnimationFrame(function () {{
+    window.requestAnimationFrame(function () {{
+        window.__fit_rendered = true;
+    }});
+}});
+"""
 
 
 class FullPageScreenShot(QObject):
@@ -25,6 +45,7 @@ class FullPageScreenShot(QObject):
         acquisition_directory=None,
         screenshot_directory=None,
         parent=None,
+        max_render_wait=MAX_RENDER_WAIT,
     ):
         super().__init__(parent)
 
@@ -32,6 +53,8 @@ class FullPageScreenShot(QObject):
         self.screenshot_directory = screenshot_directory
         self.acquisition_directory = acquisition_directory
         self.is_running_task = False
+        self.max_render_wait = max_render_wait
+        self.timings = []
 
     @property
     def is_running_task(self):
@@ -50,54 +73,86 @@ class FullPageScreenShot(QObject):
             if not os.path.isdir(full_page_folder):
                 os.makedirs(full_page_folder)
 
+            self.timings = []
+
             # move page on top
-            self.current_widget.page().runJavaScript("window.scrollTo(0, 0);")
+            self.__scroll_and_wait_render(0)
 
             next = 0
             part = 0
             step = self.current_widget.height()
             end = self.current_widget.page().contentsSize().toSize().height()
-            loop = QEventLoop()
-            QTimer.singleShot(500, loop.quit)
-            loop.exec()
 
-            images = []
+            whole_img_filename = screenshot_filename(
+                self.screenshot_directory, "full_page" + ""
+            )
+            if self.is_running_task:
+                whole_img_filename = os.path.join(
+                    self.acquisition_directory, "screenshot.png"
+                )
+
+            # each part is saved and then stitched directly into the whole image
+            stitcher = None
 
             while next < end:
                 filename = screenshot_filename(full_page_folder, "part_" + str(part))
-                if next == 0:
-                    self.current_widget.grab().save(filename)
-                else:
-                    self.current_widget.page().runJavaScript(
-                        "window.scrollTo({}, {});".format(0, next)
-                    )
-
+                if next != 0:
                     ### Waiting everything is synchronized
-                    loop = QEventLoop()
-                    QTimer.singleShot(500, loop.quit)
-                    loop.exec()
-                    self.current_widget.grab().save(filename)
+                    self.__scroll_and_wait_render(next)
+
+                pixmap = self.current_widget.grab()
+                pixmap.save(filename)
 
-                images.append(filename)
+                image = pixmap.toImage()
+                if stitcher is None:
+                    stitcher = PngStitcher(whole_img_filename, image.width())
+                stitcher.append(self.__image_to_array(image))
 
                 part += 1
                 next += step
 
-            # combine all images part in an unique image
-            imgs = [Image.open(i) for i in images]
-            # pick the image which is the smallest, and resize the others to match it (can be arbitrary image shape here)
-            min_shape = sorted([(np.sum(i.size), i.size) for i in imgs])[0][1]
+            if stitcher is not None:
+                stitcher.close()
 
-            # for a vertical stacking it is simple: use vstack
-            imgs_comb = np.vstack([i.resize(min_shape) for i in imgs])
-            imgs_comb = Image.fromarray(imgs_comb)
+    def __scroll_and_wait_render(self, y):
+        # wait for the render of the scrolled page instead of a fixed delay,
+        # max_render_wait is the upper bound
+        page = self.current_widget.page()
+        start = time.perf_counter()
+        loop = QEventLoop()
 
-            whole_img_filename = screenshot_filename(
-                self.screenshot_directory, "full_page" + ""
-            )
-            if self.is_running_task:
-                whole_img_filename = os.path.join(
-                    self.acquisition_directory, "screenshot.png"
-                )
+        timeout = QTimer()
+        timeout.setSingleShot(True)
+        timeout.timeout.connect(loop.quit)
+
+        polling = QTimer()
+        polling.setInterval(RENDER_POLLING_INTERVAL)
 
-            imgs_comb.save(whole_img_filename)
+        def is_rendered(result):
+            if result is True:
+                loop.quit()
+
+        polling.timeout.connect(
+            lambda: page.runJavaScript(
+                "window.__fit_rendered === true", RENDER_WORLD_ID, is_rendered
+            )
+        )
+
+        page.runJavaScript(SCROLL_AND_WAIT_RENDER.format(0, y), RENDER_WORLD_ID)
+        timeout.start(self.max_render_wait)
+        polling.start()
+        loop.exec()
+        polling.stop()
+        timeout.stop()
+
+        self.timings.append(round((time.perf_counter() - start) * 1000))
+
+    def __image_to_array(self, image):
+        image = image.convertToFormat(QImage.Format.Format_RGB888)
+        ptr = image.constBits()
+        ptr.setsize(image.sizeInBytes())
+        # rows are aligned to 32 bits, padding is removed
+        rows = np.frombuffer(ptr, dtype=np.uint8).reshape(
+            image.height(), image.bytesPerLine()
+        )
+        return rows[:, : image.width() * 3].reshape(image.height(), image.width(), 3)
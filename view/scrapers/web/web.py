@@ -36,6 +36,7 @@ from controller.configurations.tabs.general.general import (
 from controller.configurations.tabs.screenrecorder.screenrecorder import (
     ScreenRecorder as ScreenRecorderConfigurationController,
 )
+from controller.screenrecorder import get_frames_filename
 
 
 from common.constants.view import general
@@ -179,20 +180,44 @@ class Web(QtWidgets.QMainWindow):
 
             self.__enable_all()
 
+            # video and frames timestamps of the screen recorder are not hashed
+            screen_recorder_filename = ScreenRecorderConfigurationController().options[
+                "filename"
+            ]
+
             self.acquisition_manager.options = {
                 "acquisition_directory": self.acquisition_directory,
                 "screenshot_directory": self.screenshot_directory,
                 "type": "web",
                 "case_info": self.case_info,
                 "current_widget": self.tabs.currentWidget(),
+                "screen_recorder_region": self.__get_screen_recorder_region(),
                 "exclude_from_hash_calculation": [
-                    ScreenRecorderConfigurationController().options["filename"]
+                    screen_recorder_filename,
+                    os.path.basename(get_frames_filename(screen_recorder_filename)),
                 ],
             }
 
             self.acquisition_manager.load_tasks()
             self.acquisition_manager.start()
 
+    def __get_screen_recorder_region(self):
+        # the screen recorder records only the acquisition window,
+        # in physical pixels and with even sizes as required by most codecs
+        screen = self.screen()
+        geometry = self.frameGeometry().intersected(screen.geometry())
+        ratio = screen.devicePixelRatio()
+
+        left = int(geometry.left() * ratio)
+        top = int(geometry.top() * ratio)
+        width = int(geometry.width() * ratio) // 2 * 2
+        height = int(geometry.height() * ratio) // 2 * 2
+
+        if width <= 0 or height <= 0:
+            return None
+
+        return (left, top, left + width, top + height)
+
     def __start_tasks_is_finished(self):
         self.acquisition_manager.set_completed_progress_bar()
         self.status_message.setText("")
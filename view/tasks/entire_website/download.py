@@ -33,29 +33,36 @@ class EntireWebsiteDownloadWorker(QObject):
 
     def download(self):
         controller = self.options.get("entire_website_controller")
-        urls = list()
-
         controller.set_dir(self.options.get("acquisition_directory"))
 
         port = find_free_port()
         mitm_thread = MitmProxyWorker(port)
         mitm_thread.set_dir(self.options.get("acquisition_directory"))
+        mitm_thread.set_headers(controller.headers)
         mitm_thread.start()
         controller.set_proxy(port)
-        for url in self.options.get("urls"):
-            try:
-                controller.download(url)
-                urls.append(url)
-
-            except Exception as e:
-                self.error.emit(
-                    {
-                        "title": entire_site.INVALID_URL,
-                        "msg": error.INVALID_URL,
-                        "details": str(e),
-                    }
-                )
-            else:
-                self.progress.emit()
+        try:
+            urls = controller.download_urls(
+                self.options.get("urls"), self.__url_downloaded
+            )
+        finally:
+            controller.close()
+            # pages and resources are saved by the proxy, post acquisition
+            # starts only after all of them are written
+            mitm_thread.stop_proxy()
+            mitm_thread.wait()
 
         self.download_finished.emit(urls)
+
+    def __url_downloaded(self, url, download_error):
+        # called by the download threads as soon as every url is done
+        if download_error is None:
+            self.progress.emit()
+        else:
+            self.error.emit(
+                {
+                    "title": entire_site.INVALID_URL,
+                    "msg": error.INVALID_URL,
+                    "details": str(download_error),
+                }
+            )
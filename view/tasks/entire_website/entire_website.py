@@ -24,7 +24,8 @@ from common.constants import logger
 
 class TaskEntireWebsite(Task):
     valid_url = pyqtSignal(str)
-    sitemap_finished = pyqtSignal(str, set)
+    sitemap_finished = pyqtSignal(str, int)
+    urls_found = pyqtSignal(list)
     download_finished = pyqtSignal()
     progress = pyqtSignal()
 
@@ -110,11 +111,12 @@ class TaskEntireWebsite(Task):
         self.sub_task.moveToThread(self.sub_task_thread)
         self.sub_task_thread.started.connect(self.sub_task.get_sitemap)
         self.sub_task.sitemap.connect(self.__get_sitemap_finished)
+        self.sub_task.urls_found.connect(self.urls_found.emit)
         self.sub_task.error.connect(self.__handle_error)
         self.sub_task.options = self.options
         self.sub_task_thread.start()
 
-    def __get_sitemap_finished(self, __status, urls):
+    def __get_sitemap_finished(self, __status, urls_count):
         sub_task_get_sitemap = next(
             (
                 task
@@ -132,7 +134,7 @@ class TaskEntireWebsite(Task):
             logger.ENTIRE_WEBSITE_SCRAPER_URLS.format(__status)
         )
 
-        self.sitemap_finished.emit(__status, urls)
+        self.sitemap_finished.emit(__status, urls_count)
 
         self.__quit_to_sub_task()
 
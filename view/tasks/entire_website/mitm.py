@@ -8,10 +8,10 @@
 ######
 import asyncio
 import logging
+import threading
 from pathlib import Path
 
 from PyQt6.QtCore import QThread
-from mitmproxy import ctx
 import os.path
 
 import mitmproxy
@@ -29,32 +29,52 @@ class MitmProxyWorker(QThread):
         super().__init__()
         self.port = port
         self.acquisition_directory = None
+        self.headers = {}
+        self.proxy_server = None
+        self.is_ready = threading.Event()
 
     def set_dir(self, acquisition_directory):
         self.acquisition_directory = acquisition_directory
 
+    def set_headers(self, headers):
+        self.headers = headers
+
     def run(self):
         # create new event loop
         self.loop = asyncio.new_event_loop()
         asyncio.set_event_loop(self.loop)
 
         # mitmproxy's creation
-        self.proxy_server = MitmProxy(self.port, self.acquisition_directory)
+        self.proxy_server = MitmProxy(
+            self.port, self.acquisition_directory, self.headers, self.is_ready
+        )
         asyncio.run(self.proxy_server.start())
+        # stop_proxy doesn't wait when the proxy couldn't start
+        self.is_ready.set()
 
     def stop_proxy(self):
+        # the addons save the last flows in their done hook, the thread
+        # finishes when all of them are on disk
+        self.is_ready.wait()
+        if self.proxy_server is None or self.proxy_server.master is None:
+            return
+        # the resources still downloading pass through the proxy
+        self.proxy_server.flow_reader.wait_idle()
         try:
-            ctx.master.shutdown()
-            ctx.master = None
-        except:
+            self.proxy_server.master.shutdown()
+        except Exception:
             pass
 
 
 class MitmProxy:
-    def __init__(self, port, acquisition_directory):
+    def __init__(self, port, acquisition_directory, headers, is_ready):
         super().__init__()
         self.port = port
         self.acquisition_directory = acquisition_directory
+        self.headers = headers
+        self.is_ready = is_ready
+        self.master = None
+        self.flow_reader = None
 
     async def start(self):
         # Set proxy options
@@ -69,11 +89,17 @@ class MitmProxy:
         )
         # Create a master object and add addons
         master = DumpMaster(options=options, with_termlog=False, with_dumper=False)
+        self.flow_reader = FlowReaderAddon(
+            self.acquisition_directory, self.port, self.headers
+        )
         addons = [
             FlowWriterAddon(self.acquisition_directory),
-            FlowReaderAddon(self.acquisition_directory),
+            self.flow_reader,
         ]
         master.addons.add(*addons)
+        # shutdown is thread safe from now on
+        self.master = master
+        self.is_ready.set()
         # disable mitmproxy loggers
         loggers = [logging.getLogger()]
         loggers = loggers + [
@@ -97,16 +123,23 @@ class MitmProxy:
 
 # creating a custom addon to intercept requests and reponses
 class FlowReaderAddon:
-    def __init__(self, acquisition_directory):
+    def __init__(self, acquisition_directory, port, headers):
         self.acquisition_directory = acquisition_directory
         self.acq_dir = os.path.join(self.acquisition_directory, "acquisition_page")
         if not os.path.isdir(self.acq_dir):
             os.makedirs(self.acq_dir)
+        # one controller for all the flows, the resources shared by the
+        # pages are saved only once
+        self.proxy_controller = MitmController(self.acq_dir, port, headers)
 
     def response(self, flow: mitmproxy.http.HTTPFlow):
-        proxy_controller = MitmController(self.acq_dir)
-        proxy_controller.create_folders(flow)
-        proxy_controller.save_resources(flow)
+        self.proxy_controller.save_flow(flow)
+
+    def wait_idle(self):
+        self.proxy_controller.wait_idle()
+
+    def done(self):
+        self.proxy_controller.close()
 
 
 # addon from doc: https://docs.mitmproxy.org/stable/addons-examples/#io-write-flow-file
@@ -120,3 +153,6 @@ class FlowWriterAddon:
 
     def response(self, flow: http.HTTPFlow) -> None:
         self.w.add(flow)
+
+    def done(self):
+        self.file.close()
@@ -15,7 +15,8 @@ from common.constants import error
 
 
 class EntireWebsiteSitemapWorker(QObject):
-    sitemap = pyqtSignal(str, set)
+    sitemap = pyqtSignal(str, int)
+    urls_found = pyqtSignal(list)
     error = pyqtSignal(object)
 
     @property
@@ -29,11 +30,14 @@ class EntireWebsiteSitemapWorker(QObject):
     def get_sitemap(self):
         controller = self.options.get("entire_website_controller")
         __status = status.SUCCESS
-        urls = set()
+        urls_count = 0
         try:
             controller.set_url(self.options.get("url"))
             controller.set_load_type(self.options.get("load_type"))
-            urls = controller.get_sitemap()
+            controller.set_lastmod_since(self.options.get("lastmod_since"))
+            # urls are shown while the website is crawled, only their number
+            # is sent at the end
+            urls_count = controller.get_sitemap(self.urls_found.emit)
 
         except Exception as e:
             __status = status.FAIL
@@ -45,4 +49,4 @@ class EntireWebsiteSitemapWorker(QObject):
                 }
             )
 
-        self.sitemap.emit(__status, urls)
+        self.sitemap.emit(__status, urls_count)
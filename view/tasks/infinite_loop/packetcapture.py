@@ -7,14 +7,9 @@
 # -----
 ######
 
-import logging
-
-logging.getLogger("scapy").setLevel(logging.CRITICAL)
-import scapy.all as scapy
-
 import os
 
-from PyQt6.QtCore import QObject, QEventLoop, QTimer, pyqtSignal, QThread
+from PyQt6.QtCore import QObject, pyqtSignal, QThread
 from PyQt6.QtWidgets import QMessageBox
 from common.constants.view.tasks import labels, state, status
 
@@ -25,6 +20,7 @@ from view.error import Error as ErrorView
 from controller.configurations.tabs.packetcapture.packetcapture import (
     PacketCapture as PacketCaptureCotroller,
 )
+from controller.packetcapture import PacketCapture, SNAPLEN
 
 from common.constants import logger, details, error
 
@@ -38,17 +34,23 @@ class PacketCaptureWorker(QObject):
         QObject.__init__(self, parent=parent)
         self.options = None
         self.output_file = None
-        self.sniffer = scapy.AsyncSniffer()
+        self.capture = None
 
     def set_options(self, options):
         self.output_file = os.path.join(
             options["acquisition_directory"], options["filename"]
         )
+        self.snaplen = options.get("snaplen") or SNAPLEN
+        self.rotation_size = options.get("rotation_size")
+        self.rotation_time = options.get("rotation_time")
 
     def start(self):
+        self.capture = PacketCapture(
+            self.output_file, self.snaplen, self.rotation_size, self.rotation_time
+        )
         self.started.emit()
         try:
-            self.sniffer.start()
+            self.capture.start()
         except Exception as e:
             self.error.emit(
                 {
@@ -59,11 +61,8 @@ class PacketCaptureWorker(QObject):
             )
 
     def stop(self):
-        self.sniffer.stop()
-        loop = QEventLoop()
-        QTimer.singleShot(1000, loop.quit)
-        loop.exec()
-        scapy.wrpcap(self.output_file, self.sniffer.results)
+        if self.capture is not None:
+            self.capture.stop()
         self.finished.emit()
 
 
@@ -96,6 +95,13 @@ class TaskPacketCapture(Task):
         options["acquisition_directory"] = folder
         self._options = options
 
+    @property
+    def stats(self):
+        # live counters of the capture
+        if self.worker.capture is None:
+            return None
+        return self.worker.capture.stats
+
     def __handle_error(self, error):
         error_dlg = ErrorView(
             QMessageBox.Icon.Critical,
@@ -129,6 +135,8 @@ class TaskPacketCapture(Task):
 
     def __finished(self):
         self.logger.info(logger.NETWORK_PACKET_CAPTURE_COMPLETED)
+        if self.stats is not None:
+            self.logger.info(logger.NETWORK_PACKET_CAPTURE_PACKETS.format(**self.stats))
         self.set_message_on_the_statusbar(logger.NETWORK_PACKET_CAPTURE_COMPLETED)
         self.upadate_progress_bar()
 
@@ -7,12 +7,10 @@
 # -----
 ######
 import cv2
-import numpy as np
 import sys
 import os
 
 
-from PIL import ImageGrab
 from PyQt6.QtCore import QObject, pyqtSignal, QThread
 from PyQt6.QtWidgets import QMessageBox
 
@@ -23,6 +21,7 @@ from view.tasks.task import Task
 from view.error import Error as ErrorView
 
 from controller.configurations.tabs.screenrecorder.codec import Codec as CodecController
+from controller.screenrecorder import ScreenRecorder
 from controller.configurations.tabs.screenrecorder.screenrecorder import (
     ScreenRecorder as ScreenRecorderConfigurationController,
 )
@@ -40,12 +39,18 @@ class ScreenRecorderWorker(QObject):
     def __init__(self, parent=None):
         QObject.__init__(self, parent=parent)
         self.run = True
+        self.recorder = None
         self.destroyed.connect(self.stop)
         self.controller = CodecController()
 
     def set_options(self, options):
-        self.width = get_monitors()[0].width
-        self.height = get_monitors()[0].height
+        # by default the whole main monitor is recorded
+        self.bbox = options.get("region") or (
+            0,
+            0,
+            get_monitors()[0].width,
+            get_monitors()[0].height,
+        )
         codec = next(
             (
                 item
@@ -55,24 +60,16 @@ class ScreenRecorderWorker(QObject):
         )
         self.codec = cv2.VideoWriter_fourcc(*codec["name"])
 
-        # TO-DO find the right way to calculate dynamic FPS
         self.fps = options["fps"]
         self.filename = options["filename"]
 
     def start(self):
-        self.out = cv2.VideoWriter(
-            self.filename, self.codec, self.fps, (self.width, self.height)
-        )
+        self.recorder = ScreenRecorder(self.filename, self.codec, self.fps, self.bbox)
 
         self.started.emit()
         try:
-            while self.run:
-                img = ImageGrab.grab(bbox=(0, 0, self.width, self.height))
-                frame = np.array(img)
-
-                # Convert it from BGR(Blue, Green, Red) to RGB(Red, Green, Blue)
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                self.out.write(frame)
+            if self.run:
+                self.recorder.record()
 
         except:
             self.error.emit(
@@ -83,14 +80,14 @@ class ScreenRecorderWorker(QObject):
                 }
             )
 
-        self.out.release()
-
         cv2.destroyAllWindows()
 
         self.finished.emit()
 
     def stop(self):
         self.run = False
+        if self.recorder is not None:
+            self.recorder.stop()
 
 
 class TaskScreenRecorder(Task):
@@ -117,8 +114,10 @@ class TaskScreenRecorder(Task):
     @options.setter
     def options(self, options):
         folder = options["acquisition_directory"]
+        region = options.get("screen_recorder_region")
         options = ScreenRecorderConfigurationController().options
         options["filename"] = os.path.join(folder, options["filename"])
+        options["region"] = region
         self._options = options
 
     def __handle_error(self, error):
@@ -154,6 +153,10 @@ class TaskScreenRecorder(Task):
 
     def __finished(self):
         self.logger.info(logger.SCREEN_RECODER_COMPLETED)
+        if self.worker.recorder is not None:
+            self.logger.info(
+                logger.SCREEN_RECODER_FRAMES.format(**self.worker.recorder.stats)
+            )
         self.set_message_on_the_statusbar(logger.SCREEN_RECODER_COMPLETED)
         self.upadate_progress_bar()
 
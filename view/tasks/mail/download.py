@@ -8,14 +8,27 @@
 ######
 
 import os
-import re
+import time
 
 from PyQt6.QtCore import QObject, pyqtSignal
 
+from controller.mail import (
+    MailDownloader,
+    MailIndex,
+    DOWNLOAD_CONNECTIONS,
+    MAIL_INDEX_FILENAME,
+)
+
+from common.constants import error
+from common.constants.view import mail
+
 
 class MailDownloadWorker(QObject):
     download_finished = pyqtSignal()
+    download_failed = pyqtSignal()
     progress = pyqtSignal()
+    download_statistics = pyqtSignal(dict)
+    download_estimate = pyqtSignal(dict)
     error = pyqtSignal(object)
 
     @property
@@ -36,15 +49,65 @@ class MailDownloadWorker(QObject):
 
         emails_to_download = self.options.get("emails_to_download")
         controller = self.options.get("mail_controller")
+        auth_info = self.options.get("auth_info")
+
+        downloader = MailDownloader(
+            auth_info.get("server"),
+            auth_info.get("port"),
+            auth_info.get("email"),
+            auth_info.get("password"),
+            self.options.get("mail_download_connections", DOWNLOAD_CONNECTIONS),
+            progress=self.__progress,
+        )
+        self.downloaded_emails = 0
+        self.total_emails = sum(len(uids) for uids in emails_to_download.values())
+        self.start_time = self.estimate_time = time.perf_counter()
+
+        # the emails already downloaded by an interrupted download are skipped
+        index = MailIndex(
+            os.path.join(self.options.get("acquisition_directory"), MAIL_INDEX_FILENAME)
+        )
+
+        is_downloaded = True
+        try:
+            downloader.download(emails_to_download, self.acquisition_mail_dir, index)
+        except Exception as e:
+            is_downloaded = False
+            self.error.emit(
+                {
+                    "title": mail.SAVE_MAIL,
+                    "message": error.SAVE_MAIL,
+                    "details": str(e),
+                }
+            )
+        finally:
+            index.close()
 
-        for folder, emails_list in emails_to_download.items():
-            for emails in emails_list:
-                email_id = emails.partition("UID: ")[2]
-                # Create acquisition folder
-                folder_stripped = re.sub(r"[^a-zA-Z0-9]+", "-", folder)
-                controller.write_emails(
-                    email_id, self.acquisition_mail_dir, folder_stripped, folder
-                )
-                self.progress.emit()
+        self.download_statistics.emit(downloader.stats)
+        controller.logs = controller.logs + downloader.logs
         controller.write_logs(self.options.get("acquisition_directory"))
-        self.download_finished.emit()
+
+        if is_downloaded:
+            self.download_finished.emit()
+        else:
+            self.download_failed.emit()
+
+    def __progress(self, downloaded_emails):
+        # one signal for each email, also when a batch has been skipped
+        for i in range(downloaded_emails - self.downloaded_emails):
+            self.progress.emit()
+        self.downloaded_emails = max(self.downloaded_emails, downloaded_emails)
+
+        # remaining time from the measured download rate, at most once a second
+        now = time.perf_counter()
+        if now - self.estimate_time >= 1 and self.downloaded_emails > 0:
+            self.estimate_time = now
+            remaining_emails = self.total_emails - self.downloaded_emails
+            seconds = (now - self.start_time) / self.downloaded_emails
+            self.download_estimate.emit(
+                {
+                    "downloaded": self.downloaded_emails,
+                    "total": self.total_emails,
+                    "remaining_time": round(remaining_emails * seconds / 60, 2),
+                }
+            )
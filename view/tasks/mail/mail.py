@@ -26,7 +26,9 @@ from common.constants import logger
 class TaskMail(Task):
     logged_in = pyqtSignal(str)
     search_emails_finished = pyqtSignal(str, dict)
+    emails_found = pyqtSignal(str, list)
     download_finished = pyqtSignal()
+    download_failed = pyqtSignal()
     progress = pyqtSignal()
 
     def __init__(self, logger, progress_bar=None, status_bar=None, parent=None):
@@ -108,6 +110,7 @@ class TaskMail(Task):
         self.sub_task.moveToThread(self.sub_task_thread)
         self.sub_task_thread.started.connect(self.sub_task.search)
         self.sub_task.search_emails_finished.connect(self.__search_emails_finished)
+        self.sub_task.emails_found.connect(self.emails_found.emit)
         self.sub_task.search_statistics.connect(self.__search_statistics_handler)
         self.sub_task.error.connect(self.__handle_error)
         self.sub_task.options = self.options
@@ -142,15 +145,17 @@ class TaskMail(Task):
         self.__quit_to_sub_task()
 
     def __search_statistics_handler(self, statistics):
-        self.logger.info(
-            logger.MAIL_SCRAPER_FETCH_EMAILS.format(
-                statistics.get("estimated_time"), statistics.get("total_emails")
-            )
+        message = logger.MAIL_SCRAPER_FETCH_EMAILS.format(
+            total_megabytes=round(statistics.get("total_bytes") / (1024 * 1024), 2),
+            **statistics
         )
+        self.logger.info(message)
+        self.set_message_on_the_statusbar(message)
+
+    def __download_estimate_handler(self, estimate):
+        # refined while downloading, only shown on the status bar
         self.set_message_on_the_statusbar(
-            logger.MAIL_SCRAPER_FETCH_EMAILS.format(
-                statistics.get("estimated_time"), statistics.get("total_emails")
-            )
+            logger.MAIL_SCRAPER_DOWNLOAD_ESTIMATE.format(**estimate)
         )
 
     def download(self):
@@ -159,11 +164,21 @@ class TaskMail(Task):
         self.sub_task.moveToThread(self.sub_task_thread)
         self.sub_task_thread.started.connect(self.sub_task.download)
         self.sub_task.download_finished.connect(self.__download_finished)
+        self.sub_task.download_failed.connect(self.__download_failed)
         self.sub_task.progress.connect(self.progress.emit)
+        self.sub_task.download_statistics.connect(self.__download_statistics_handler)
+        self.sub_task.download_estimate.connect(self.__download_estimate_handler)
         self.sub_task.error.connect(self.__handle_error)
         self.sub_task.options = self.options
         self.sub_task_thread.start()
 
+    def __download_statistics_handler(self, statistics):
+        for connection in statistics.get("connections"):
+            self.logger.info(
+                logger.MAIL_SCRAPER_DOWNLOAD_CONNECTION.format(**connection)
+            )
+        self.logger.info(logger.MAIL_SCRAPER_DOWNLOAD_STATISTICS.format(**statistics))
+
     def __download_finished(self):
         sub_task_download = next(
             (
@@ -185,6 +200,15 @@ class TaskMail(Task):
         self.__quit_to_sub_task()
         self.__finished()
 
+    def __download_failed(self):
+        # the download can be started again, emails already downloaded are skipped
+        self.logger.info(logger.MAIL_SCRAPER_DOWNLOAD_EMAILS_FAILED)
+        self.set_message_on_the_statusbar(logger.MAIL_SCRAPER_DOWNLOAD_EMAILS_FAILED)
+
+        self.download_failed.emit()
+
+        self.__quit_to_sub_task()
+
     def __finished(self):
         self.logger.info(logger.MAIL_SCRAPER_COMPLETED)
         self.set_message_on_the_statusbar(logger.MAIL_SCRAPER_COMPLETED)
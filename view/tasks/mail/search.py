@@ -15,6 +15,7 @@ from common.constants.view import mail
 
 class MailSearchWorker(QObject):
     search_emails_finished = pyqtSignal(str, dict)
+    emails_found = pyqtSignal(str, list)
     search_statistics = pyqtSignal(dict)
     error = pyqtSignal(object)
 
@@ -57,7 +58,9 @@ class MailSearchWorker(QObject):
             __status = status.FAIL
         else:
             try:
-                emails = controller.get_mails_from_every_folder(search_criteria)
+                emails = controller.get_mails_from_every_folder(
+                    search_criteria, self.emails_found.emit
+                )
             except Exception as e:  # Get mails
                 __status = status.FAIL
                 self.error.emit(
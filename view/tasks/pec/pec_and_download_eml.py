@@ -8,14 +8,14 @@
 ######
 
 from PyQt6 import QtWidgets
-from PyQt6.QtCore import QObject, pyqtSignal, QThread, QEventLoop, QTimer
+from PyQt6.QtCore import QObject, pyqtSignal, QThread
 from common.constants.view.tasks import labels, state, status
 
 from view.tasks.task import Task
 from view.tasks.class_names import *
 from view.error import Error as ErrorView
 
-from controller.pec import Pec as PecController
+from controller.pec import Pec as PecController, RETRY_INTERVAL
 from controller.configurations.tabs.pec.pec import Pec as PecConfigController
 
 from common.constants.view.pec import pec
@@ -23,6 +23,7 @@ from common.constants import logger
 
 
 class PecAndDownloadEmlWorker(QObject):
+    sending = pyqtSignal(int)
     sentpec = pyqtSignal(str)
     downloadedeml = pyqtSignal(str)
     error = pyqtSignal(object)
@@ -52,8 +53,9 @@ class PecAndDownloadEmlWorker(QObject):
             self.options.get("imap_port"),
         )
         self.started.emit()
+        self.sending_percentage = None
         try:
-            self.pec_controller.send_pec()
+            self.pec_controller.send_pec(self.__sending_progress)
 
         except Exception as e:
             __status = status.FAIL
@@ -67,28 +69,32 @@ class PecAndDownloadEmlWorker(QObject):
 
         self.sentpec.emit(__status)
 
+        if __status == status.SUCCESS:
+            self.download_eml()
+
+    def __sending_progress(self, sent_bytes, total_bytes):
+        percentage = int(sent_bytes * 100 / total_bytes) if total_bytes else 100
+        if percentage != self.sending_percentage:
+            self.sending_percentage = percentage
+            self.sending.emit(percentage)
+
     def download_eml(self):
-        for i in range(self.options.get("retries")):
-            __status = status.FAIL
+        __status = status.FAIL
 
-            # whait for 8 seconds
-            loop = QEventLoop()
-            QTimer.singleShot(8000, loop.quit)
-            loop.exec()
-
-            try:
-                if self.pec_controller.retrieve_eml():
-                    __status = status.SUCCESS
-                    break
-            except Exception as e:
-                self.error.emit(
-                    {
-                        "title": pec.LOGIN_FAILED,
-                        "message": pec.IMAP_FAILED_MGS,
-                        "details": str(e),
-                    }
-                )
-                break
+        # wait the PEC receipt as long as all the retries did
+        try:
+            if self.pec_controller.wait_eml(
+                self.options.get("retries") * RETRY_INTERVAL
+            ):
+                __status = status.SUCCESS
+        except Exception as e:
+            self.error.emit(
+                {
+                    "title": pec.LOGIN_FAILED,
+                    "message": pec.IMAP_FAILED_MGS,
+                    "details": str(e),
+                }
+            )
 
         self.downloadedeml.emit(__status)
 
@@ -103,6 +109,7 @@ class TaskPecAndDownloadEml(Task):
         self.worker.moveToThread(self.worker_thread)
         self.worker_thread.started.connect(self.worker.send)
         self.worker.started.connect(self.__started)
+        self.worker.sending.connect(self.__sending)
         self.worker.sentpec.connect(self.__is_pec_sent)
         self.worker.error.connect(self.__handle_error)
         self.worker.downloadedeml.connect(self.__is_eml_downloaded)
@@ -140,6 +147,9 @@ class TaskPecAndDownloadEml(Task):
         self.update_task(state.STARTED, status.SUCCESS)
         self.started.emit()
 
+    def __sending(self, percentage):
+        self.set_message_on_the_statusbar(logger.PEC_SENDING.format(percentage))
+
     def __is_pec_sent(self, __status):
         sub_task_sent_pec = next(
             (task for task in self.sub_tasks if task.get("label") == labels.PEC), None
@@ -156,9 +166,8 @@ class TaskPecAndDownloadEml(Task):
         )
         self.upadate_progress_bar()
 
-        if __status == status.SUCCESS:
-            self.worker.download_eml()
-        else:
+        # on success the worker goes on downloading the EML
+        if __status != status.SUCCESS:
             self.logger.info(logger.PEC_HAS_NOT_BEEN_SENT_CANNOT_DOWNLOAD_EML)
             self.__finished()
 
@@ -11,6 +11,8 @@ import os
 
 from PyQt6 import QtCore, QtGui
 from PyQt6.QtCore import (
+    QObject,
+    QThread,
     QRegularExpression,
     QDate,
     QRect,
@@ -49,6 +51,38 @@ from common.constants.view.tasks.status import *
 from view.spinner import Spinner
 
 
+class SearchPecWorker(QObject):
+    pecs_found = pyqtSignal(list)
+    error = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    def __init__(self):
+        super().__init__()
+        self.search_pec_controller = None
+        self.search_criteria = None
+        self.is_stopped = False
+
+    def set_search(self, search_pec_controller, search_criteria):
+        self.search_pec_controller = search_pec_controller
+        self.search_criteria = search_criteria
+        self.is_stopped = False
+
+    def stop(self):
+        # the page being fetched is completed, the next ones are skipped
+        self.is_stopped = True
+
+    def start(self):
+        try:
+            for pecs in self.search_pec_controller.fetch_pec(self.search_criteria):
+                if self.is_stopped:
+                    break
+                self.pecs_found.emit(pecs)
+        except Exception as e:
+            if not self.is_stopped:
+                self.error.emit(str(e))
+        self.finished.emit()
+
+
 class SearchPec(QDialog):
     downloadedeml = pyqtSignal(str)
 
@@ -64,6 +98,19 @@ class SearchPec(QDialog):
         self.input_to_date = None
         self.controller = PecConfigController()
         self.downloaded_status = FAIL
+        self.search_pec_controller = None
+        self.search_pec_login = None
+
+        # the search runs in its own thread, the pages found are shown
+        # while the next ones are fetched
+        self.search_thread = QThread()
+        self.search_worker = SearchPecWorker()
+        self.search_worker.moveToThread(self.search_thread)
+        self.search_thread.started.connect(self.search_worker.start)
+        self.search_worker.pecs_found.connect(self.__add_pecs_on_tree)
+        self.search_worker.error.connect(self.__handle_search_error)
+        self.search_worker.finished.connect(self.__search_finished)
+
         self.setWindowFlags(
             self.windowFlags() & ~QtCore.Qt.WindowType.WindowContextHelpButtonHint
         )
@@ -278,13 +325,18 @@ class SearchPec(QDialog):
         self.root = QTreeWidgetItem(["Inbox"])
         self.pec_tree.addTopLevelItem(self.root)
 
-        search_pec = SearchPecController(
+        # the session (and its headers cache) is kept while the login is the same
+        login = (
             self.input_pec_email.text(),
             self.input_password.text(),
             self.input_imap_server.text(),
             self.input_imap_port.text(),
-            self.case_info,
         )
+        if self.search_pec_controller is None or self.search_pec_login != login:
+            if self.search_pec_controller is not None:
+                self.search_pec_controller.close()
+            self.search_pec_controller = SearchPecController(*login, self.case_info)
+            self.search_pec_login = login
 
         to = self.input_to.text()
         case = self.input_case.text()
@@ -328,41 +380,48 @@ class SearchPec(QDialog):
             to_date = to_date.strftime("%d-%b-%Y")
             search_criteria = search_criteria + f' BEFORE "{to_date}"'
 
-        messages = []
-        try:
-            messages = search_pec.fetch_pec(search_criteria)
-        except Exception as e:
-            error_dlg = ErrorView(
-                QMessageBox.Icon.Critical, pec.LOGIN_FAILED, pec.IMAP_FAILED_MGS, str(e)
-            )
-            error_dlg.exec()
+        self.pec_tree.expandItem(self.root)
+        self.search_worker.set_search(self.search_pec_controller, search_criteria)
+        self.search_thread.start()
+
+    def __handle_search_error(self, error):
+        # the worker doesn't use the session anymore
+        if self.search_pec_controller is not None:
+            self.search_pec_controller.close()
+            self.search_pec_controller = None
+        error_dlg = ErrorView(
+            QMessageBox.Icon.Critical, pec.LOGIN_FAILED, pec.IMAP_FAILED_MGS, error
+        )
+        error_dlg.exec()
+
+    def __search_finished(self):
+        self.search_thread.quit()
+        self.search_thread.wait()
+
+        self.spinner.stop()
+
+        self.pec_tree.expandItem(self.root)
+        self.download_button.setEnabled(True)
+
+        self.centralwidget.setEnabled(True)
 
-        for message in messages:
-            subject = message.get_subject()
-            date_str = str(message.get_decoded_header("Date"))
-            sender = message.get_decoded_header("From")
-            uid = message.get("Message-ID")
+    def __add_pecs_on_tree(self, pecs):
+        items = []
+        for message in pecs:
             dict_value = (
                 "Mittente: "
-                + sender
+                + message["from"]
                 + "\nData: "
-                + date_str
+                + message["date"]
                 + "\nOggetto: "
-                + subject
+                + message["subject"]
                 + "\nUID: "
-                + uid
+                + message["message_id"]
                 + "\n"
                 + "\n"
             )
-            self.email_folder = QTreeWidgetItem([dict_value])
-            self.root.addChild(self.email_folder)
-
-        self.spinner.stop()
-
-        self.pec_tree.expandItem(self.root)
-        self.download_button.setEnabled(True)
-
-        self.centralwidget.setEnabled(True)
+            items.append(QTreeWidgetItem([dict_value]))
+        self.root.addChildren(items)
 
     def __download_eml(self):
         self.centralwidget.setEnabled(False)
@@ -416,6 +475,8 @@ class SearchPec(QDialog):
                 QMessageBox.Icon.Critical, pec.LOGIN_FAILED, pec.IMAP_FAILED_MGS, str(e)
             )
             error_dlg.exec()
+        finally:
+            pec_controller.close()
         self.spinner.stop()
         self.centralwidget.setEnabled(True)
 
@@ -438,4 +499,16 @@ class SearchPec(QDialog):
             self.update_child_items(child_item, selected)
 
     def closeEvent(self, event):
+        # the session is closed only when the search has stopped using it
+        if self.search_thread.isRunning():
+            self.search_worker.pecs_found.disconnect()
+            self.search_worker.error.disconnect()
+            self.search_worker.finished.disconnect()
+            self.search_worker.stop()
+            self.search_thread.quit()
+            self.search_thread.wait()
+            self.spinner.stop()
+        if self.search_pec_controller is not None:
+            self.search_pec_controller.close()
+            self.search_pec_controller = None
         self.downloadedeml.emit(self.downloaded_status)
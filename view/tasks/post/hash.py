@@ -10,10 +10,13 @@
 import logging
 import os
 
+from concurrent.futures import ThreadPoolExecutor
+
 from PyQt6.QtCore import QObject, pyqtSignal, QThread
 from common.constants.view.tasks import labels, state, status
 
-from common.utility import calculate_hash
+from common.utility import calculate_hashes
+from common.manifest import hash_report_messages
 from common.constants import logger
 
 from view.tasks.task import Task
@@ -24,6 +27,9 @@ class HashWorker(QObject):
     finished = pyqtSignal()
     started = pyqtSignal()
 
+    algorithms = ["md5", "sha1", "sha256"]
+    max_workers = min(4, os.cpu_count() or 1)
+
     @property
     def folder(self):
         return self._folder
@@ -32,6 +38,14 @@ class HashWorker(QObject):
     def folder(self, folder):
         self._folder = folder
 
+    @property
+    def manifest(self):
+        return self._manifest
+
+    @manifest.setter
+    def manifest(self, manifest):
+        self._manifest = manifest
+
     @property
     def exclude_list(self):
         return self._exclude_list
@@ -43,25 +57,50 @@ class HashWorker(QObject):
     def start(self):
         self.started.emit()
 
-        files = [f.name for f in os.scandir(self.folder) if f.is_file()]
-        for file in files:
-            if file != "acquisition.hash" and file not in self.exclude_list:
-                filename = os.path.join(self.folder, file)
-                file_stats = os.stat(filename)
-                self.logger.info(file)
-                self.logger.info(
-                    "========================================================="
-                )
-                self.logger.info(f"Size: {file_stats.st_size}")
-                algorithm = "md5"
-                self.logger.info(f"MD5: {calculate_hash(filename, algorithm)}\n")
-                algorithm = "sha1"
-                self.logger.info(f"SHA-1: {calculate_hash(filename, algorithm)}\n")
-                algorithm = "sha256"
-                self.logger.info(f"SHA-256: {calculate_hash(filename, algorithm)}\n")
+        files = [
+            f.name
+            for f in os.scandir(self.folder)
+            if f.is_file()
+            and f.name != "acquisition.hash"
+            and f.name not in self.exclude_list
+        ]
+
+        # hashlib releases the GIL on large updates so files can be hashed in parallel
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = executor.map(self.__calculate_hashes, files)
+
+            # results are yielded in the same order of files
+            for file, record in zip(files, results):
+                for message in hash_report_messages(file, record):
+                    self.logger.info(message)
+
+        if self.manifest is not None:
+            self.manifest.hash_report = files
+            self.manifest.save()
 
         self.finished.emit()
 
+    def __calculate_hashes(self, file):
+        filename = os.path.join(self.folder, file)
+
+        if self.manifest is not None:
+            record = self.manifest.get(file)
+            if record is not None and all(
+                algorithm in record["hashes"] for algorithm in self.algorithms
+            ):
+                return record
+
+        file_stats = os.stat(filename)
+        record = {
+            "size": file_stats.st_size,
+            "hashes": calculate_hashes(filename, self.algorithms),
+        }
+
+        if self.manifest is not None:
+            record = self.manifest.add(file, record["hashes"])
+
+        return record
+
 
 class TaskHash(Task):
     def __init__(self, logger, progress_bar=None, status_bar=None, parent=None):
@@ -81,6 +120,7 @@ class TaskHash(Task):
         self.update_task(state.STARTED, status.PENDING)
         self.set_message_on_the_statusbar(logger.CALCULATE_HASHFILE_STARTED)
         self.worker.folder = self.options["acquisition_directory"]
+        self.worker.manifest = self.options.get("manifest")
         self.worker.exclude_list = list()
         if "exclude_from_hash_calculation" in self.options:
             self.worker.exclude_list = self.options["exclude_from_hash_calculation"]
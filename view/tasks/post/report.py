@@ -18,7 +18,7 @@ from view.tasks.task import Task
 from controller.report import Report as ReportController
 from controller.configurations.tabs.network.networkcheck import NetworkControllerCheck
 
-from common.utility import get_ntp_date_and_time
+from common.utility import get_ntp_date_and_time, calculate_hashes
 from common.constants import logger
 
 
@@ -30,16 +30,29 @@ class ReportWorker(QObject):
         self.folder = options["acquisition_directory"]
         self.type = options["type"]
         self.case_info = options["case_info"]
+        self.pdf_filename = options.get("pdf_filename", "acquisition_report.pdf")
+        self.manifest = options.get("manifest")
 
     def start(self):
         self.started.emit()
 
-        report = ReportController(self.folder, self.case_info)
+        report = ReportController(self.folder, self.case_info, self.manifest)
         report.generate_pdf(
             self.type,
             get_ntp_date_and_time(NetworkControllerCheck().configuration["ntp_server"]),
         )
 
+        # the report digest is reused by the timestamp task, it only needs
+        # the SHA-256
+        if self.manifest is not None:
+            self.manifest.add(
+                self.pdf_filename,
+                calculate_hashes(
+                    os.path.join(self.folder, self.pdf_filename), ["sha256"]
+                ),
+            )
+            self.manifest.save()
+
         self.finished.emit()
 
 
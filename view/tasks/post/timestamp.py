@@ -22,6 +22,7 @@ from controller.configurations.tabs.timestamp.timestamp import (
 )
 
 from common.constants import logger
+from common.utility import calculate_hashes
 
 
 class TimestampWorker(QObject):
@@ -36,6 +37,7 @@ class TimestampWorker(QObject):
         self.cert_url = options["cert_url"]
         self.acquisition_directory = options["acquisition_directory"]
         self.pdf_filename = options["pdf_filename"]
+        self.manifest = options.get("manifest")
 
     def apply_timestamp(self):
         self.started.emit()
@@ -45,20 +47,23 @@ class TimestampWorker(QObject):
 
         # getting the chain from the authority
         response = requests.get(self.cert_url)
+        certificate = response.content
         with open(cert_path, "wb") as f:
-            f.write(response.content)
-
-        with open(cert_path, "rb") as f:
-            certificate = f.read()
+            f.write(certificate)
 
         # create the object
         rt = RemoteTimestamper(
             self.server_name, certificate=certificate, hashname="sha256"
         )
 
-        # file to be certificated
-        with open(pdf_path, "rb") as f:
-            timestamp = rt.timestamp(data=f.read())
+        # file to be certificated, the digest is computed once by the report task
+        digest = None
+        if self.manifest is not None:
+            digest = self.manifest.get_hashes(self.pdf_filename, ["sha256"])
+        if digest is None:
+            digest = calculate_hashes(pdf_path, ["sha256"])
+
+        timestamp = rt.timestamp(digest=bytes.fromhex(digest["sha256"]))
 
         # saving the timestamp
         with open(ts_path, "wb") as f:
@@ -90,9 +95,11 @@ class TaskTimestamp(Task):
     def options(self, options):
         folder = options["acquisition_directory"]
         pdf_filename = options["pdf_filename"]
+        manifest = options.get("manifest")
         options = TimestampController().options
         options["acquisition_directory"] = folder
         options["pdf_filename"] = pdf_filename
+        options["manifest"] = manifest
         self._options = options
 
     def start(self):
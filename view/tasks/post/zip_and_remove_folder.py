@@ -17,6 +17,7 @@ from PyQt6.QtWidgets import QMessageBox
 from view.tasks.task import Task
 from view.error import Error as ErrorView
 
+from common.archive import ZipPackager
 from common.constants import logger, error
 from common.constants.view.tasks import labels, state, status
 
@@ -24,19 +25,29 @@ from common.constants.view.tasks import labels, state, status
 class ZipAndRemoveFolderWorker(QObject):
     finished = pyqtSignal()
     started = pyqtSignal()
+    progress = pyqtSignal(int)
     error = pyqtSignal(object)
 
     def set_options(self, options):
         self.acquisition_content_directory = options["acquisition_content_directory"]
+        self.manifest = options.get("manifest")
+        self.__percentage = -1
 
     def start(self):
         self.started.emit()
-        shutil.make_archive(
+        packager = ZipPackager(progress=self.__progress)
+        archive = packager.make_archive(
             self.acquisition_content_directory,
-            "zip",
             self.acquisition_content_directory,
         )
 
+        # the digests are reused by the next post acquisition tasks
+        if self.manifest is not None:
+            self.manifest.add(
+                archive["filename"], archive["hashes"], archive["members"]
+            )
+            self.manifest.save()
+
         has_files_downloads_folder = []
 
         downloads_folder = os.path.join(self.acquisition_content_directory, "downloads")
@@ -44,7 +55,8 @@ class ZipAndRemoveFolderWorker(QObject):
             has_files_downloads_folder = os.listdir(downloads_folder)
 
         if len(has_files_downloads_folder) > 0:
-            shutil.make_archive(downloads_folder, "zip", downloads_folder)
+            ZipPackager().make_archive(downloads_folder, downloads_folder)
+
         try:
             shutil.rmtree(self.acquisition_content_directory)
             if os.path.isdir(downloads_folder):
@@ -60,6 +72,16 @@ class ZipAndRemoveFolderWorker(QObject):
                 }
             )
 
+    def __progress(self, written_bytes, total_bytes):
+        percentage = 100
+        if total_bytes > 0:
+            percentage = int(written_bytes * 100 / total_bytes)
+
+        # avoid flooding the event loop with a signal for each chunk
+        if percentage != self.__percentage:
+            self.__percentage = percentage
+            self.progress.emit(percentage)
+
 
 class TaskZipAndRemoveFolder(Task):
     def __init__(self, logger, progress_bar=None, status_bar=None, parent=None):
@@ -73,6 +95,7 @@ class TaskZipAndRemoveFolder(Task):
         self.worker_thread.started.connect(self.worker.start)
         self.worker.started.connect(self.__started)
         self.worker.finished.connect(self.__finished)
+        self.worker.progress.connect(self.__progress)
         self.worker.error.connect(self.__handle_error)
 
         self.destroyed.connect(lambda: self.__destroyed_handler(self.__dict__))
@@ -89,6 +112,8 @@ class TaskZipAndRemoveFolder(Task):
 
     def start(self):
         self.worker.set_options(self.options)
+        if self.progress_bar is not None:
+            self.initial_progress_bar_value = self.progress_bar.value()
         self.update_task(state.STARTED, status.PENDING)
         self.set_message_on_the_statusbar(logger.ZIP_AND_REMOVE_FOLDER_STARTED)
         self.worker_thread.start()
@@ -97,9 +122,17 @@ class TaskZipAndRemoveFolder(Task):
         self.update_task(state.STARTED, status.SUCCESS)
         self.started.emit()
 
+    def __progress(self, percentage):
+        if self.progress_bar is not None:
+            self.progress_bar.setValue(
+                self.initial_progress_bar_value + int(self.increment * percentage / 100)
+            )
+
     def __finished(self, status=status.SUCCESS):
         self.logger.info(logger.ZIP_AND_REMOVE_FOLDER)
         self.set_message_on_the_statusbar(logger.ZIP_AND_REMOVE_FOLDER_COMPLETED)
+        if self.progress_bar is not None:
+            self.progress_bar.setValue(self.initial_progress_bar_value)
         self.upadate_progress_bar()
 
         self.update_task(state.COMPLETED, status)
@@ -40,10 +40,11 @@ class TaskTakeFullPageScreenShot(Task):
         full_page_screenshot.is_running_task = True
         full_page_screenshot.take_screenshot()
 
-        self.__finished()
+        self.__finished(full_page_screenshot.timings)
 
-    def __finished(self):
+    def __finished(self, timings):
         self.logger.info(logger.TAKE_FULL_PAGE_SCREENSHOT)
+        self.logger.info(logger.TAKE_FULL_PAGE_SCREENSHOT_TIMINGS.format(timings))
         self.set_message_on_the_statusbar(logger.TAKE_FULL_PAGE_SCREENSHOT_COMPLETED)
         self.upadate_progress_bar()
 